@@ -2,9 +2,15 @@ from fastapi import APIRouter
 
 from app.api.v1.endpoints.default import default_router
 from app.api.v1.endpoints.rate_limit import rate_limit
+from app.api.v1.endpoints.metrics import metrics_router
+from app.api.v1.endpoints.admin import admin_router
+from app.api.v1.endpoints.decisions import decisions_router
 
 api_router = APIRouter()
 
 api_router.include_router(default_router)
 api_router.include_router(rate_limit)
+api_router.include_router(metrics_router)
+api_router.include_router(admin_router)
+api_router.include_router(decisions_router)
 
@@ -0,0 +1,80 @@
+import time
+from typing import List, Literal, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+
+from app.core.config import settings
+from app.core.security import require_internal_access
+from app.schemas.rate_limit import HeavyHitterRead, HeavyHittersRead, KeyspaceRead, PenaltyRead
+from app.services.rate_limit.keyspace_audit import KeyspaceAuditor, redis_clients, report_dict
+from app.services.rate_limit.rate_limiter import RateLimiterService
+
+admin_router = APIRouter(
+    prefix="/admin/rate-limit",
+    tags=["Rate Limit Admin"],
+    dependencies=[Depends(require_internal_access)],
+)
+
+
+def get_service(request: Request) -> RateLimiterService:
+    return request.app.state.rate_limiter_service
+
+
+@admin_router.get("/heavy-hitters", response_model=List[HeavyHittersRead])
+async def heavy_hitters(
+    request: Request,
+    rule: Optional[str] = None,
+    decision: Literal["allowed", "denied"] = "denied",
+    limit: int = Query(10, gt=0, le=1000),
+):
+    # faqat shu worker ko'rgan trafik
+    tracker = get_service(request).heavy_hitters
+    if tracker is None:
+        raise HTTPException(status_code=404, detail="Heavy hitter tracking is disabled")
+    rules = [rule] if rule is not None else tracker.rules()
+    return [
+        HeavyHittersRead(
+            rule=name,
+            decision=decision,
+            total=tracker.total(name, decision),
+            items=[
+                HeavyHitterRead(identity=item.identity, count=item.count, error=item.error)
+                for item in tracker.top(name, decision, limit)
+            ],
+        )
+        for name in rules
+    ]
+
+
+@admin_router.get("/penalty-box", response_model=List[PenaltyRead])
+async def penalty_box(request: Request):
+    box = get_service(request).penalty_box
+    if box is None:
+        raise HTTPException(status_code=404, detail="Penalty box is disabled")
+    now = time.time()
+    return [
+        PenaltyRead(identity=identity, banned_until=until, remaining_seconds=until - now)
+        for identity, until in sorted(box.bans().items(), key=lambda entry: entry[1], reverse=True)
+    ]
+
+
+@admin_router.delete("/penalty-box/{identity}", status_code=204)
+async def unban(identity: str, request: Request):
+    box = get_service(request).penalty_box
+    if box is None:
+        raise HTTPException(status_code=404, detail="Penalty box is disabled")
+    await box.unban(identity)
+
+
+@admin_router.get("/keyspace", response_model=KeyspaceRead)
+async def keyspace(
+    request: Request,
+    max_keys: int = Query(100_000, gt=0),
+    sample_rate: float = Query(settings.rate_limit_audit_sample_rate, gt=0, le=1),
+):
+    # SCAN partiyalab, pauza bilan: katta keyspace'da javob sekin, Redis esa bloklanmaydi
+    clients = redis_clients(get_service(request).repo)
+    if not clients:
+        raise HTTPException(status_code=404, detail="Keyspace audit needs the redis backend")
+    report = await KeyspaceAuditor(clients, sample_rate=sample_rate).run(max_keys=max_keys)
+    return report_dict(report)
@@ -0,0 +1,56 @@
+from typing import List
+
+from fastapi import APIRouter, Depends, Request
+
+from app.core.security import require_internal_access
+from app.schemas.rate_limit import DecisionRead, DecisionRequest, PeekRead
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import rule_cache
+
+decisions_router = APIRouter(
+    prefix="/decisions",
+    tags=["Decisions"],
+    # middleware cheklamaydi: faqat gateway (token yoki shu host)
+    dependencies=[Depends(require_internal_access)],
+)
+
+
+def resolve_items(data: DecisionRequest) -> list[tuple]:
+    # butun batch bitta qoidalar versiyasi bilan baholanadi
+    snapshot = rule_cache.snapshot
+    requests = []
+    for item in data.items:
+        rule = snapshot.match(item.path, item.method)
+        identity = RateLimiterService.identity(item.client_ip, item.user_id, rule)
+        requests.append((identity, item.path, item.method, rule))
+    return requests
+
+
+@decisions_router.post("", response_model=List[DecisionRead])
+async def decide(data: DecisionRequest, request: Request):
+    service: RateLimiterService = request.app.state.rate_limiter_service
+    requests = resolve_items(data)
+    results = await service.decide_many(requests)
+    return [
+        DecisionRead(
+            allowed=result.allowed,
+            retry_after=result.retry_after,
+            rule=rule.scope if rule else "default",
+            limit=result.limit,
+            remaining=result.remaining,
+            reset=result.reset,
+        )
+        for (*_, rule), result in zip(requests, results)
+    ]
+
+
+@decisions_router.post("/peek", response_model=List[PeekRead])
+async def peek(data: DecisionRequest, request: Request):
+    service: RateLimiterService = request.app.state.rate_limiter_service
+    requests = resolve_items(data)
+    # backend ishlamasa javob qoidaning failure_mode bo'yicha
+    results = await service.peek_many(requests)
+    return [
+        PeekRead(remaining=remaining, retry_after=retry_after, rule=rule.scope if rule else "default")
+        for (*_, rule), (remaining, retry_after) in zip(requests, results)
+    ]
@@ -27,12 +27,9 @@ async def login():
 
 @default_router.get("/rate-limited-endpoint")
 async def rate_limited_endpoint():
-    data = await redis_client.get("rate_limit_rules_v1")
-    if data:
-        # Redisda saqlangan JSON stringni dict ga o'zgartirish
-        factory_endpoints = json.loads(data)
-    else:
-        factory_endpoints = {}
+    data = await redis_client.hgetall(settings.rate_limit_rules_key)
+    # Redisda saqlangan JSON stringlarni dict ga o'zgartirish
+    factory_endpoints = {rule_id.decode(): json.loads(raw) for rule_id, raw in data.items()}
     return {
         "message": "This endpoint is rate limited",
         "current_limits": factory_endpoints
@@ -0,0 +1,13 @@
+from fastapi import APIRouter, Response
+
+from app.core.metrics import registry
+
+metrics_router = APIRouter(tags=["Metrics"])
+
+# charset'ni Starlette o'zi qo'shadi
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"
+
+
+@metrics_router.get("/metrics", include_in_schema=False)
+async def metrics():
+    return Response(registry.render(), media_type=PROMETHEUS_CONTENT_TYPE)
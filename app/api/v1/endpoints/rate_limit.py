@@ -1,12 +1,14 @@
 import json
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException
 
 from app.core.config import settings
 from app.repositories.rate_limit.rate_limit_repository import RateLimitRepository
 from app.repositories.redis import redis_client
 from app.schemas.rate_limit import RateLimitCreate, RateLimitRead, RateLimitUpdate
 from app.api.dependencies import get_rate_limit_repo
+from app.utils.logger import logger
+from app.workers.tasks import rule_updater
 
 rate_limit = APIRouter(
     prefix="/rate-limit",
@@ -14,12 +16,22 @@ rate_limit = APIRouter(
 )
 
 
+async def publish_rule_changes():
+    # o'zgarish commit bo'lgan: Redisga yozib bo'lmasa scheduler keyingi syncda yuboradi
+    try:
+        await rule_updater.update_rules()
+    except Exception:
+        logger.exception("Rule change publish failed")
+
+
 @rate_limit.post("/", response_model=RateLimitRead)
 async def create_rule(
     data: RateLimitCreate,
     repo: RateLimitRepository = Depends(get_rate_limit_repo),
 ):
-    return await repo.create(data)
+    rule = await repo.create(data)
+    await publish_rule_changes()
+    return rule
 
 
 @rate_limit.get("/", response_model=list[RateLimitRead])
@@ -44,16 +56,26 @@ async def update_rule(
     rule = await repo.get(rule_id)
     if not rule:
         return {"error": "Rule not found"}
-    return await repo.update(rule, data)
+    rule = await repo.update(rule, data)
+    await publish_rule_changes()
+    return rule
+
+
+@rate_limit.delete("/{rule_id}", status_code=204)
+async def delete_rule(
+    rule_id: int,
+    repo: RateLimitRepository = Depends(get_rate_limit_repo),
+):
+    rule = await repo.get(rule_id)
+    if not rule:
+        raise HTTPException(status_code=404, detail="Rule not found")
+    await repo.delete(rule)
+    await publish_rule_changes()
 
 @rate_limit.get("/rate-limited-endpoint/")
 async def rate_limited_endpoint():
-    data = await redis_client.get("rate_limit_rules_v1")
-    if data:
-
-        factory_endpoints = json.loads(data)
-    else:
-        factory_endpoints = {}
+    data = await redis_client.hgetall(settings.rate_limit_rules_key)
+    factory_endpoints = {rule_id.decode(): json.loads(raw) for rule_id, raw in data.items()}
     return {
         "message": "This endpoint is rate limited",
         "current_limits": factory_endpoints
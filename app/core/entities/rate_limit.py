@@ -1,16 +1,34 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 from pydantic import BaseModel
 from typing import Literal
 
 
+# (algorithm, limit, window) - composite qoidaning bitta bosqichi
+LimitTier = tuple[str, int, float]
+
+
 @dataclass
 class RateLimitRule:
     limit: int
-    window: int
+    window: float     # soniyalarda, kasr bo'lishi mumkin
     algorithm: str
     key_type: str     # "ip" yoki "user"
-    method: str
+    method: Optional[str]  # None - barcha methodlar
+    path: str = "/"
+    priority: int = 0
+    id: Optional[int] = None
+    tiers: Optional[tuple[LimitTier, ...]] = None  # asosiy limit ham birinchi bosqich sifatida
+    failure_mode: Optional[str] = None  # Redis ishlamasa: open/closed/local, None - settings'dagi
+    scope: str = field(init=False, default="")
+
+    def __post_init__(self):
+        # Redis kalitining qoida qismi, har requestda qayta qurilmaydi.
+        # Template qoidalar (/users/{id}) uchun hisob aniq path emas, qoida bo'yicha yuritiladi
+        if self.id is not None:
+            self.scope = f"rule:{self.id}"
+        else:
+            self.scope = f"{self.path}:{self.method or '*'}"
 
 @dataclass
 class RequestInfo:
@@ -20,14 +38,41 @@ class RequestInfo:
     method: str = "GET"
 
 
+@dataclass
+class RateLimitResult:
+    allowed: bool
+    retry_after: float = 0  # soniya, rad etilganda
+    limit: Optional[int] = None
+    remaining: Optional[int] = None  # None - kvota holati noma'lum (masalan, Redis ishlamayapti)
+    reset: float = 0  # kvota to'liq tiklanguncha soniya
+
+
+class TierConfig(BaseModel):
+    limit: int
+    window: float
+    algorithm: Literal[
+        "fixed_window",
+        "sliding_window",
+        "token_bucket"
+    ]
+
+
 class EndpointRateLimitConfig(BaseModel):
     limit: int
-    window: int
+    window: float
     algorithm: Literal[
         "fixed_window",
+        "sliding_window",
         "sliding_window_log",
         "token_bucket",
-        "leaky_bucket"
+        "leaky_bucket",
+        "gcra"
     ]
     key_type: Literal["ip", "user"]
-    method: str
+    method: Optional[str] = None
+    path: str = "/"
+    priority: int = 0
+    id: Optional[int] = None
+    tiers: Optional[list[TierConfig]] = None
+    failure_mode: Optional[Literal["open", "closed", "local"]] = None
+
@@ -1,25 +1,96 @@
 from abc import ABC, abstractmethod
+from typing import Sequence
+
+from app.core.entities import LimitTier
 
 
 class RateLimitRepository(ABC):
-    """Rate limiting algoritmlarini amalga oshirish uchun interfeys"""
+    """
+    Rate limiting algoritmlarini amalga oshirish uchun interfeys.
+    Window, rate, TTL va retry_after - soniyalarda, kasr bo'lishi mumkin (millisekund aniqlik).
+    Qaror metodlari oxirida (qolgan kvota, kvota to'liq tiklanguncha soniya) ham qaytaradi -
+    RateLimit-* headerlari uchun, xuddi shu chaqiruvda.
+    """
+
+    async def prepare(self) -> None:
+        """Startupda backendni tayyorlash (masalan, Redis skriptlarini yuklash)"""
+        pass
+
+    @abstractmethod
+    async def increment_and_check(self, key: str, limit: int, window: float) -> tuple[int, float, int, float]:
+        """(hozirgi count, qolgan TTL, qolgan kvota, reset)"""
+        pass
+
+    @abstractmethod
+    async def sliding_window_log(self, key: str, limit: int, window: float) -> tuple[int, float, int, float]:
+        """(hozirgi windowdagi so'rovlar soni, eng eski timestamp TTL, qolgan kvota, reset)"""
+        pass
+
+    @abstractmethod
+    async def sliding_window_counter(self, key: str, limit: int, window: float) -> tuple[int, float, int, float]:
+        """
+        (ruxsat berildi 1/0, retry_after, qolgan kvota, reset) -
+        joriy va oldingi window hisobining og'irlikli yig'indisi
+        """
+        pass
+
+    @abstractmethod
+    async def token_bucket(self, key: str, capacity: int, refill_rate: float) -> tuple[int, float, int, float]:
+        """(ruxsat berildi 1/0, keyingi refillgacha soniya, qolgan butun tokenlar, to'lguncha soniya)"""
+        pass
+
+    @abstractmethod
+    async def gcra(self, key: str, limit: int, window: float) -> tuple[int, float, int, float]:
+        """(ruxsat berildi 1/0, aniq retry_after, qolgan kvota, reset) - kalitda faqat theoretical arrival time"""
+        pass
+
+    @abstractmethod
+    async def leaky_bucket(self, key: str, capacity: int, leak_rate: float) -> tuple[int, float, int, float]:
+        """(ruxsat berildi 1/0, keyingi leakgacha soniya, bo'sh joy, bo'shaguncha soniya)"""
+        pass
+
+    @abstractmethod
+    async def multi_limit(self, key: str, tiers: Sequence[LimitTier]) -> tuple[int, float, int, float, int]:
+        """
+        Barcha bosqichlarni atomik tekshiradi: yoki hammasi hisobga olinadi, yoki hech biri.
+        (ruxsat berildi 1/0, eng uzoq retry_after, qolgan kvota, reset, bosqich indeksi) -
+        kvota va reset eng kam qolgan bosqichniki
+        """
+        pass
+
+    @abstractmethod
+    async def lease_fixed_window(
+            self, key: str, limit: int, window: float, amount: int
+    ) -> tuple[int, float, int, float]:
+        """Windowdan `amount` tagacha hisobni band qiladi: (berilgan soni, window TTL, qolgan kvota, reset)"""
+        pass
+
+    @abstractmethod
+    async def release_fixed_window(self, key: str, amount: int) -> None:
+        """Ishlatilmagan hisobni joriy windowga qaytaradi"""
+        pass
 
     @abstractmethod
-    async def increment_and_check(self, key: str, limit: int, window: int) -> tuple[int, int]:
-        """(hozirgi count, qolgan TTL) qaytaradi, limit oshib ketgan bo'lsa -1 TTL"""
+    async def lease_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> tuple[int, float, int, float]:
+        """`amount` tagacha butun token oladi: (berilgan tokenlar, keyingi tokengacha soniya, qolgan tokenlar, reset)"""
         pass
 
     @abstractmethod
-    async def sliding_window_log(self, key: str, limit: int, window: int) -> tuple[int, int]:
-        """(hozirgi windowdagi so'rovlar soni, eng eski timestamp TTL)"""
+    async def release_token_bucket(self, key: str, capacity: int, refill_rate: float, amount: int) -> None:
+        """Ishlatilmagan tokenlarni bucketga qaytaradi (capacity'dan oshmaydi)"""
         pass
 
     @abstractmethod
-    async def token_bucket(self, key: str, capacity: int, refill_rate: float) -> tuple[int, float]:
-        """(qolgan tokenlar, keyingi refillgacha soniya)"""
+    async def peek(self, key: str, algorithm: str, limit: int, window: float) -> tuple[int, float]:
+        """
+        Hech narsa sarflamasdan: (hozir o'tkazilishi mumkin bo'lgan so'rovlar soni, 0 bo'lsa retry_after).
+        `algorithm` - qoidadagi nom (fixed_window, sliding_window, sliding_window_log, ...)
+        """
         pass
 
     @abstractmethod
-    async def leaky_bucket(self, key: str, capacity: int, leak_rate: float) -> tuple[int, float]:
-        """(qolgan tokenlar, keyingi leakgacha soniya)"""
+    async def peek_multi(self, key: str, tiers: Sequence[LimitTier]) -> tuple[int, float]:
+        """multi_limit kalitlari uchun peek: eng kichik qoldiq, eng uzoq retry_after"""
         pass
@@ -1,20 +1,26 @@
 from fastapi import FastAPI
 from contextlib import asynccontextmanager
 from app.workers.scheduler import start_scheduler, scheduler
-from app.workers.tasks import RateLimitRuleUpdater
-
-updater = RateLimitRuleUpdater()
+from app.workers.tasks import rule_updater
+from app.services.rate_limit.rule_cache import rule_cache
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
 
-    start_scheduler(updater)
+    await rule_cache.start()
+    if hasattr(app.state, "rate_limiter_service"):
+        await app.state.rate_limiter_service.start()
+    start_scheduler(rule_updater)
     print("App started, Redis initialized, scheduler running")
 
     yield  # bu yerda app ishlaydi
 
 
     scheduler.shutdown()
+    await rule_cache.stop()
+    if hasattr(app.state, "rate_limiter_service"):
+        # lease qilingan, ishlatilmagan kvotani qaytarish
+        await app.state.rate_limiter_service.close()
     print("App shutdown, Redis closed, scheduler stopped")
 
 
@@ -0,0 +1,101 @@
+import time
+
+from app.core.metrics.registry import registry
+
+DECISIONS = registry.counter(
+    "rate_limiter_decisions_total",
+    "Rate limiter decisions by rule, algorithm and outcome",
+    ("rule", "algorithm", "decision"),
+)
+FALLBACKS = registry.counter(
+    "rate_limiter_fallback_total",
+    "Checks answered by the failure policy instead of the backend",
+    ("mode",),
+)
+SCRIPT_SECONDS = registry.histogram(
+    "rate_limiter_redis_script_seconds",
+    "Latency of rate limiter Lua script calls",
+    ("script",),
+)
+POOL_WAIT_SECONDS = registry.histogram(
+    "rate_limiter_redis_pool_wait_seconds",
+    "Time spent waiting for a Redis connection from the pool",
+    ("pool",),
+)
+MIDDLEWARE_SECONDS = registry.histogram(
+    "rate_limiter_middleware_seconds",
+    "Time the rate limiter middleware adds to each request",
+)
+
+BREAKER_STATES = ("closed", "open", "half_open")
+
+
+def register_collectors(rate_limiter_service, rules, pools):
+    """Scrape paytida o'qiladigan qiymatlar: hot pathga hech narsa qo'shmaydi"""
+
+    registry.gauge(
+        "rate_limiter_rules_version",
+        "Version of the rule snapshot used by this worker",
+        lambda: [((), rules.snapshot.version)],
+    )
+    registry.gauge(
+        "rate_limiter_rules_age_seconds",
+        "Seconds since the rule snapshot was loaded",
+        lambda: [((), time.time() - rules.snapshot.loaded_at)],
+    )
+    registry.gauge(
+        "rate_limiter_redis_pool_in_use_connections",
+        "Connections currently checked out of the pool",
+        lambda: [((pool.label,), len(pool._in_use_connections)) for pool in pools()],
+        ("pool",),
+    )
+    registry.gauge(
+        "rate_limiter_redis_pool_max_connections",
+        "Pool size limit",
+        lambda: [((pool.label,), pool.max_connections) for pool in pools()],
+        ("pool",),
+    )
+
+    deny_cache = rate_limiter_service.deny_cache
+    if deny_cache is not None:
+        registry.gauge(
+            "rate_limiter_deny_cache_hits_total",
+            "Requests denied from the local deny cache without a backend call",
+            lambda: [((), deny_cache.hits)],
+            kind="counter",
+        )
+        registry.gauge(
+            "rate_limiter_deny_cache_keys",
+            "Keys currently held in the deny cache",
+            lambda: [((), len(deny_cache))],
+        )
+
+    breaker = rate_limiter_service.breaker
+    if breaker is not None:
+        registry.gauge(
+            "rate_limiter_breaker_state",
+            "Circuit breaker state (1 for the current state)",
+            lambda: [((state,), int(breaker.state == state)) for state in BREAKER_STATES],
+            ("state",),
+        )
+        registry.gauge(
+            "rate_limiter_breaker_transitions_total",
+            "Circuit breaker state transitions",
+            lambda: [(tuple(transition.split("->")), count) for transition, count in breaker.transitions.items()],
+            ("from_state", "to_state"),
+            kind="counter",
+        )
+
+    penalty_box = rate_limiter_service.penalty_box
+    if penalty_box is not None:
+        registry.gauge(
+            "rate_limiter_penalty_box_hits_total",
+            "Requests rejected by the penalty box before any algorithm ran",
+            lambda: [((), penalty_box.hits)],
+            kind="counter",
+        )
+        registry.gauge(
+            "rate_limiter_penalty_box_identities",
+            "Identities held in this worker's copy of the penalty box",
+            lambda: [((), len(penalty_box))],
+        )
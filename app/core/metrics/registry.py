@@ -0,0 +1,163 @@
+import bisect
+import math
+from typing import Callable, Iterable, Sequence
+
+# sekundlarda: 100us .. 2.5s
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """Label tuple -> son. Hot path faqat dict'ga qo'shadi, matn scrape paytida yig'iladi"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, labels: tuple = (), amount: float = 1):
+        values = self.values
+        values[labels] = values.get(labels, 0) + amount
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.values.items():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+
+class Gauge:
+    """Qiymat scrape paytida `collect` chaqiruvi orqali olinadi: [(labels, value), ...]"""
+
+    kind = "gauge"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            collect: Callable[[], Iterable[tuple[tuple, float]]],
+            labels: Sequence[str] = (),
+            kind: str = "gauge",
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.collect = collect
+        self.labels = tuple(labels)
+        self.kind = kind  # tashqi hisoblagichlar (DenyCache.hits) uchun "counter"
+
+    def samples(self) -> Iterable[str]:
+        for labels, value in self.collect():
+            yield f"{self.name}{_format_labels(self.labels, labels)} {_format_value(value)}"
+
+
+class _HistogramSeries:
+    __slots__ = ("counts", "total", "count")
+
+    def __init__(self, buckets: int):
+        self.counts = [0] * (buckets + 1)  # oxirgisi +Inf
+        self.total = 0.0
+        self.count = 0
+
+
+class Histogram:
+    """Oldindan belgilangan bucketlar; observe = bisect + uchta qo'shish"""
+
+    kind = "histogram"
+
+    def __init__(
+            self,
+            name: str,
+            documentation: str,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self.series: dict[tuple, _HistogramSeries] = {}
+
+    def observe(self, value: float, labels: tuple = ()):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = _HistogramSeries(len(self.buckets))
+        series.counts[bisect.bisect_left(self.buckets, value)] += 1
+        series.total += value
+        series.count += 1
+
+    def samples(self) -> Iterable[str]:
+        label_names = self.labels + ("le",)
+        for labels, series in self.series.items():
+            cumulative = 0
+            for bound, count in zip((*self.buckets, math.inf), series.counts):
+                cumulative += count
+                yield (
+                    f"{self.name}_bucket{_format_labels(label_names, (*labels, _format_value(bound)))} "
+                    f"{cumulative}"
+                )
+            suffix = _format_labels(self.labels, labels)
+            yield f"{self.name}_sum{suffix} {_format_value(series.total)}"
+            yield f"{self.name}_count{suffix} {series.count}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.metrics: dict[str, Counter | Gauge | Histogram] = {}
+
+    def register(self, metric):
+        # qayta ro'yxatdan o'tkazish (create_app qayta chaqirilsa) eskisini almashtiradi
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labels))
+
+    def histogram(
+            self,
+            name: str,
+            documentation: str,
+            labels: Sequence[str] = (),
+            buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def gauge(
+            self,
+            name: str,
+            documentation: str,
+            collect: Callable[[], Iterable[tuple[tuple, float]]],
+            labels: Sequence[str] = (),
+            kind: str = "gauge",
+    ) -> Gauge:
+        return self.register(Gauge(name, documentation, collect, labels, kind))
+
+    def render(self) -> str:
+        """Prometheus text exposition format 0.0.4"""
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        lines.append("")
+        return "\n".join(lines)
+
+
+registry = MetricsRegistry()
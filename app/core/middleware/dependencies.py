@@ -1,11 +1,135 @@
-from app.repositories.redis import RedisRateLimitRepository
+from app.core.config import settings
+from app.core.interfaces import RateLimitRepository
+from app.repositories.memory import InMemoryRateLimitRepository
+from app.repositories.redis import (
+    RedisRateLimitRepository,
+    ShardedRateLimitRepository,
+    create_redis,
+    create_redis_cluster,
+    redis_client,
+)
+from app.repositories.redis.batching import ScriptBatcher
+from app.repositories.redis.library import FunctionLibrary, ScriptLibrary, create_library
+from app.repositories.shared_memory import SharedMemoryRateLimitRepository
+from app.services.rate_limit.circuit_breaker import CircuitBreaker
+from app.services.rate_limit.deny_cache import DenyCache
+from app.services.rate_limit.heavy_hitters import HeavyHitters
+from app.services.rate_limit.penalty_box import PenaltyBox
+from app.services.rate_limit.leasing import QuotaLeaser
 from app.services.rate_limit.rate_limiter import RateLimiterService
 
 
-def get_rate_limiter_repo() -> RedisRateLimitRepository:
-    return RedisRateLimitRepository()
+def get_script_batcher(redis, library: ScriptLibrary | FunctionLibrary) -> ScriptBatcher | None:
+    if not settings.redis_batching_enabled:
+        return None
+    return ScriptBatcher(
+        redis,
+        library,
+        max_batch=settings.redis_batch_max_size,
+        max_delay=settings.redis_batch_max_delay_ms / 1000,
+    )
+
+
+def get_redis_repo(redis=redis_client) -> RedisRateLimitRepository:
+    # bitta client uchun bitta kutubxona: batcher va repository birga ishlatadi
+    library = create_library(redis, settings.redis_scripts_mode)
+    return RedisRateLimitRepository(redis, batcher=get_script_batcher(redis, library), library=library)
+
+
+def get_shared_memory_repo() -> SharedMemoryRateLimitRepository:
+    return SharedMemoryRateLimitRepository(settings.shared_memory_path, slots=settings.shared_memory_slots)
+
+
+def get_rate_limiter_repo() -> RateLimitRepository:
+    if settings.rate_limit_backend == "memory":
+        return InMemoryRateLimitRepository(max_keys=settings.memory_max_keys)
+    if settings.rate_limit_backend == "shared_memory":
+        return get_shared_memory_repo()
+    if settings.rate_limit_backend != "redis":
+        raise ValueError(f"Unknown rate limit backend: {settings.rate_limit_backend}")
+
+    if settings.redis_mode == "cluster":
+        cluster = create_redis_cluster(settings.redis_cluster_url)
+        return get_redis_repo(cluster)
+    if settings.redis_mode == "sharded":
+        shards = []
+        for dsn in settings.redis_shard_dsns:
+            shards.append(get_redis_repo(create_redis(dsn)))
+        return ShardedRateLimitRepository(shards, names=settings.redis_shard_dsns)
+    if settings.redis_mode != "standalone":
+        raise ValueError(f"Unknown redis mode: {settings.redis_mode}")
+    return get_redis_repo()
+
+
+def get_quota_leaser(repo: RateLimitRepository) -> QuotaLeaser | None:
+    if not settings.rate_limit_leasing_enabled:
+        return None
+    return QuotaLeaser(
+        repo,
+        lease_ttl=settings.rate_limit_lease_ttl,
+        max_fraction=settings.rate_limit_lease_max_fraction,
+        max_keys=settings.rate_limit_lease_max_keys,
+    )
+
+
+def get_deny_cache() -> DenyCache | None:
+    if not settings.rate_limit_deny_cache_enabled:
+        return None
+    return DenyCache(max_keys=settings.rate_limit_deny_cache_max_keys)
+
+
+def get_circuit_breaker() -> CircuitBreaker | None:
+    if settings.rate_limit_backend != "redis":
+        return None
+    return CircuitBreaker(
+        failure_threshold=settings.rate_limit_breaker_failure_threshold,
+        recovery_timeout=settings.rate_limit_breaker_recovery_seconds,
+    )
+
+
+def get_heavy_hitters() -> HeavyHitters | None:
+    if not settings.rate_limit_heavy_hitters_enabled:
+        return None
+    return HeavyHitters(capacity=settings.rate_limit_heavy_hitters_capacity)
+
+
+def get_penalty_box(repo: RateLimitRepository) -> PenaltyBox | None:
+    if not settings.rate_limit_penalty_enabled:
+        return None
+    return PenaltyBox(
+        repo,
+        # memory backendda banlar worker ichida qoladi
+        redis=redis_client if settings.rate_limit_backend == "redis" else None,
+        strikes=settings.rate_limit_penalty_strikes,
+        strike_window=settings.rate_limit_penalty_strike_window,
+        base_ban=settings.rate_limit_penalty_base_seconds,
+        factor=settings.rate_limit_penalty_factor,
+        max_ban=settings.rate_limit_penalty_max_seconds,
+        decay=settings.rate_limit_penalty_decay_seconds,
+    )
+
+
+def get_local_fallback() -> RateLimiterService:
+    # Redis ishlamay qolganda failure_mode="local" qoidalar uchun
+    if settings.rate_limit_local_store == "shared_memory":
+        # host'dagi barcha workerlar bitta hisobda
+        return RateLimiterService(get_shared_memory_repo())
+    if settings.rate_limit_local_store != "memory":
+        raise ValueError(f"Unknown local store: {settings.rate_limit_local_store}")
+    # har worker alohida hisoblaydi
+    return RateLimiterService(InMemoryRateLimitRepository(max_keys=settings.memory_max_keys))
 
 
 def get_rate_limiter_service() -> RateLimiterService:
     repo = get_rate_limiter_repo()
-    return RateLimiterService(repo)
+    breaker = get_circuit_breaker()
+    return RateLimiterService(
+        repo,
+        leaser=get_quota_leaser(repo),
+        deny_cache=get_deny_cache(),
+        breaker=breaker,
+        latency_budget=settings.rate_limit_latency_budget_ms / 1000 or None,
+        fallback=get_local_fallback() if breaker else None,
+        heavy_hitters=get_heavy_hitters(),
+        penalty_box=get_penalty_box(repo),
+    )
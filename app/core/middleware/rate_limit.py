@@ -1,60 +1,132 @@
-import json
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
-from app.repositories.redis import redis_client
+import math
+import time
+from typing import Sequence
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from app.core.config import settings
+from app.core.entities import RateLimitResult
+from app.core.metrics import MIDDLEWARE_SECONDS
 from app.services.rate_limit.rate_limiter import RateLimiterService
-from app.core.entities import RequestInfo, EndpointRateLimitConfig
+from app.services.rate_limit.rule_cache import RuleCache, rule_cache
 from app.utils.logger import logger
-from app.core.config import settings
 
 
-class RateLimiterMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app: ASGIApp, rate_limiter_service: RateLimiterService):
-        super().__init__(app)
+USER_ID_HEADER = b"x-user-id"
+RATE_LIMITED_BODY = b"Rate limit exceeded. Try again later."
+RATE_LIMITED_HEADERS = [
+    (b"content-type", b"text/plain; charset=utf-8"),
+    (b"content-length", str(len(RATE_LIMITED_BODY)).encode()),
+]
+
+
+def retry_after_headers(retry_after: float) -> list[tuple[bytes, bytes]]:
+    # Retry-After standart bo'yicha butun soniya; aniq qiymat Retry-After-Ms'da
+    return [
+        (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+        (b"retry-after-ms", str(max(1, math.ceil(retry_after * 1000))).encode()),
+    ]
+
+
+def quota_headers(result: RateLimitResult) -> list[tuple[bytes, bytes]]:
+    # RateLimit-Reset - kvota to'liq tiklanguncha butun soniya; kvota noma'lum bo'lsa (degraded) yuborilmaydi
+    if result.remaining is None or result.limit is None:
+        return []
+    return [
+        (b"ratelimit-limit", str(result.limit).encode()),
+        (b"ratelimit-remaining", str(result.remaining).encode()),
+        (b"ratelimit-reset", str(math.ceil(result.reset)).encode()),
+    ]
+
+
+def is_exempt(path: str, prefixes: tuple[str, ...]) -> bool:
+    # `/admin` `/admin/...`ni qamraydi, `/administrator`ni emas
+    for prefix in prefixes:
+        if path == prefix or path.startswith(prefix + "/"):
+            return True
+    return False
+
+
+def timing_headers(elapsed: float, rule_label: str) -> list[tuple[bytes, bytes]]:
+    # yuklama testlari limiter vaqtini handler vaqtidan ajratishi uchun
+    return [
+        (b"server-timing", f"ratelimit;dur={elapsed * 1000:.3f}".encode()),
+        (b"x-ratelimit-rule", rule_label.encode()),
+    ]
+
+
+class RateLimiterMiddleware:
+    """
+        Pure ASGI rate limiter.
+        Reads everything it needs from the scope, answers 429 itself without
+        entering the app and hands allowed requests to the app untouched, so
+        streaming responses are not buffered.
+    """
+
+    def __init__(
+            self,
+            app: ASGIApp,
+            rate_limiter_service: RateLimiterService,
+            rules: RuleCache = rule_cache,
+            emit_timing_headers: bool = settings.rate_limit_timing_headers,
+            emit_quota_headers: bool = settings.rate_limit_quota_headers,
+            exempt_paths: Sequence[str] = settings.rate_limit_exempt_paths,
+    ):
+        self.app = app
         self.rate_limiter = rate_limiter_service
-        self.endpoint_limits = {
-            "/api/v1/posts": (3, 10),  # 2/10 soniya
-            "/api/v1/login": (5, 15),  # 5/15 soniya
-        }
-
-    async def dispatch(self, request: Request, call_next):
-        client_ip = request.client.host
-        user_id = request.headers.get("X-User-ID")
-        endpoint = request.url.path
-        method = request.method
-
-        request_info = RequestInfo(
-            client_ip=client_ip,
-            user_id=user_id,
-            endpoint=endpoint,
-            method=method
-        )
+        self.rules = rules
+        self.emit_timing_headers = emit_timing_headers
+        self.emit_quota_headers = emit_quota_headers
+        self.exempt_paths = tuple(path.rstrip("/") for path in exempt_paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or is_exempt(scope["path"], self.exempt_paths):
+            await self.app(scope, receive, send)
+            return
 
-        factory_data = await redis_client.get("rate_limit_rules_v1")
-        if factory_data:
-            raw_config = json.loads(factory_data) or {}
-        else:
-            raw_config = self.endpoint_limits
-        endpoint_config = raw_config.get(endpoint)
-        parsed_config = None
-        if endpoint_config and endpoint_config.get("method") == method:
-            parsed_config = EndpointRateLimitConfig(**endpoint_config)
+        started = time.perf_counter()
+        client = scope.get("client")
+        client_ip = client[0] if client else "unknown"
+        endpoint = scope["path"]
+        method = scope["method"]
 
+        endpoint_config = self.rules.snapshot.match(endpoint, method)
 
-        allowed, retry_after = await self.rate_limiter.is_allowed(
-            request_info=request_info,
-            endpoint_config=parsed_config
+        # headerlar faqat user bo'yicha qoida uchun ko'riladi
+        user_id = None
+        if endpoint_config is not None and endpoint_config.key_type == "user":
+            for name, value in scope["headers"]:
+                if name == USER_ID_HEADER:
+                    user_id = value.decode("latin-1")
+                    break
+
+        result = await self.rate_limiter.check(
+            client_ip, user_id, endpoint, method, endpoint_config
         )
+        elapsed = time.perf_counter() - started
+        MIDDLEWARE_SECONDS.observe(elapsed)
+
+        extra_headers = quota_headers(result) if self.emit_quota_headers else []
+        if self.emit_timing_headers:
+            extra_headers += timing_headers(elapsed, endpoint_config.scope if endpoint_config else "default")
 
-        if not allowed:
+        if not result.allowed:
             logger.warning("Rate limit exceeded",
                            extra={"client_ip": client_ip, "user_id": user_id, "endpoint": endpoint})
-            return Response(
-                status_code=429,
-                headers={"Retry-After": str(retry_after)},
-                content="Rate limit exceeded. Try again later."
-            )
-
-        response = await call_next(request)
-        return response
+            await send({
+                "type": "http.response.start",
+                "status": 429,
+                "headers": RATE_LIMITED_HEADERS + retry_after_headers(result.retry_after) + extra_headers,
+            })
+            await send({"type": "http.response.body", "body": RATE_LIMITED_BODY})
+            return
+
+        if not extra_headers:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_headers(message: Message):
+            if message["type"] == "http.response.start":
+                message = {**message, "headers": [*message.get("headers", ()), *extra_headers]}
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
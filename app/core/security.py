@@ -0,0 +1,32 @@
+import ipaddress
+import secrets
+from typing import Optional
+
+from fastapi import Header, HTTPException, Request, status
+
+from app.core.config import settings
+
+
+def is_local_client(host: Optional[str]) -> bool:
+    # unix socket'da client manzili yo'q
+    if not host:
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+async def require_internal_access(
+    request: Request,
+    x_internal_token: Optional[str] = Header(None),
+):
+    """Ichki endpointlar (/admin, /decisions) uchun: token yoki faqat shu host'dan"""
+    if settings.internal_api_token:
+        if x_internal_token is None or not secrets.compare_digest(
+            x_internal_token.encode(), settings.internal_api_token.encode()
+        ):
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid internal token")
+        return
+    if not is_local_client(request.client.host if request.client else None):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Internal endpoint")
@@ -0,0 +1,24 @@
+"""gcra_algorithm_option
+
+Revision ID: 7ea54ef3291b
+Revises: 31daf1d2d74b
+Create Date: 2026-10-18 11:02:17.384910
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '7ea54ef3291b'
+down_revision = '31daf1d2d74b'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TYPE ratelimitalgorithmoption ADD VALUE IF NOT EXISTS 'GCRA'")
+
+
+def downgrade() -> None:
+    # PostgreSQL enumdan qiymatni o'chirib bo'lmaydi
+    pass
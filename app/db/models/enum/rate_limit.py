@@ -6,6 +6,13 @@ class RateLimitAlgorithmOption(str, enum.Enum):
     SLIDING_WINDOW = "sliding_window"
     SLIDING_LOG = "sliding_window_log"
     TOKEN_BUCKET = "token_bucket"
+    GCRA = "gcra"
+
+
+class RateLimitFailureMode(str, enum.Enum):
+    OPEN = "open"        # Redis ishlamasa ruxsat berish
+    CLOSED = "closed"    # Redis ishlamasa rad etish
+    LOCAL = "local"      # worker xotirasidagi taxminiy limiter
 
 
 class RateLimitKeyOption(str, enum.Enum):
@@ -1,14 +1,16 @@
 from sqlalchemy import (
     String,
     Integer,
+    Float,
     Boolean,
     Enum,
+    JSON,
 
 )
 from sqlalchemy.orm import Mapped, mapped_column
 
 from app.db.models.base.base_model import BaseModel
-from app.db.models.enum.rate_limit import RateLimitAlgorithmOption, RateLimitKeyOption
+from app.db.models.enum.rate_limit import RateLimitAlgorithmOption, RateLimitKeyOption, RateLimitFailureMode
 
 
 class RateLimitRule(BaseModel):
@@ -23,7 +25,7 @@ class RateLimitRule(BaseModel):
     )
 
     limit: Mapped[int] = mapped_column(Integer, nullable=False)
-    window_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    window_seconds: Mapped[float] = mapped_column(Float, nullable=False)
 
     key_type: Mapped[RateLimitKeyOption] = mapped_column(
         Enum(RateLimitKeyOption),
@@ -33,5 +35,14 @@ class RateLimitRule(BaseModel):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
     priority: Mapped[int] = mapped_column(Integer, default=0)
 
+    # qo'shimcha limitlar: [{"limit", "window_seconds", "algorithm"}], hammasi birga tekshiriladi
+    tiers: Mapped[list | None] = mapped_column(JSON, nullable=True)
+
+    # Redis ishlamasa nima qilish; NULL - settings.rate_limit_failure_mode
+    failure_mode: Mapped[RateLimitFailureMode | None] = mapped_column(
+        Enum(RateLimitFailureMode),
+        nullable=True,
+    )
+
     class Config:
         orm_mode = True
@@ -0,0 +1,12 @@
+from .protocol import (
+    STATUS_ALLOWED,
+    STATUS_ERROR,
+    STATUS_LIMITED,
+    DecisionFrame,
+    FrameError,
+    decode_requests,
+    decode_response,
+    encode_request,
+    encode_response,
+)
+from .client import DecisionClient
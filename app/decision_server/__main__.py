@@ -0,0 +1,3 @@
+from app.decision_server.server import main
+
+main()
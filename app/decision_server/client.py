@@ -0,0 +1,70 @@
+import asyncio
+import itertools
+from typing import Optional
+
+from app.decision_server.protocol import (
+    RESPONSE,
+    STATUS_ERROR,
+    STATUS_LIMITED,
+    DecisionFrame,
+    decode_response,
+    encode_request,
+)
+
+
+class DecisionClient:
+    """
+        Pipelining client for the decision socket: any number of coroutines
+        may call `check` concurrently over one connection; a reader task
+        matches responses to waiters by request id.
+    """
+
+    def __init__(self):
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._pending: dict[int, asyncio.Future] = {}
+        self._ids = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    async def connect(self, path: str):
+        self._reader, self._writer = await asyncio.open_unix_connection(path)
+        self._task = asyncio.create_task(self._read_responses())
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+            await self._writer.wait_closed()
+        if self._task is not None:
+            await self._task
+
+    async def check(
+            self,
+            client_ip: str,
+            path: str,
+            method: str = "GET",
+            user_id: Optional[str] = None,
+    ) -> tuple[bool, float]:
+        # id 32 bitda aylanadi
+        request_id = next(self._ids) & 0xFFFFFFFF
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(encode_request(DecisionFrame(request_id, method, path, client_ip, user_id)))
+        await self._writer.drain()
+        status, retry_after = await future
+        if status == STATUS_ERROR:
+            raise RuntimeError("Decision server could not evaluate the request")
+        return status != STATUS_LIMITED, retry_after
+
+    async def _read_responses(self):
+        try:
+            while True:
+                data = await self._reader.readexactly(RESPONSE.size)
+                request_id, status, retry_after = decode_response(data)
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((status, retry_after))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Decision server connection closed"))
+            self._pending.clear()
@@ -0,0 +1,94 @@
+"""
+Binary framing of the decision socket.
+
+Request (big-endian):
+    uint32  length of the rest of the frame
+    uint32  request id (echoed back)
+    uint8   method length, uint16 path length, uint8 client ip length, uint16 user id length
+    bytes   method, path, client ip, user id (utf-8; empty user id - none)
+
+Response, fixed 9 bytes:
+    uint32  request id
+    uint8   status: 0 allowed, 1 limited, 2 error
+    uint32  retry-after in milliseconds
+
+A client may write any number of requests without waiting; responses come
+back in request order on the same connection.
+"""
+import struct
+from dataclasses import dataclass
+from typing import Optional
+
+LENGTH = struct.Struct("!I")
+REQUEST_HEADER = struct.Struct("!IBHBH")
+RESPONSE = struct.Struct("!IBI")
+
+STATUS_ALLOWED = 0
+STATUS_LIMITED = 1
+STATUS_ERROR = 2
+
+
+class FrameError(ValueError):
+    pass
+
+
+@dataclass
+class DecisionFrame:
+    request_id: int
+    method: str
+    path: str
+    client_ip: str
+    user_id: Optional[str] = None
+
+
+def encode_request(request: DecisionFrame) -> bytes:
+    method = request.method.encode()
+    path = request.path.encode()
+    client_ip = request.client_ip.encode()
+    user_id = request.user_id.encode() if request.user_id else b""
+    header = REQUEST_HEADER.pack(request.request_id, len(method), len(path), len(client_ip), len(user_id))
+    body = b"".join((header, method, path, client_ip, user_id))
+    return LENGTH.pack(len(body)) + body
+
+
+def decode_requests(buffer: bytearray, max_frame: int) -> tuple[list[DecisionFrame], int]:
+    """Buferdagi barcha to'liq framelar va ishlatilgan baytlar soni"""
+    requests = []
+    offset = 0
+    view = memoryview(buffer)
+    try:
+        while len(buffer) - offset >= LENGTH.size:
+            (length,) = LENGTH.unpack_from(buffer, offset)
+            if length < REQUEST_HEADER.size or length > max_frame:
+                raise FrameError(f"Invalid frame length: {length}")
+            end = offset + LENGTH.size + length
+            if end > len(buffer):
+                break
+
+            start = offset + LENGTH.size
+            request_id, method_len, path_len, ip_len, user_len = REQUEST_HEADER.unpack_from(buffer, start)
+            if REQUEST_HEADER.size + method_len + path_len + ip_len + user_len != length:
+                raise FrameError("Field lengths do not match frame length")
+            position = start + REQUEST_HEADER.size
+            fields = []
+            for size in (method_len, path_len, ip_len, user_len):
+                fields.append(str(view[position:position + size], "utf-8"))
+                position += size
+            method, path, client_ip, user_id = fields
+            requests.append(DecisionFrame(request_id, method, path, client_ip, user_id or None))
+            offset = end
+    except UnicodeDecodeError as exc:
+        raise FrameError("Invalid utf-8 in frame") from exc
+    finally:
+        # bufer keyin o'zgartiriladi: memoryview ochiq qolmasligi kerak
+        view.release()
+    return requests, offset
+
+
+def encode_response(request_id: int, status: int, retry_after: float) -> bytes:
+    return RESPONSE.pack(request_id, status, min(0xFFFFFFFF, max(0, round(retry_after * 1000))))
+
+
+def decode_response(data: bytes) -> tuple[int, int, float]:
+    request_id, status, retry_after_ms = RESPONSE.unpack(data)
+    return request_id, status, retry_after_ms / 1000
@@ -0,0 +1,125 @@
+"""
+Rate limit decisions over a Unix domain socket.
+
+    python -m app.decision_server --socket /run/rate-limiter/decisions.sock
+
+Serves `RateLimiterService.is_allowed` with the same rule cache, repository
+and settings as the HTTP app, without HTTP parsing, routing or JSON.
+"""
+import argparse
+import asyncio
+import os
+import signal
+
+from app.core.config import settings
+from app.core.entities import RequestInfo
+from app.core.middleware.dependencies import get_rate_limiter_service
+from app.decision_server.protocol import (
+    STATUS_ALLOWED,
+    STATUS_ERROR,
+    STATUS_LIMITED,
+    DecisionFrame,
+    FrameError,
+    decode_requests,
+    encode_response,
+)
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleCache, rule_cache
+from app.utils.logger import logger, setup_logging
+
+
+class DecisionServer:
+    """
+        Every read drains all complete frames from the connection buffer and
+        evaluates them concurrently, so pipelined requests share one Redis
+        pipeline through the script batcher. Responses are written in request
+        order with a single write per read.
+    """
+
+    def __init__(
+            self,
+            rate_limiter_service: RateLimiterService,
+            rules: RuleCache = rule_cache,
+            max_frame: int = settings.decision_socket_max_frame,
+    ):
+        self.rate_limiter = rate_limiter_service
+        self.rules = rules
+        self.max_frame = max_frame
+
+    async def decide(self, request: DecisionFrame) -> bytes:
+        try:
+            endpoint_config = self.rules.snapshot.match(request.path, request.method)
+            result = await self.rate_limiter.is_allowed(
+                RequestInfo(
+                    client_ip=request.client_ip,
+                    user_id=request.user_id,
+                    endpoint=request.path,
+                    method=request.method,
+                ),
+                endpoint_config,
+            )
+        except Exception as exc:
+            logger.warning("Decision failed", extra={"path": request.path, "error": repr(exc)})
+            return encode_response(request.request_id, STATUS_ERROR, 0)
+        status = STATUS_ALLOWED if result.allowed else STATUS_LIMITED
+        return encode_response(request.request_id, status, result.retry_after)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        buffer = bytearray()
+        try:
+            while True:
+                data = await reader.read(65536)
+                if not data:
+                    break
+                buffer += data
+                requests, consumed = decode_requests(buffer, self.max_frame)
+                del buffer[:consumed]
+                if not requests:
+                    continue
+                responses = await asyncio.gather(*(self.decide(request) for request in requests))
+                writer.write(b"".join(responses))
+                await writer.drain()
+        except FrameError as exc:
+            # framing buzilgan: qolgan baytlarni ishonchli o'qib bo'lmaydi
+            logger.warning("Invalid decision frame, closing connection", extra={"error": str(exc)})
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(path: str):
+    setup_logging()
+    rate_limiter_service = get_rate_limiter_service()
+    await rule_cache.start()
+    await rate_limiter_service.start()
+
+    if os.path.exists(path):
+        # oldingi ishga tushirishdan qolgan socket fayli
+        os.unlink(path)
+    decision_server = DecisionServer(rate_limiter_service)
+    server = await asyncio.start_unix_server(decision_server.handle, path=path)
+    os.chmod(path, settings.decision_socket_mode)
+    logger.info("Decision server listening", extra={"socket": path})
+
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, stop.set)
+
+    try:
+        async with server:
+            await stop.wait()
+    finally:
+        await rule_cache.stop()
+        await rate_limiter_service.close()
+        if os.path.exists(path):
+            os.unlink(path)
+        logger.info("Decision server stopped")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--socket", default=settings.decision_socket_path)
+    args = parser.parse_args()
+    asyncio.run(serve(args.socket))
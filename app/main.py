@@ -5,7 +5,10 @@ from app.core.lifespan import lifespan
 from app.core.middleware.rate_limit import RateLimiterMiddleware
 
 from app.core.config import settings
+from app.core.metrics import register_collectors
 from app.core.middleware.dependencies import get_rate_limiter_service
+from app.repositories.redis import MeasuredConnectionPool
+from app.services.rate_limit.rule_cache import rule_cache
 from app.utils.logger import setup_logging
 
 def create_app() -> FastAPI:
@@ -20,7 +23,9 @@ def create_app() -> FastAPI:
 
     # Middleware
     rate_limiter_service = get_rate_limiter_service()
+    app.state.rate_limiter_service = rate_limiter_service
     app.add_middleware(RateLimiterMiddleware, rate_limiter_service=rate_limiter_service)
+    register_collectors(rate_limiter_service, rule_cache, lambda: list(MeasuredConnectionPool.instances))
 
     # Routelar
     app.include_router(api_router)
@@ -0,0 +1 @@
+from .memory_repository import *
\ No newline at end of file
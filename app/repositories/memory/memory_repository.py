@@ -0,0 +1,390 @@
+import bisect
+import math
+import time
+from collections import OrderedDict, deque
+from typing import Sequence, Tuple
+
+from app.core.entities import LimitTier
+from app.core.interfaces import RateLimitRepository
+
+
+class _Counter:
+    __slots__ = ("count", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.count = 0
+        self.expires_at = expires_at
+
+
+class _Log:
+    __slots__ = ("timestamps", "expires_at")
+
+    def __init__(self, expires_at: float):
+        self.timestamps: deque = deque()
+        self.expires_at = expires_at
+
+
+class _WindowCounter:
+    __slots__ = ("slot", "current", "previous", "expires_at")
+
+    def __init__(self, slot: int, expires_at: float):
+        self.slot = slot
+        self.current = 0
+        self.previous = 0
+        self.expires_at = expires_at
+
+
+class _Bucket:
+    __slots__ = ("tokens", "ts", "expires_at")
+
+    def __init__(self, tokens: float, ts: float, expires_at: float):
+        self.tokens = tokens
+        self.ts = ts
+        self.expires_at = expires_at
+
+
+class _ArrivalTime:
+    __slots__ = ("tat", "expires_at")
+
+    def __init__(self, tat: float, expires_at: float):
+        self.tat = tat
+        self.expires_at = expires_at
+
+
+# GCRA qoldig'ini floor qilishdan oldin: window/limit kasri tufayli 2.0 1.999...ga aylanmasin
+_EPSILON = 1e-6
+
+
+def _ms(seconds: float) -> float:
+    """Redis skriptlari kabi millisekundgacha yuqoriga yaxlitlash"""
+    return math.ceil(seconds * 1000) / 1000
+
+
+class InMemoryRateLimitRepository(RateLimitRepository):
+    """
+        Process-local backend with the same semantics as the Redis scripts.
+        State lives in compact __slots__ objects inside a bounded LRU; expired
+        entries are dropped lazily on access and the least recently used key is
+        evicted once `max_keys` is reached, so memory stays flat under high key
+        cardinality. Time comes from the monotonic clock. Every method runs
+        without awaiting, so each check is atomic within the event loop.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._data: "OrderedDict[str, object]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def _get(self, key: str, kind: type, now: float):
+        state = self._data.get(key)
+        if state is None:
+            return None
+        if state.expires_at <= now or not isinstance(state, kind):
+            del self._data[key]
+            return None
+        self._data.move_to_end(key)
+        return state
+
+    def _put(self, key: str, state):
+        self._data[key] = state
+        if len(self._data) > self.max_keys:
+            self._data.popitem(last=False)
+        return state
+
+    # --- fixed window ---
+
+    def _fixed_window(self, key: str, window: float, now: float) -> _Counter:
+        state = self._get(key, _Counter, now)
+        if state is None:
+            state = self._put(key, _Counter(now + window))
+        return state
+
+    async def increment_and_check(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state = self._fixed_window(key, window, now)
+        state.count += 1
+        ttl = _ms(state.expires_at - now)
+        return state.count, ttl, max(0, limit - state.count), ttl
+
+    async def lease_fixed_window(
+            self, key: str, limit: int, window: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state = self._fixed_window(key, window, now)
+        granted = max(0, min(amount, limit - state.count))
+        state.count += granted
+        ttl = _ms(state.expires_at - now)
+        return granted, ttl, max(0, limit - state.count), ttl
+
+    async def release_fixed_window(self, key: str, amount: int) -> None:
+        state = self._get(key, _Counter, self.clock())
+        if state is not None:
+            state.count -= min(amount, state.count)
+
+    # --- sliding window ---
+
+    async def sliding_window_log(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state = self._get(key, _Log, now)
+        if state is None:
+            state = self._put(key, _Log(now + window))
+
+        timestamps = state.timestamps
+        while timestamps and timestamps[0] <= now - window:
+            timestamps.popleft()
+
+        count = len(timestamps)
+        if count < limit:
+            timestamps.append(now)
+            state.expires_at = now + window
+            return count + 1, 0, limit - count - 1, _ms(window)
+        retry_after = max(0.001, _ms(window - (now - timestamps[0])))
+        return count, retry_after, 0, max(0.001, _ms(window - (now - timestamps[-1])))
+
+    def _window_counter(
+            self, key: str, limit: int, window: float, now: float
+    ) -> Tuple[_WindowCounter, bool, float, float]:
+        """(holat, ruxsat, retry_after, taxminiy hisob)"""
+        # window raqami butun son: kasr window'larda ham aniq taqqoslanadi
+        slot = math.floor(now / window)
+        current_start = slot * window
+        state = self._get(key, _WindowCounter, now)
+        if state is None:
+            state = self._put(key, _WindowCounter(slot, now + window * 2))
+        elif state.slot != slot:
+            state.previous = state.current if state.slot == slot - 1 else 0
+            state.current = 0
+            state.slot = slot
+
+        elapsed = now - current_start
+        estimated = state.previous * (window - elapsed) / window + state.current
+        if estimated + 1 <= limit:
+            return state, True, 0, estimated
+
+        wait_time = window - elapsed
+        if state.previous > 0 and state.current + 1 <= limit:
+            wait_time = window - (limit - state.current - 1) * window / state.previous - elapsed
+        elif state.current + 1 > limit:
+            # joriy window o'zi to'la: keyingi windowda u oldingi bo'lib yetarlicha kamayguncha
+            wait_time = (window - elapsed) + window * (1 - (limit - 1) / state.current)
+        return state, False, max(0.001, _ms(wait_time)), estimated
+
+    @staticmethod
+    def _window_reset(state: _WindowCounter, window: float, now: float) -> float:
+        # joriy window hisobi keyingi window oxirigacha, oldingisi shu window oxirigacha ta'sir qiladi
+        reset = (state.slot + 1) * window - now
+        return _ms(reset + window if state.current > 0 else reset)
+
+    async def sliding_window_counter(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state, allowed, wait_time, estimated = self._window_counter(key, limit, window, now)
+        if not allowed:
+            return 0, wait_time, 0, self._window_reset(state, window, now)
+        state.current += 1
+        state.expires_at = now + window * 2
+        return 1, 0, max(0, math.floor(limit - estimated - 1)), self._window_reset(state, window, now)
+
+    # --- buckets ---
+
+    def _token_bucket(self, key: str, capacity: int, refill_rate: float, now: float) -> _Bucket:
+        state = self._get(key, _Bucket, now)
+        if state is None:
+            state = self._put(key, _Bucket(capacity, now, 0))
+        state.tokens = min(capacity, state.tokens + max(0.0, now - state.ts) * refill_rate)
+        state.ts = now
+        state.expires_at = now + capacity / refill_rate * 2
+        return state
+
+    @staticmethod
+    def _bucket_quota(state: _Bucket, capacity: int, refill_rate: float) -> Tuple[int, float]:
+        return math.floor(state.tokens), _ms((capacity - state.tokens) / refill_rate)
+
+    async def token_bucket(self, key: str, capacity: int, refill_rate: float) -> Tuple[int, float, int, float]:
+        state = self._token_bucket(key, capacity, refill_rate, self.clock())
+        if state.tokens >= 1:
+            state.tokens -= 1
+            return 1, 0, *self._bucket_quota(state, capacity, refill_rate)
+        return 0, _ms((1 - state.tokens) / refill_rate), *self._bucket_quota(state, capacity, refill_rate)
+
+    async def lease_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        state = self._token_bucket(key, capacity, refill_rate, self.clock())
+        granted = min(amount, math.floor(state.tokens))
+        if granted > 0:
+            state.tokens -= granted
+            return granted, 0, *self._bucket_quota(state, capacity, refill_rate)
+        return 0, _ms((1 - state.tokens) / refill_rate), *self._bucket_quota(state, capacity, refill_rate)
+
+    async def release_token_bucket(self, key: str, capacity: int, refill_rate: float, amount: int) -> None:
+        state = self._get(key, _Bucket, self.clock())
+        if state is not None:
+            state.tokens = min(capacity, state.tokens + amount)
+
+    async def leaky_bucket(self, key: str, capacity: int, leak_rate: float) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state = self._get(key, _Bucket, now)
+        if state is None:
+            state = self._put(key, _Bucket(0, now, 0))
+        state.tokens = max(0.0, state.tokens - max(0.0, now - state.ts) * leak_rate)
+        state.ts = now
+        state.expires_at = now + capacity / leak_rate * 2
+
+        # kasr bo'sh joy butun so'rovga yetmaydi
+        allowed = state.tokens + 1 <= capacity
+        wait_time = 0
+        if allowed:
+            state.tokens += 1
+        else:
+            wait_time = _ms((state.tokens - capacity + 1) / leak_rate)
+        return int(allowed), wait_time, max(0, math.floor(capacity - state.tokens)), _ms(state.tokens / leak_rate)
+
+    async def gcra(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        now = self.clock()
+        state = self._get(key, _ArrivalTime, now)
+        tat = max(state.tat, now) if state is not None else now
+        interval = window / limit
+        new_tat = tat + interval
+        allow_at = new_tat - window
+        if now < allow_at:
+            return 0, _ms(allow_at - now), 0, _ms(tat - now)
+
+        if state is None:
+            self._put(key, _ArrivalTime(new_tat, new_tat))
+        else:
+            state.tat = state.expires_at = new_tat
+        return 1, 0, max(0, math.floor((now + window - new_tat) / interval + _EPSILON)), _ms(new_tat - now)
+
+    # --- composite ---
+
+    async def multi_limit(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float, int, float, int]:
+        now = self.clock()
+        plans = []
+        retry_after = 0
+        # eng kam kvota qolgan bosqich: (qolgan, reset, indeks)
+        binding = None
+
+        def bind(index: int, left: float, reset: float):
+            nonlocal binding
+            left = max(0, math.floor(left))
+            if binding is None or left < binding[0]:
+                binding = (left, reset, index)
+
+        # 1) tekshirish
+        for index, (algorithm, limit, window) in enumerate(tiers):
+            tier_key = f"{key}:t{index}"
+            if algorithm == "fixed_window":
+                state = self._fixed_window(tier_key, window, now)
+                allowed = state.count + 1 <= limit
+                wait_time = state.expires_at - now
+                bind(index, limit - state.count, wait_time)
+            elif algorithm == "sliding_window":
+                state, allowed, wait_time, estimated = self._window_counter(tier_key, limit, window, now)
+                bind(index, limit - estimated, self._window_reset(state, window, now))
+            elif algorithm == "token_bucket":
+                state = self._token_bucket(tier_key, limit, window, now)
+                allowed = state.tokens >= 1
+                wait_time = (1 - state.tokens) / window
+                bind(index, state.tokens, (limit - state.tokens) / window)
+            else:
+                raise ValueError(f"Unknown tier algorithm: {algorithm}")
+
+            plans.append((algorithm, state, limit, window))
+            if not allowed:
+                retry_after = max(retry_after, max(0.001, _ms(wait_time)))
+
+        if retry_after:
+            return 0, retry_after, binding[0], _ms(binding[1]), binding[2]
+
+        # 2) hammasi ruxsat berdi
+        binding = None
+        for index, (algorithm, state, limit, window) in enumerate(plans):
+            if algorithm == "fixed_window":
+                state.count += 1
+                bind(index, limit - state.count, state.expires_at - now)
+            elif algorithm == "sliding_window":
+                state.current += 1
+                state.expires_at = now + window * 2
+                elapsed = now - state.slot * window
+                estimated = state.previous * (window - elapsed) / window + state.current
+                bind(index, limit - estimated, self._window_reset(state, window, now))
+            else:
+                state.tokens -= 1
+                bind(index, state.tokens, (limit - state.tokens) / window)
+        return 1, 0, binding[0], _ms(binding[1]), binding[2]
+
+    # --- peek: holat o'zgartirilmaydi ---
+
+    def _peek(self, key: str, algorithm: str, limit: int, window: float, now: float) -> Tuple[int, float]:
+        wait_time = 0.0
+        if algorithm == "fixed_window":
+            state = self._get(key, _Counter, now)
+            left = limit - (state.count if state is not None else 0)
+            if left < 1:
+                wait_time = state.expires_at - now
+        elif algorithm == "sliding_window_log":
+            state = self._get(key, _Log, now)
+            timestamps = state.timestamps if state is not None else ()
+            start = bisect.bisect_right(timestamps, now - window)
+            left = limit - (len(timestamps) - start)
+            if left < 1:
+                wait_time = window - (now - timestamps[start])
+        elif algorithm == "sliding_window":
+            slot = math.floor(now / window)
+            state = self._get(key, _WindowCounter, now)
+            current = previous = 0
+            if state is not None and state.slot == slot:
+                current, previous = state.current, state.previous
+            elif state is not None and state.slot == slot - 1:
+                previous = state.current
+            elapsed = now - slot * window
+            left = math.floor(limit - previous * (window - elapsed) / window - current)
+            if left < 1:
+                wait_time = window - elapsed
+                if previous > 0 and current + 1 <= limit:
+                    wait_time = window - (limit - current - 1) * window / previous - elapsed
+                elif current + 1 > limit:
+                    wait_time = (window - elapsed) + window * (1 - (limit - 1) / current)
+        elif algorithm == "token_bucket":
+            state = self._get(key, _Bucket, now)
+            tokens = limit
+            if state is not None:
+                tokens = min(limit, state.tokens + max(0.0, now - state.ts) * window)
+            left = math.floor(tokens)
+            if left < 1:
+                wait_time = (1 - tokens) / window
+        elif algorithm == "leaky_bucket":
+            state = self._get(key, _Bucket, now)
+            tokens = 0
+            if state is not None:
+                tokens = max(0.0, state.tokens - max(0.0, now - state.ts) * window)
+            left = math.floor(limit - tokens)
+            if left < 1:
+                wait_time = (tokens - limit + 1) / window
+        elif algorithm == "gcra":
+            state = self._get(key, _ArrivalTime, now)
+            tat = max(state.tat, now) if state is not None else now
+            interval = window / limit
+            left = math.floor((now + window - tat) / interval + _EPSILON)
+            if left < 1:
+                wait_time = tat + interval - window - now
+        else:
+            raise ValueError(f"Unknown algorithm: {algorithm}")
+
+        if left < 1:
+            return 0, max(0.001, _ms(wait_time))
+        return left, 0
+
+    async def peek(self, key: str, algorithm: str, limit: int, window: float) -> Tuple[int, float]:
+        return self._peek(key, algorithm, limit, window, self.clock())
+
+    async def peek_multi(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float]:
+        now = self.clock()
+        results = [
+            self._peek(f"{key}:t{index}", algorithm, limit, window, now)
+            for index, (algorithm, limit, window) in enumerate(tiers)
+        ]
+        return min(left for left, _ in results), max(wait_time for _, wait_time in results)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from typing import List, Any, Sequence
 
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -35,6 +36,20 @@ class RateLimitRepository:
         )
         return result.scalars().all()
 
+    async def get_changed_since(self, watermark: datetime | None) -> Sequence[RateLimitRule]:
+        """`updated_at >= watermark` bo'lgan qoidalar (faol bo'lmaganlari ham), None - hammasi"""
+        query = select(RateLimitRule).order_by(RateLimitRule.updated_at)
+        if watermark is not None:
+            query = query.where(RateLimitRule.updated_at >= watermark)
+        result = await self.db.execute(query)
+        return result.scalars().all()
+
+    async def get_active_ids(self) -> set[int]:
+        result = await self.db.execute(
+            select(RateLimitRule.id).where(RateLimitRule.is_active == True)
+        )
+        return set(result.scalars().all())
+
     async def update(self, rule: RateLimitRule, data: RateLimitUpdate) -> RateLimitRule:
         for key, value in data.model_dump(exclude_unset=True).items():
             setattr(rule, key, value)
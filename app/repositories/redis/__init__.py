@@ -1,2 +1,3 @@
 from .redis_client import *
-from .redis_repository import *
\ No newline at end of file
+from .redis_repository import *
+from .sharded_repository import *
\ No newline at end of file
@@ -0,0 +1,111 @@
+import asyncio
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Optional
+
+from redis.asyncio import Redis
+
+from app.repositories.redis.library import FunctionLibrary, ScriptLibrary
+
+# bulk so'rovlar: shu kontekstdagi (va undan gather qilingan) chaqiruvlar bitta pipeline'ga yig'iladi
+_bulk_pipeline: ContextVar[bool] = ContextVar("bulk_pipeline", default=False)
+
+
+@contextmanager
+def bulk_pipeline():
+    token = _bulk_pipeline.set(True)
+    try:
+        yield
+    finally:
+        _bulk_pipeline.reset(token)
+
+
+def in_bulk_pipeline() -> bool:
+    return _bulk_pipeline.get()
+
+
+class ScriptBatcher:
+    """
+        Collects script calls issued at (nearly) the same moment and sends them
+        as one non-transactional FCALL/EVALSHA pipeline on a single connection.
+        With `max_delay=0` a batch holds exactly the calls made during one
+        event-loop iteration, so no latency is added; a positive delay trades
+        a little latency for bigger batches. `max_batch` flushes early.
+    """
+
+    def __init__(
+            self,
+            redis: Redis,
+            library: ScriptLibrary | FunctionLibrary,
+            max_batch: int = 100,
+            max_delay: float = 0.0,
+    ):
+        self.redis = redis
+        self.library = library
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self._queue: list[tuple[str, list, list, asyncio.Future]] = []
+        self._handle: Optional[asyncio.Handle] = None
+        self._tasks: set[asyncio.Task] = set()
+
+    def submit(self, name: str, keys: list, args: list) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((name, keys, args, future))
+
+        if len(self._queue) >= self.max_batch:
+            self.flush()
+        elif self._handle is None:
+            if self.max_delay > 0:
+                self._handle = loop.call_later(self.max_delay, self.flush)
+            else:
+                self._handle = loop.call_soon(self.flush)
+        return future
+
+    def flush(self):
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        batch, self._queue = self._queue, []
+        if batch:
+            task = asyncio.ensure_future(self._execute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _execute(self, batch: list, retried: bool = False):
+        try:
+            # pipe.scripts ishlatilmaydi: u har execute'da SCRIPT EXISTS yuboradi
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for name, keys, args, _ in batch:
+                    pipe.execute_command(*self.library.command(name, keys, args))
+                results = await pipe.execute(raise_on_error=False)
+        except Exception as exc:
+            for *_, future in batch:
+                _resolve(future, exc)
+            return
+
+        missing = []
+        for item, result in zip(batch, results):
+            if not retried and self.library.is_missing(result):
+                missing.append(item)
+            else:
+                _resolve(item[3], result)
+
+        if missing:
+            # Redis restart/failover/flushdan keyin skriptlarni qayta yuklash
+            try:
+                await self.library.load()
+            except Exception as exc:
+                for *_, future in missing:
+                    _resolve(future, exc)
+                return
+            await self._execute(missing, retried=True)
+
+
+def _resolve(future: asyncio.Future, result: Any):
+    if future.done():
+        return
+    if isinstance(result, BaseException):
+        future.set_exception(result)
+    else:
+        future.set_result(result)
@@ -0,0 +1,117 @@
+import hashlib
+from typing import Any, Mapping
+
+from redis.asyncio import Redis
+from redis.exceptions import NoScriptError, ResponseError
+
+from app.repositories.redis.scripts import SCRIPTS
+from app.utils.logger import logger
+
+LIBRARY_NAME = "ratelimiter"
+# skriptlar o'zgarsa versiya ham o'zgaradi, startupda eski kutubxona almashtiriladi
+LIBRARY_VERSION = hashlib.sha1("".join(SCRIPTS[name] for name in sorted(SCRIPTS)).encode()).hexdigest()[:12]
+
+
+def function_name(name: str) -> str:
+    return f"{LIBRARY_NAME}_{name}"
+
+
+def build_library(scripts: Mapping[str, str] = SCRIPTS, version: str = LIBRARY_VERSION) -> str:
+    """Har bir skript tanasi `function(KEYS, ARGV)` ichiga o'raladi"""
+    parts = [f"#!lua name={LIBRARY_NAME}\n"]
+    for name, body in scripts.items():
+        parts.append(f"redis.register_function('{function_name(name)}', function(KEYS, ARGV)\n{body}end)\n")
+    parts.append(f"redis.register_function('{function_name('version')}', function() return '{version}' end)\n")
+    return "\n".join(parts)
+
+
+class ScriptLibrary:
+    """
+        EVALSHA mode (Redis < 7): scripts are SCRIPT LOADed up front by
+        `prepare`, and reloaded once if a call reports NOSCRIPT.
+    """
+
+    def __init__(self, redis: Redis, scripts: Mapping[str, str] = SCRIPTS):
+        self.redis = redis
+        self.scripts = {name: redis.register_script(body) for name, body in scripts.items()}
+
+    def command(self, name: str, keys: list, args: list) -> tuple:
+        return "EVALSHA", self.scripts[name].sha, len(keys), *keys, *args
+
+    @staticmethod
+    def is_missing(error: BaseException) -> bool:
+        return isinstance(error, NoScriptError)
+
+    async def load(self):
+        for script in self.scripts.values():
+            script.sha = await self.redis.script_load(script.script)
+
+    async def prepare(self):
+        await self.load()
+
+    async def call(self, name: str, keys: list, args: list) -> Any:
+        # AsyncScript NOSCRIPTda o'zi qayta yuklaydi
+        return await self.scripts[name](keys=keys, args=args)
+
+
+class FunctionLibrary:
+    """
+        Redis Functions mode: one versioned library (FUNCTION LOAD), called with
+        FCALL. Functions survive restarts with persistence and are replicated,
+        so there is no per-connection or post-failover cold start; if a node
+        still answers "Function not found" the library is loaded again and the
+        call retried once.
+    """
+
+    def __init__(self, redis: Redis, scripts: Mapping[str, str] = SCRIPTS, version: str = LIBRARY_VERSION):
+        self.redis = redis
+        self.version = version
+        self.code = build_library(scripts, version)
+        self.functions = {name: function_name(name) for name in scripts}
+
+    def command(self, name: str, keys: list, args: list) -> tuple:
+        return "FCALL", self.functions[name], len(keys), *keys, *args
+
+    @staticmethod
+    def is_missing(error: BaseException) -> bool:
+        return isinstance(error, ResponseError) and "function not found" in str(error).lower()
+
+    async def load(self):
+        # cluster'da FUNCTION LOAD barcha primary nodelarga yuboriladi
+        await self.redis.function_load(self.code, replace=True)
+        logger.info("Rate limiter function library loaded", extra={"version": self.version})
+
+    async def loaded_version(self) -> str | None:
+        try:
+            version = await self.redis.fcall(function_name("version"), 0)
+        except ResponseError as exc:
+            if self.is_missing(exc):
+                return None
+            raise
+        return version.decode() if isinstance(version, bytes) else version
+
+    async def prepare(self):
+        """Startupda: kutubxona yo'q yoki boshqa versiya bo'lsa qayta yuklanadi"""
+        loaded = await self.loaded_version()
+        if loaded != self.version:
+            logger.info("Rate limiter function library outdated", extra={"loaded": loaded, "expected": self.version})
+            await self.load()
+
+    async def call(self, name: str, keys: list, args: list) -> Any:
+        command = self.command(name, keys, args)
+        try:
+            return await self.redis.execute_command(*command)
+        except ResponseError as exc:
+            if not self.is_missing(exc):
+                raise
+        # failover/FUNCTION FLUSH'dan keyin
+        await self.load()
+        return await self.redis.execute_command(*command)
+
+
+def create_library(redis: Redis, mode: str) -> ScriptLibrary | FunctionLibrary:
+    if mode == "functions":
+        return FunctionLibrary(redis)
+    if mode == "eval":
+        return ScriptLibrary(redis)
+    raise ValueError(f"Unknown redis scripts mode: {mode}")
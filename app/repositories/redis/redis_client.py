@@ -1,6 +1,45 @@
-from redis.asyncio import Redis, ConnectionPool
+import time
+import weakref
+from redis.asyncio import Redis, BlockingConnectionPool
+from redis.asyncio.cluster import RedisCluster
 from app.core.config import settings
+from app.core.metrics import POOL_WAIT_SECONDS
 
 
-pool = ConnectionPool.from_url(str(settings.redis_dsn), max_connections=settings.redis_pool_size)
-redis_client = Redis.from_pool(pool)
+class MeasuredConnectionPool(BlockingConnectionPool):
+    """Connection kutish vaqtini yozadi; band connectionlar /metrics'da ko'rinadi"""
+
+    instances: "weakref.WeakSet[MeasuredConnectionPool]" = weakref.WeakSet()
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        kwargs = self.connection_kwargs
+        self.label = f"{kwargs.get('host', kwargs.get('path', ''))}:{kwargs.get('port', '')}/{kwargs.get('db', 0)}"
+        self._wait_labels = (self.label,)
+        MeasuredConnectionPool.instances.add(self)
+
+    async def get_connection(self, command_name, *keys, **options):
+        started = time.perf_counter()
+        try:
+            return await super().get_connection(command_name, *keys, **options)
+        finally:
+            POOL_WAIT_SECONDS.observe(time.perf_counter() - started, self._wait_labels)
+
+
+def create_redis(dsn: str) -> Redis:
+    # pool to'lsa xato o'rniga bo'sh connection kutiladi
+    pool = MeasuredConnectionPool.from_url(
+        dsn,
+        max_connections=settings.redis_pool_size,
+        timeout=settings.redis_pool_timeout,
+    )
+    return Redis.from_pool(pool)
+
+
+def create_redis_cluster(url: str) -> RedisCluster:
+    # slotlar xaritasi birinchi buyruqda olinadi, EVALSHA kalit slotiga yo'naltiriladi
+    return RedisCluster.from_url(url, max_connections=settings.redis_pool_size)
+
+
+redis_client = create_redis(str(settings.redis_dsn))
+pool = redis_client.connection_pool
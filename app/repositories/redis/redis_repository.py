@@ -1,174 +1,155 @@
-from typing import Tuple
+import time
+from typing import Optional, Sequence, Tuple
 from redis.asyncio import Redis
+from app.core.config import settings
+from app.core.entities import LimitTier
+from app.core.metrics import SCRIPT_SECONDS
 from app.core.interfaces import RateLimitRepository
+from app.repositories.redis.batching import ScriptBatcher, in_bulk_pipeline
+from app.repositories.redis.library import FunctionLibrary, ScriptLibrary, create_library
+from app.repositories.redis.scripts import SCRIPTS
 from app.repositories.redis.redis_client import redis_client
 
 
 class RedisRateLimitRepository(RateLimitRepository):
-    def __init__(self, redis: Redis = redis_client):
+    def __init__(
+            self,
+            redis: Redis = redis_client,
+            batcher: Optional[ScriptBatcher] = None,
+            library: Optional[ScriptLibrary | FunctionLibrary] = None,
+    ):
         self.redis = redis
-        self._init_scripts()
-
-    def _init_scripts(self):
-        self.fixed_window_script = self.redis.register_script("""
-            local key = KEYS[1]
-            local limit = tonumber(ARGV[1])
-            local window = tonumber(ARGV[2])
-    
-            local current = redis.call('INCR', key)
-    
-            if current == 1 then
-                redis.call('EXPIRE', key, window)
-            end
-    
-            local ttl = redis.call('TTL', key)
-    
-            return {current, ttl}
-        """)
-
-        self.sliding_window_script = self.redis.register_script("""
-            local key = KEYS[1]
-            local limit = tonumber(ARGV[1])
-            local window = tonumber(ARGV[2])
-    
-            local now = redis.call('TIME')[1]
-    
-            -- eski yozuvlarni tozalash
-            redis.call('ZREMRANGEBYSCORE', key, 0, now - window)
-    
-            local count = redis.call('ZCARD', key)
-    
-            if count < limit then
-                local counter_key = key .. ':counter'
-                local unique = redis.call('INCR', counter_key)
-                local member = now .. '-' .. unique
-    
-                redis.call('ZADD', key, now, member)
-                redis.call('EXPIRE', key, window)
-                redis.call('EXPIRE', counter_key, window)
-    
-                return {count + 1, 0}
-            else
-                local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
-                local ttl = math.ceil(window - (now - tonumber(oldest[2])))
-                return {count, ttl}
-            end
-        """)
-
-        self.token_bucket_script = self.redis.register_script("""
-            local key = KEYS[1]
-            local capacity = tonumber(ARGV[1])
-            local refill_rate = tonumber(ARGV[2])
-    
-            local now = redis.call('TIME')[1]
-    
-            local tokens_key = key .. ':tokens'
-            local ts_key = key .. ':ts'
-    
-            local tokens = tonumber(redis.call('GET', tokens_key) or capacity)
-            local last_refill = tonumber(redis.call('GET', ts_key) or now)
-    
-            local delta = math.max(0, now - last_refill)
-            local refill = delta * refill_rate
-            tokens = math.min(capacity, tokens + refill)
-    
-            local allowed = 0
-            local wait_time = 0
-    
-            if tokens >= 1 then
-                tokens = tokens - 1
-                allowed = 1
-            else
-                wait_time = math.ceil((1 - tokens) / refill_rate)
-            end
-    
-            local ttl = math.ceil(capacity / refill_rate * 2)
-    
-            redis.call('SETEX', tokens_key, ttl, tokens)
-            redis.call('SETEX', ts_key, ttl, now)
-    
-            return {allowed, wait_time}
-        """)
-
-        self.leaky_bucket_script = self.redis.register_script("""
-            local key = KEYS[1]
-            local capacity = tonumber(ARGV[1])
-            local leak_rate = tonumber(ARGV[2])
-    
-            local now = redis.call('TIME')[1]
-    
-            local tokens_key = key .. ':tokens'
-            local last_leak_key = key .. ':last_leak'
-    
-            local tokens = tonumber(redis.call('GET', tokens_key) or 0)
-            local last_leak = tonumber(redis.call('GET', last_leak_key) or now)
-    
-            local delta = math.max(0, now - last_leak)
-            tokens = math.max(0, tokens - delta * leak_rate)
-    
-            local allowed = 0
-            local wait_time = 0
-    
-            if tokens < capacity then
-                tokens = tokens + 1
-                allowed = 1
-            else
-                wait_time = math.ceil((tokens - capacity + 1) / leak_rate)
-            end
-    
-            local ttl = math.ceil(capacity / leak_rate * 2)
-    
-            redis.call('SETEX', tokens_key, ttl, tokens)
-            redis.call('SETEX', last_leak_key, ttl, now)
-    
-            return {allowed, wait_time}
-        """)
+        self.batcher = batcher
+        self.library = library or create_library(redis, settings.redis_scripts_mode)
+        # bulk API uchun: hajm cheklanmagan, batching o'chirilgan bo'lsa ham ishlaydi
+        self.bulk_batcher = ScriptBatcher(redis, self.library, max_batch=settings.rate_limit_bulk_max_items)
+        # metrikalar uchun: har chaqiruvda label tuple yaratilmaydi
+        self._script_labels = {name: (name,) for name in SCRIPTS}
+
+    async def prepare(self):
+        await self.library.prepare()
+
+    async def _run(self, name: str, keys: list, args: list):
+        started = time.perf_counter()
+        try:
+            if in_bulk_pipeline():
+                return await self.bulk_batcher.submit(name, keys, args)
+            if self.batcher is not None:
+                return await self.batcher.submit(name, keys, args)
+            return await self.library.call(name, keys, args)
+        finally:
+            SCRIPT_SECONDS.observe(time.perf_counter() - started, self._script_labels[name])
 
     async def increment_and_check(
-            self, key: str, limit: int, window: int
-    ) -> Tuple[int, int]:
+            self, key: str, limit: int, window: float
+    ) -> Tuple[int, float, int, float]:
         """
         Fixed window
-        returns: (current_count, ttl)
+        returns: (current_count, ttl, remaining, reset)
         """
-        result = await self.fixed_window_script(
-            keys=[key],
-            args=[limit, window],
-        )
-        return int(result[0]), int(result[1])
+        result = await self._run("fixed_window", [key], [limit, window])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
 
     async def sliding_window_log(
-            self, key: str, limit: int, window: int
-    ) -> Tuple[int, int]:
+            self, key: str, limit: int, window: float
+    ) -> Tuple[int, float, int, float]:
         """
-        returns: (current_count, retry_after)
+        returns: (current_count, retry_after, remaining, reset)
         """
-        result = await self.sliding_window_script(
-            keys=[key],
-            args=[limit, window],
-        )
-        return int(result[0]), int(result[1])
+        result = await self._run("sliding_window", [key], [limit, window])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
+
+    async def sliding_window_counter(
+            self, key: str, limit: int, window: float
+    ) -> Tuple[int, float, int, float]:
+        """
+        returns: (allowed, retry_after, remaining, reset)
+        """
+        result = await self._run("sliding_window_counter", [key], [limit, window])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
 
     async def token_bucket(
             self, key: str, capacity: int, refill_rate: float
-    ) -> Tuple[int, float]:
+    ) -> Tuple[int, float, int, float]:
         """
-        returns: (allowed, retry_after)
+        returns: (allowed, retry_after, remaining, reset)
         """
-        result = await self.token_bucket_script(
-            keys=[key],
-            args=[capacity, refill_rate],
-        )
-        return int(result[0]), float(result[1])
+        result = await self._run("token_bucket", [key], [capacity, refill_rate])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
+
+    async def gcra(
+            self, key: str, limit: int, window: float
+    ) -> Tuple[int, float, int, float]:
+        """
+        returns: (allowed, retry_after, remaining, reset)
+        """
+        result = await self._run("gcra", [key], [limit, window])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
 
     async def leaky_bucket(
             self, key: str, capacity: int, leak_rate: float
-    ) -> Tuple[int, float]:
+    ) -> Tuple[int, float, int, float]:
+        """
+        returns: (allowed, retry_after, remaining, reset)
+        """
+        result = await self._run("leaky_bucket", [key], [capacity, leak_rate])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
+
+    async def multi_limit(
+            self, key: str, tiers: Sequence[LimitTier]
+    ) -> Tuple[int, float, int, float, int]:
         """
-        returns: (allowed, retry_after)
+        returns: (allowed, retry_after, remaining, reset, tier)
         """
-        result = await self.leaky_bucket_script(
-            keys=[key],
-            args=[capacity, leak_rate],
+        keys = [f"{key}:t{index}" for index in range(len(tiers))]
+        args = [value for tier in tiers for value in tier]
+        result = await self._run("multi_limit", keys, args)
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000, int(result[4])
+
+    async def lease_fixed_window(
+            self, key: str, limit: int, window: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        """
+        returns: (granted, ttl, remaining, reset)
+        """
+        result = await self._run("lease_fixed_window", [key], [limit, window, amount])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
+
+    async def release_fixed_window(self, key: str, amount: int) -> None:
+        await self._run("release_fixed_window", [key], [amount])
+
+    async def lease_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        """
+        returns: (granted, retry_after, remaining, reset)
+        """
+        result = await self._run(
+            "lease_token_bucket", [key], [capacity, refill_rate, amount]
         )
-        return int(result[0]), float(result[1])
+        return int(result[0]), int(result[1]) / 1000, int(result[2]), int(result[3]) / 1000
+
+    async def release_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> None:
+        await self._run("release_token_bucket", [key], [capacity, refill_rate, amount])
+
+    async def peek(
+            self, key: str, algorithm: str, limit: int, window: float
+    ) -> Tuple[int, float]:
+        """
+        returns: (remaining, retry_after)
+        """
+        result = await self._run("peek", [key], [algorithm, limit, window])
+        return int(result[0]), int(result[1]) / 1000
+
+    async def peek_multi(
+            self, key: str, tiers: Sequence[LimitTier]
+    ) -> Tuple[int, float]:
+        """
+        returns: (remaining, retry_after)
+        """
+        keys = [f"{key}:t{index}" for index in range(len(tiers))]
+        args = [value for tier in tiers for value in tier]
+        result = await self._run("peek", keys, args)
+        return int(result[0]), int(result[1]) / 1000
@@ -0,0 +1,526 @@
+"""
+Lua sources of the limiter scripts.
+
+Each body reads KEYS/ARGV, so the same text runs through EVALSHA and, wrapped
+as `function(KEYS, ARGV)`, inside the Redis Functions library.
+Clocks come from microsecond TIME; durations are returned in milliseconds
+because Redis truncates Lua numbers to integers in replies.
+
+Decision and lease scripts return `{result, wait, remaining, reset}`: besides
+their own result and wait/TTL, the quota left after this call and the time
+until the quota is fully restored, so RateLimit-* headers need no extra call.
+"""
+
+FIXED_WINDOW = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+
+    local current = redis.call('INCR', key)
+
+    if current == 1 then
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+    end
+
+    local ttl = redis.call('PTTL', key)
+
+    return {current, ttl, math.max(0, limit - current), ttl}
+"""
+
+SLIDING_WINDOW = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+    -- eski yozuvlarni tozalash (tostring 14 xonagacha qisqartiradi, mikrosekund uchun format)
+    redis.call('ZREMRANGEBYSCORE', key, 0, string.format('%.6f', now - window))
+
+    local count = redis.call('ZCARD', key)
+
+    if count < limit then
+        -- alohida counter kaliti o'rniga: mikrosekund + joriy soni yagona bo'ladi
+        local member = time[1] .. '.' .. time[2] .. '-' .. count
+
+        redis.call('ZADD', key, string.format('%.6f', now), member)
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+
+        -- eng yangi yozuv hozirgi so'rov: kvota bitta window'dan keyin to'liq
+        return {count + 1, 0, limit - count - 1, math.ceil(window * 1000)}
+    else
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        local newest = redis.call('ZRANGE', key, -1, -1, 'WITHSCORES')
+        local ttl = math.ceil((window - (now - tonumber(oldest[2]))) * 1000)
+        local reset = math.ceil((window - (now - tonumber(newest[2]))) * 1000)
+        return {count, math.max(1, ttl), 0, math.max(1, reset)}
+    end
+"""
+
+SLIDING_WINDOW_COUNTER = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    -- window raqami butun son: kasr window'larda ham aniq taqqoslanadi
+    local slot = math.floor(now / window)
+    local current_start = slot * window
+
+    -- bitta hash: joriy window raqami, joriy va oldingi window hisoblari
+    local state = redis.call('HMGET', key, 'slot', 'current', 'previous')
+    local last_slot = tonumber(state[1])
+    local current = tonumber(state[2] or 0)
+    local previous = tonumber(state[3] or 0)
+
+    if last_slot ~= slot then
+        if last_slot == slot - 1 then
+            previous = current
+        else
+            previous = 0
+        end
+        current = 0
+    end
+
+    local elapsed = now - current_start
+    local estimated = previous * (window - elapsed) / window + current
+
+    if estimated + 1 > limit then
+        local wait_time = window - elapsed
+        if previous > 0 and current + 1 <= limit then
+            -- oldingi window og'irligi yetarlicha kamayguncha
+            wait_time = window - (limit - current - 1) * window / previous - elapsed
+        elseif current + 1 > limit then
+            -- joriy window o'zi to'la: keyingi windowda u oldingi bo'lib yetarlicha kamayguncha
+            wait_time = (window - elapsed) + window * (1 - (limit - 1) / current)
+        end
+        -- joriy window hisobi keyingi window oxirigacha, oldingisi shu window oxirigacha ta'sir qiladi
+        local reset = current_start + window - now
+        if current > 0 then
+            reset = reset + window
+        end
+        return {0, math.max(1, math.ceil(wait_time * 1000)), 0, math.ceil(reset * 1000)}
+    end
+
+    redis.call('HSET', key, 'slot', slot, 'current', current + 1, 'previous', previous)
+    redis.call('PEXPIRE', key, math.ceil(window * 2000))
+
+    local remaining = math.max(0, math.floor(limit - estimated - 1))
+    return {1, 0, remaining, math.ceil((current_start + 2 * window - now) * 1000)}
+"""
+
+TOKEN_BUCKET = """
+    local key = KEYS[1]
+    local capacity = tonumber(ARGV[1])
+    local refill_rate = tonumber(ARGV[2])
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+    -- holat bitta hashda (listpack)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local last_refill = tonumber(state[2])
+    tokens = tokens or capacity
+    last_refill = last_refill or now
+
+    local delta = math.max(0, now - last_refill)
+    local refill = delta * refill_rate
+    tokens = math.min(capacity, tokens + refill)
+
+    local allowed = 0
+    local wait_time = 0
+
+    if tokens >= 1 then
+        tokens = tokens - 1
+        allowed = 1
+    else
+        wait_time = math.ceil((1 - tokens) / refill_rate * 1000)
+    end
+
+    redis.call('HSET', key, 'tokens', tokens, 'ts', string.format('%.6f', now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / refill_rate * 2000))
+
+    return {allowed, wait_time, math.floor(tokens), math.ceil((capacity - tokens) / refill_rate * 1000)}
+"""
+
+GCRA = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2]) * 1000
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) * 1000 + tonumber(time[2]) / 1000
+
+    -- yagona holat: theoretical arrival time (ms)
+    local emission_interval = window / limit
+    local tat = math.max(tonumber(redis.call('GET', key) or now), now)
+    local new_tat = tat + emission_interval
+    local allow_at = new_tat - window
+
+    if now < allow_at then
+        return {0, math.ceil(allow_at - now), 0, math.ceil(tat - now)}
+    end
+
+    redis.call('SET', key, string.format('%.3f', new_tat), 'PX', math.ceil(new_tat - now))
+    -- TAT hozirgi vaqtga qaytguncha kvota to'liq emas; epsilon - window/limit kasrining yaxlitlash xatosi
+    local remaining = math.floor((now + window - new_tat) / emission_interval + 1e-6)
+    return {1, 0, math.max(0, remaining), math.ceil(new_tat - now)}
+"""
+
+LEAKY_BUCKET = """
+    local key = KEYS[1]
+    local capacity = tonumber(ARGV[1])
+    local leak_rate = tonumber(ARGV[2])
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+    -- holat bitta hashda (listpack)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local last_leak = tonumber(state[2])
+    tokens = tokens or 0
+    last_leak = last_leak or now
+
+    local delta = math.max(0, now - last_leak)
+    tokens = math.max(0, tokens - delta * leak_rate)
+
+    local allowed = 0
+    local wait_time = 0
+
+    -- mikrosekund aniqlikdagi vaqt: kasr bo'sh joy butun so'rovga yetmaydi
+    if tokens + 1 <= capacity then
+        tokens = tokens + 1
+        allowed = 1
+    else
+        wait_time = math.ceil((tokens - capacity + 1) / leak_rate * 1000)
+    end
+
+    redis.call('HSET', key, 'tokens', tokens, 'ts', string.format('%.6f', now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / leak_rate * 2000))
+
+    return {allowed, wait_time, math.max(0, math.floor(capacity - tokens)), math.ceil(tokens / leak_rate * 1000)}
+"""
+
+LEASE_FIXED_WINDOW = """
+    local key = KEYS[1]
+    local limit = tonumber(ARGV[1])
+    local window = tonumber(ARGV[2])
+    local amount = tonumber(ARGV[3])
+
+    local current = tonumber(redis.call('GET', key) or 0)
+    local granted = math.min(amount, limit - current)
+
+    if granted <= 0 then
+        local ttl = redis.call('PTTL', key)
+        return {0, ttl, 0, ttl}
+    end
+
+    current = redis.call('INCRBY', key, granted)
+    if current == granted then
+        redis.call('PEXPIRE', key, math.ceil(window * 1000))
+    end
+
+    local ttl = redis.call('PTTL', key)
+    return {granted, ttl, math.max(0, limit - current), ttl}
+"""
+
+RELEASE_FIXED_WINDOW = """
+    local key = KEYS[1]
+    local amount = tonumber(ARGV[1])
+
+    -- window tugagan bo'lsa qaytarishga hojat yo'q
+    if redis.call('PTTL', key) <= 0 then
+        return 0
+    end
+
+    local current = tonumber(redis.call('GET', key) or 0)
+    redis.call('DECRBY', key, math.min(amount, current))
+    return 1
+"""
+
+LEASE_TOKEN_BUCKET = """
+    local key = KEYS[1]
+    local capacity = tonumber(ARGV[1])
+    local refill_rate = tonumber(ARGV[2])
+    local amount = tonumber(ARGV[3])
+
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+    -- holat bitta hashda (listpack)
+    local state = redis.call('HMGET', key, 'tokens', 'ts')
+    local tokens = tonumber(state[1])
+    local last_refill = tonumber(state[2])
+    tokens = tokens or capacity
+    last_refill = last_refill or now
+
+    local delta = math.max(0, now - last_refill)
+    tokens = math.min(capacity, tokens + delta * refill_rate)
+
+    local granted = math.min(amount, math.floor(tokens))
+    local wait_time = 0
+
+    if granted > 0 then
+        tokens = tokens - granted
+    else
+        wait_time = math.ceil((1 - tokens) / refill_rate * 1000)
+    end
+
+    redis.call('HSET', key, 'tokens', tokens, 'ts', string.format('%.6f', now))
+    redis.call('PEXPIRE', key, math.ceil(capacity / refill_rate * 2000))
+
+    return {granted, wait_time, math.floor(tokens), math.ceil((capacity - tokens) / refill_rate * 1000)}
+"""
+
+RELEASE_TOKEN_BUCKET = """
+    local key = KEYS[1]
+    local capacity = tonumber(ARGV[1])
+    local refill_rate = tonumber(ARGV[2])
+    local amount = tonumber(ARGV[3])
+
+    local tokens = redis.call('HGET', key, 'tokens')
+    if not tokens then
+        return 0
+    end
+
+    tokens = math.min(capacity, tonumber(tokens) + amount)
+    redis.call('HSET', key, 'tokens', tokens)
+    redis.call('PEXPIRE', key, math.ceil(capacity / refill_rate * 2000))
+    return 1
+"""
+
+MULTI_LIMIT = """
+    -- KEYS[i] va ARGV[3i-2..3i] = (algorithm, limit, window) - bitta bosqich
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local plans = {}
+    local allowed = 1
+    local retry_after = 0
+    -- eng kam kvota qolgan bosqich: {qolgan, reset (soniya), indeks 0 dan}
+    local binding = nil
+
+    local function bind(index, left, reset)
+        left = math.max(0, left)
+        if binding == nil or left < binding[1] then
+            binding = {left, reset, index - 1}
+        end
+    end
+
+    -- 1) faqat tekshirish, hech narsa yozilmaydi
+    for i = 1, #KEYS do
+        local key = KEYS[i]
+        local algorithm = ARGV[i * 3 - 2]
+        local limit = tonumber(ARGV[i * 3 - 1])
+        local window = tonumber(ARGV[i * 3])
+        local denied = false
+        local wait_time = 0
+
+        if algorithm == 'fixed_window' then
+            local current = tonumber(redis.call('GET', key) or 0)
+            local ttl = math.max(0, redis.call('PTTL', key)) / 1000
+            if current + 1 > limit then
+                denied = true
+                wait_time = ttl
+                if wait_time <= 0 then
+                    wait_time = window
+                end
+            end
+            bind(i, limit - current, ttl)
+        elseif algorithm == 'sliding_window' then
+            local slot = math.floor(now / window)
+            local current_start = slot * window
+            local state = redis.call('HMGET', key, 'slot', 'current', 'previous')
+            local last_slot = tonumber(state[1])
+            local current = tonumber(state[2] or 0)
+            local previous = tonumber(state[3] or 0)
+            if last_slot ~= slot then
+                if last_slot == slot - 1 then
+                    previous = current
+                else
+                    previous = 0
+                end
+                current = 0
+            end
+            local elapsed = now - current_start
+            local estimated = previous * (window - elapsed) / window + current
+            if estimated + 1 > limit then
+                denied = true
+                wait_time = window - elapsed
+                if previous > 0 and current + 1 <= limit then
+                    wait_time = window - (limit - current - 1) * window / previous - elapsed
+                elseif current + 1 > limit then
+                    wait_time = (window - elapsed) + window * (1 - (limit - 1) / current)
+                end
+            end
+            local reset = current_start + window - now
+            if current > 0 then
+                reset = reset + window
+            end
+            bind(i, math.floor(limit - estimated), reset)
+            plans[i] = {slot, current + 1, previous, estimated + 1, current_start + 2 * window - now}
+        elseif algorithm == 'token_bucket' then
+            -- limit = capacity, window = refill rate
+            local state = redis.call('HMGET', key, 'tokens', 'ts')
+            local tokens = tonumber(state[1] or limit)
+            local last_refill = tonumber(state[2] or now)
+            tokens = math.min(limit, tokens + math.max(0, now - last_refill) * window)
+            if tokens < 1 then
+                denied = true
+                wait_time = (1 - tokens) / window
+            end
+            bind(i, math.floor(tokens), (limit - tokens) / window)
+            plans[i] = {tokens - 1}
+        else
+            return redis.error_reply('unknown tier algorithm ' .. tostring(algorithm))
+        end
+
+        if denied then
+            allowed = 0
+            -- millisekundlarda
+            retry_after = math.max(retry_after, math.max(1, math.ceil(wait_time * 1000)))
+        end
+    end
+
+    if allowed == 0 then
+        return {0, retry_after, binding[1], math.ceil(binding[2] * 1000), binding[3]}
+    end
+
+    -- 2) hamma bosqich ruxsat berdi, endi barchasi yoziladi
+    binding = nil
+    for i = 1, #KEYS do
+        local key = KEYS[i]
+        local algorithm = ARGV[i * 3 - 2]
+        local limit = tonumber(ARGV[i * 3 - 1])
+        local window = tonumber(ARGV[i * 3])
+
+        if algorithm == 'fixed_window' then
+            local current = redis.call('INCR', key)
+            if current == 1 then
+                redis.call('PEXPIRE', key, math.ceil(window * 1000))
+            end
+            bind(i, limit - current, redis.call('PTTL', key) / 1000)
+        elseif algorithm == 'sliding_window' then
+            redis.call('HSET', key, 'slot', plans[i][1], 'current', plans[i][2], 'previous', plans[i][3])
+            redis.call('PEXPIRE', key, math.ceil(window * 2000))
+            bind(i, math.floor(limit - plans[i][4]), plans[i][5])
+        else
+            redis.call('HSET', key, 'tokens', plans[i][1], 'ts', string.format('%.6f', now))
+            redis.call('PEXPIRE', key, math.ceil(limit / window * 2000))
+            bind(i, math.floor(plans[i][1]), (limit - plans[i][1]) / window)
+        end
+    end
+
+    return {1, 0, binding[1], math.ceil(binding[2] * 1000), binding[3]}
+"""
+
+PEEK = """
+    -- KEYS[i] va ARGV[3i-2..3i] = (algorithm, limit, window); faqat o'qiladi, hech narsa yozilmaydi
+    -- natija: {hozir o'tkazilishi mumkin bo'lgan so'rovlar soni, keyingi so'rovgacha ms}
+    local time = redis.call('TIME')
+    local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+    local remaining = nil
+    local retry_after = 0
+
+    for i = 1, #KEYS do
+        local key = KEYS[i]
+        local algorithm = ARGV[i * 3 - 2]
+        local limit = tonumber(ARGV[i * 3 - 1])
+        local window = tonumber(ARGV[i * 3])
+        local left = 0
+        local wait_time = 0
+
+        if algorithm == 'fixed_window' then
+            left = limit - tonumber(redis.call('GET', key) or 0)
+            if left < 1 then
+                wait_time = math.max(0, redis.call('PTTL', key)) / 1000
+            end
+        elseif algorithm == 'sliding_window_log' then
+            local from = '(' .. string.format('%.6f', now - window)
+            left = limit - redis.call('ZCOUNT', key, from, '+inf')
+            if left < 1 then
+                local oldest = redis.call('ZRANGEBYSCORE', key, from, '+inf', 'WITHSCORES', 'LIMIT', 0, 1)
+                wait_time = window - (now - tonumber(oldest[2]))
+            end
+        elseif algorithm == 'sliding_window' then
+            local slot = math.floor(now / window)
+            local state = redis.call('HMGET', key, 'slot', 'current', 'previous')
+            local last_slot = tonumber(state[1])
+            local current = tonumber(state[2] or 0)
+            local previous = tonumber(state[3] or 0)
+            if last_slot ~= slot then
+                if last_slot == slot - 1 then
+                    previous = current
+                else
+                    previous = 0
+                end
+                current = 0
+            end
+            local elapsed = now - slot * window
+            left = math.floor(limit - previous * (window - elapsed) / window - current)
+            if left < 1 then
+                wait_time = window - elapsed
+                if previous > 0 and current + 1 <= limit then
+                    wait_time = window - (limit - current - 1) * window / previous - elapsed
+                elseif current + 1 > limit then
+                    wait_time = (window - elapsed) + window * (1 - (limit - 1) / current)
+                end
+            end
+        elseif algorithm == 'token_bucket' or algorithm == 'leaky_bucket' then
+            -- limit = capacity, window = refill/leak rate; eski ikki kalitli holat hisobga olinmaydi
+            local state = redis.call('HMGET', key, 'tokens', 'ts')
+            local delta = math.max(0, now - tonumber(state[2] or now))
+            if algorithm == 'token_bucket' then
+                local tokens = math.min(limit, tonumber(state[1] or limit) + delta * window)
+                left = math.floor(tokens)
+                if left < 1 then
+                    wait_time = (1 - tokens) / window
+                end
+            else
+                local tokens = math.max(0, tonumber(state[1] or 0) - delta * window)
+                left = math.floor(limit - tokens)
+                if left < 1 then
+                    wait_time = (tokens - limit + 1) / window
+                end
+            end
+        elseif algorithm == 'gcra' then
+            local interval = window / limit
+            local tat = math.max(tonumber(redis.call('GET', key) or 0) / 1000, now)
+            left = math.floor((now + window - tat) / interval + 1e-6)
+            if left < 1 then
+                wait_time = tat + interval - window - now
+            end
+        else
+            return redis.error_reply('unknown algorithm ' .. tostring(algorithm))
+        end
+
+        left = math.max(0, left)
+        if remaining == nil or left < remaining then
+            remaining = left
+        end
+        if left == 0 then
+            -- millisekundlarda
+            retry_after = math.max(retry_after, math.max(1, math.ceil(wait_time * 1000)))
+        end
+    end
+
+    return {remaining, retry_after}
+"""
+
+SCRIPTS = {
+    "fixed_window": FIXED_WINDOW,
+    "sliding_window": SLIDING_WINDOW,
+    "sliding_window_counter": SLIDING_WINDOW_COUNTER,
+    "token_bucket": TOKEN_BUCKET,
+    "gcra": GCRA,
+    "leaky_bucket": LEAKY_BUCKET,
+    "lease_fixed_window": LEASE_FIXED_WINDOW,
+    "release_fixed_window": RELEASE_FIXED_WINDOW,
+    "lease_token_bucket": LEASE_TOKEN_BUCKET,
+    "release_token_bucket": RELEASE_TOKEN_BUCKET,
+    "multi_limit": MULTI_LIMIT,
+    "peek": PEEK,
+}
@@ -0,0 +1,102 @@
+import asyncio
+import bisect
+import hashlib
+import zlib
+from typing import Sequence, Tuple
+
+from app.core.entities import LimitTier
+from app.core.interfaces import RateLimitRepository
+
+
+def hash_tag(key: str) -> str:
+    """Redis Cluster qoidasi: birinchi {...} ichidagi qism, bo'lmasa butun kalit"""
+    start = key.find("{")
+    if start != -1:
+        end = key.find("}", start + 1)
+        if end > start + 1:
+            return key[start + 1:end]
+    return key
+
+
+class HashRing:
+    """Consistent hashing: node qo'shilsa/olinsa kalitlarning faqat ~1/N qismi ko'chadi"""
+
+    def __init__(self, nodes: Sequence[str], replicas: int = 160):
+        self._points: list[int] = []
+        self._owners: list[int] = []
+        ring = sorted(
+            (int.from_bytes(hashlib.md5(f"{node}#{replica}".encode()).digest()[:4], "big"), index)
+            for index, node in enumerate(nodes)
+            for replica in range(replicas)
+        )
+        for point, index in ring:
+            self._points.append(point)
+            self._owners.append(index)
+
+    def get(self, tag: str) -> int:
+        position = bisect.bisect(self._points, zlib.crc32(tag.encode()))
+        return self._owners[position % len(self._points)]
+
+
+class ShardedRateLimitRepository(RateLimitRepository):
+    """
+        Client-side sharding across several standalone Redis nodes.
+        Every per-limit key is routed by its hash tag, so a limit's sub-keys
+        (tier keys `:t0`, `:t1`, ...) always land on the same node and
+        each script still runs against a single server.
+    """
+
+    def __init__(self, shards: Sequence[RateLimitRepository], names: Sequence[str] | None = None):
+        if not shards:
+            raise ValueError("At least one shard is required")
+        self.shards = list(shards)
+        self.ring = HashRing(names or [str(index) for index in range(len(self.shards))])
+
+    def shard_for(self, key: str) -> RateLimitRepository:
+        return self.shards[self.ring.get(hash_tag(key))]
+
+    async def prepare(self) -> None:
+        await asyncio.gather(*(shard.prepare() for shard in self.shards))
+
+    async def increment_and_check(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).increment_and_check(key, limit, window)
+
+    async def sliding_window_log(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).sliding_window_log(key, limit, window)
+
+    async def sliding_window_counter(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).sliding_window_counter(key, limit, window)
+
+    async def token_bucket(self, key: str, capacity: int, refill_rate: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).token_bucket(key, capacity, refill_rate)
+
+    async def gcra(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).gcra(key, limit, window)
+
+    async def leaky_bucket(self, key: str, capacity: int, leak_rate: float) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).leaky_bucket(key, capacity, leak_rate)
+
+    async def multi_limit(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float, int, float, int]:
+        return await self.shard_for(key).multi_limit(key, tiers)
+
+    async def lease_fixed_window(
+            self, key: str, limit: int, window: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).lease_fixed_window(key, limit, window, amount)
+
+    async def release_fixed_window(self, key: str, amount: int) -> None:
+        await self.shard_for(key).release_fixed_window(key, amount)
+
+    async def lease_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        return await self.shard_for(key).lease_token_bucket(key, capacity, refill_rate, amount)
+
+    async def release_token_bucket(self, key: str, capacity: int, refill_rate: float, amount: int) -> None:
+        await self.shard_for(key).release_token_bucket(key, capacity, refill_rate, amount)
+
+    async def peek(self, key: str, algorithm: str, limit: int, window: float) -> Tuple[int, float]:
+        return await self.shard_for(key).peek(key, algorithm, limit, window)
+
+    async def peek_multi(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float]:
+        return await self.shard_for(key).peek_multi(key, tiers)
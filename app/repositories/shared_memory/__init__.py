@@ -0,0 +1 @@
+from .shared_memory_repository import *
\ No newline at end of file
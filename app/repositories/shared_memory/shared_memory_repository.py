@@ -0,0 +1,352 @@
+import asyncio
+import fcntl
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Iterable, Optional, Sequence, Tuple
+
+from app.core.entities import LimitTier
+from app.repositories.memory.memory_repository import (
+    InMemoryRateLimitRepository,
+    _ArrivalTime,
+    _Bucket,
+    _Counter,
+    _WindowCounter,
+)
+
+# fayl boshidagi sarlavha: tuzilma o'zgarsa MAGIC ham o'zgaradi
+MAGIC = b"RLSHM001"
+HEADER = struct.Struct("<8sII")  # magic, buckets, ways
+HEADER_SIZE = 64
+# key hash (0 - bo'sh), holat turi, uchta qiymat, expires_at
+SLOT = struct.Struct("<QB7xdddd")
+
+_KINDS = {_Counter: 1, _WindowCounter: 2, _Bucket: 3, _ArrivalTime: 4}
+
+
+def _pack(state) -> tuple[float, float, float]:
+    if isinstance(state, _Counter):
+        return state.count, 0, 0
+    if isinstance(state, _WindowCounter):
+        return state.slot, state.current, state.previous
+    if isinstance(state, _Bucket):
+        return state.tokens, state.ts, 0
+    return state.tat, 0, 0
+
+
+def _unpack(kind: type, a: float, b: float, c: float, expires_at: float):
+    if kind is _Counter:
+        state = _Counter(expires_at)
+        state.count = int(a)
+    elif kind is _WindowCounter:
+        state = _WindowCounter(int(a), expires_at)
+        state.current = int(b)
+        state.previous = int(c)
+    elif kind is _Bucket:
+        state = _Bucket(a, b, expires_at)
+    else:
+        state = _ArrivalTime(a, expires_at)
+    return state
+
+
+class _Region:
+    """
+        One mapping of the file per process. POSIX record locks belong to the
+        process, not the fd: a second fd on the same file would neither
+        exclude the first nor keep its locks when closed. Every repository on
+        the path shares this fd and mmap; buckets held by any of them are
+        tracked in `locked`, which also excludes other threads.
+    """
+
+    def __init__(self, path: str, size: int, header: bytes):
+        self.path = path
+        self.size = size
+        self.fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            self._init(header)
+            self.map = mmap.mmap(self.fd, size)
+        except BaseException:
+            os.close(self.fd)
+            raise
+        self.refs = 0
+        self.locked: set[int] = set()  # shu process ushlab turgan bucket offsetlari
+        self.mutex = threading.Lock()
+
+    def _init(self, header: bytes):
+        # process ochilishida bir marta, workerlar startupda qisqa kutishi mumkin
+        fcntl.lockf(self.fd, fcntl.LOCK_EX, HEADER_SIZE, 0)
+        try:
+            if os.pread(self.fd, HEADER.size, 0) == header and os.fstat(self.fd).st_size == self.size:
+                return
+            # yangi fayl yoki boshqa o'lcham/versiya: region nollanadi
+            os.ftruncate(self.fd, 0)
+            os.ftruncate(self.fd, self.size)
+            os.pwrite(self.fd, header, 0)
+        finally:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, HEADER_SIZE, 0)
+
+    def try_lock(self, offsets: Sequence[int], length: int) -> bool:
+        """Hammasi yoki hech biri: band bucket bo'lsa olinganlari qaytariladi"""
+        with self.mutex:
+            taken = []
+            for offset in offsets:
+                if offset in self.locked:
+                    break
+                try:
+                    fcntl.lockf(self.fd, fcntl.LOCK_EX | fcntl.LOCK_NB, length, offset)
+                except OSError:
+                    break
+                taken.append(offset)
+                self.locked.add(offset)
+            else:
+                return True
+            self._unlock(taken, length)
+            return False
+
+    def unlock(self, offsets: Iterable[int], length: int):
+        with self.mutex:
+            self._unlock(offsets, length)
+
+    def _unlock(self, offsets: Iterable[int], length: int):
+        for offset in offsets:
+            fcntl.lockf(self.fd, fcntl.LOCK_UN, length, offset)
+            self.locked.discard(offset)
+
+    def close(self):
+        self.map.close()
+        os.close(self.fd)
+
+
+_regions: dict[str, _Region] = {}
+_regions_mutex = threading.Lock()
+
+
+def _open_region(path: str, size: int, header: bytes) -> _Region:
+    path = os.path.realpath(path)
+    with _regions_mutex:
+        region = _regions.get(path)
+        if region is None:
+            region = _regions[path] = _Region(path, size, header)
+        elif region.size != size:
+            raise ValueError(f"{path} is already mapped with a different number of slots")
+        region.refs += 1
+        return region
+
+
+def _close_region(region: _Region):
+    with _regions_mutex:
+        region.refs -= 1
+        if region.refs == 0:
+            del _regions[region.path]
+            # fd yopilishi processning shu fayldagi barcha locklarini bo'shatadi
+            region.close()
+
+
+class SharedMemoryRateLimitRepository(InMemoryRateLimitRepository):
+    """
+        Host-local backend shared by all worker processes: the memory backend's
+        algorithms over a memory-mapped file of fixed-size slots instead of a
+        per-process dict. A key hashes (blake2b, stable across processes) to a
+        bucket of `WAYS` slots; a bucket is guarded by an fcntl byte-range lock
+        held for the whole check, so read-modify-write is atomic across
+        workers. When a bucket is full the slot expiring first is reused.
+
+        Locks are only tried (LOCK_NB): a busy bucket makes the check yield to
+        the event loop and retry with a short backoff, for at most
+        `lock_timeout` seconds, instead of blocking the loop.
+
+        Slots are fixed-size, so sliding_window_log is served by the weighted
+        two-window counter. Time is the wall clock, shared by all processes.
+    """
+
+    WAYS = 8
+    # band bucket: avval faqat yield, keyin shu oraliqlar bilan kutish
+    LOCK_SPINS = 3
+    LOCK_BACKOFF = (0.0001, 0.002)
+
+    def __init__(self, path: str, slots: int = 131072, clock=time.time, lock_timeout: float = 1.0):
+        super().__init__(max_keys=slots, clock=clock)
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self.buckets = max(1, slots // self.WAYS)
+        self.size = HEADER_SIZE + self.buckets * self.WAYS * SLOT.size
+        self._region = _open_region(path, self.size, HEADER.pack(MAGIC, self.buckets, self.WAYS))
+        self._map = self._region.map
+        self._locked: set[int] = set()
+        self._bucket = struct.Struct("<" + SLOT.format[1:] * self.WAYS)
+        self._touched: dict[str, tuple[int, int, object]] = {}  # key -> (digest, offset, holat)
+
+    def close(self):
+        if self._region is not None:
+            _close_region(self._region)
+            self._region = None
+
+    def __len__(self) -> int:
+        now = self.clock()
+        data = memoryview(self._map)[HEADER_SIZE:]
+        try:
+            return sum(
+                1 for digest, _, _, _, _, expires_at in SLOT.iter_unpack(data)
+                if digest and expires_at > now
+            )
+        finally:
+            data.release()
+
+    # --- slotlar ---
+
+    def _hash(self, key: str) -> tuple[int, int]:
+        digest = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "little") or 1
+        return digest, digest % self.buckets
+
+    def _bucket_offset(self, bucket: int) -> int:
+        return HEADER_SIZE + bucket * self.WAYS * SLOT.size
+
+    async def _lock_buckets(self, keys: Iterable[str]):
+        # bucketlar tartib bilan: ikki process bir-birini kutib qolmaydi
+        offsets = sorted({self._bucket_offset(self._hash(key)[1]) for key in keys})
+        length = self.WAYS * SLOT.size
+        deadline = None
+        attempt = 0
+        while not self._region.try_lock(offsets, length):
+            if deadline is None:
+                deadline = time.monotonic() + self.lock_timeout
+            elif time.monotonic() >= deadline:
+                raise TimeoutError(f"Shared memory bucket is busy: {self.path}")
+            attempt += 1
+            # lock egasi algoritmni await'siz, mikrosekundlarda tugatadi
+            if attempt <= self.LOCK_SPINS:
+                await asyncio.sleep(0)
+            else:
+                low, high = self.LOCK_BACKOFF
+                await asyncio.sleep(min(high, low * 2 ** (attempt - self.LOCK_SPINS)))
+        self._locked.update(offsets)
+
+    @asynccontextmanager
+    async def _transaction(self, keys: Iterable[str]):
+        """
+            All buckets of `keys` are locked before the algorithm runs. The
+            algorithm never awaits, so the check runs to completion while they
+            are held; touched state is written back only if it succeeded.
+        """
+        await self._lock_buckets(keys)
+        try:
+            yield
+            for digest, offset, state in self._touched.values():
+                SLOT.pack_into(self._map, offset, digest, _KINDS[type(state)], *_pack(state), state.expires_at)
+        finally:
+            self._touched.clear()
+            self._region.unlock(self._locked, self.WAYS * SLOT.size)
+            self._locked.clear()
+
+    def _find(self, key: str) -> tuple[int, int, Optional[tuple]]:
+        """(digest, slot offseti, saqlangan qiymatlar yoki None) - kalit bo'lmasa bo'sh/eng tez tugaydigan slot"""
+        digest, bucket = self._hash(key)
+        start = self._bucket_offset(bucket)
+        if start not in self._locked:
+            raise RuntimeError(f"Key {key!r} is not part of the transaction")
+        # butun bucket bitta unpack bilan o'qiladi
+        values = self._bucket.unpack_from(self._map, start)
+        fields = len(values) // self.WAYS
+        digests = values[::fields]
+        if digest in digests:
+            way = digests.index(digest)
+            return digest, start + way * SLOT.size, values[way * fields:(way + 1) * fields]
+
+        # shu tranzaksiyada boshqa kalitga berilgan slot qayta tanlanmaydi
+        claimed = {offset for _, offset, _ in self._touched.values()}
+        victim, victim_expires = None, float("inf")
+        for way, expires_at in enumerate(values[fields - 1::fields]):
+            offset = start + way * SLOT.size
+            if offset in claimed:
+                continue
+            if digests[way] == 0:
+                return digest, offset, None
+            if expires_at < victim_expires:
+                victim, victim_expires = offset, expires_at
+        return digest, victim, None
+
+    def _get(self, key: str, kind: type, now: float):
+        touched = self._touched.get(key)
+        if touched is not None:
+            state = touched[2]
+            return state if isinstance(state, kind) else None
+
+        digest, offset, values = self._find(key)
+        if values is None:
+            return None
+        _, kind_code, a, b, c, expires_at = values
+        if expires_at <= now or kind_code != _KINDS.get(kind):
+            return None
+        state = _unpack(kind, a, b, c, expires_at)
+        self._touched[key] = (digest, offset, state)
+        return state
+
+    def _put(self, key: str, state):
+        touched = self._touched.get(key)
+        digest, offset = touched[:2] if touched is not None else self._find(key)[:2]
+        self._touched[key] = (digest, offset, state)
+        return state
+
+    # --- algoritmlar: memory backend, har biri bitta tranzaksiyada ---
+
+    async def increment_and_check(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().increment_and_check(key, limit, window)
+
+    async def lease_fixed_window(
+            self, key: str, limit: int, window: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().lease_fixed_window(key, limit, window, amount)
+
+    async def release_fixed_window(self, key: str, amount: int) -> None:
+        async with self._transaction((key,)):
+            await super().release_fixed_window(key, amount)
+
+    async def sliding_window_log(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        # log o'zgarmas o'lchamli slotga sig'maydi
+        return await self.sliding_window_counter(key, limit, window)
+
+    async def sliding_window_counter(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().sliding_window_counter(key, limit, window)
+
+    async def token_bucket(self, key: str, capacity: int, refill_rate: float) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().token_bucket(key, capacity, refill_rate)
+
+    async def lease_token_bucket(
+            self, key: str, capacity: int, refill_rate: float, amount: int
+    ) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().lease_token_bucket(key, capacity, refill_rate, amount)
+
+    async def release_token_bucket(self, key: str, capacity: int, refill_rate: float, amount: int) -> None:
+        async with self._transaction((key,)):
+            await super().release_token_bucket(key, capacity, refill_rate, amount)
+
+    async def leaky_bucket(self, key: str, capacity: int, leak_rate: float) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().leaky_bucket(key, capacity, leak_rate)
+
+    async def gcra(self, key: str, limit: int, window: float) -> Tuple[int, float, int, float]:
+        async with self._transaction((key,)):
+            return await super().gcra(key, limit, window)
+
+    async def multi_limit(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float, int, float, int]:
+        async with self._transaction([f"{key}:t{index}" for index in range(len(tiers))]):
+            return await super().multi_limit(key, tiers)
+
+    async def peek(self, key: str, algorithm: str, limit: int, window: float) -> Tuple[int, float]:
+        if algorithm == "sliding_window_log":
+            algorithm = "sliding_window"
+        async with self._transaction((key,)):
+            return await super().peek(key, algorithm, limit, window)
+
+    async def peek_multi(self, key: str, tiers: Sequence[LimitTier]) -> Tuple[int, float]:
+        async with self._transaction([f"{key}:t{index}" for index in range(len(tiers))]):
+            return await super().peek_multi(key, tiers)
@@ -1 +1,3 @@
-from .rate_limit_create import *
\ No newline at end of file
+from .rate_limit_create import *
+from .rate_limit_admin import *
+from .rate_limit_decision import *
\ No newline at end of file
@@ -0,0 +1,44 @@
+from typing import Dict, List
+
+from pydantic import BaseModel
+
+
+class HeavyHitterRead(BaseModel):
+    identity: str
+    count: int
+    error: int  # haqiqiy son count - error dan kam emas
+
+
+class HeavyHittersRead(BaseModel):
+    rule: str
+    decision: str
+    total: int  # shu worker ko'rgan jami so'rovlar
+    items: List[HeavyHitterRead]
+
+
+class PenaltyRead(BaseModel):
+    identity: str
+    banned_until: float  # unix timestamp
+    remaining_seconds: float
+
+
+class KeyspaceGroupRead(BaseModel):
+    rule: str
+    algorithm: str
+    orphaned: bool  # qoida o'chirilgan yoki nofaol
+    keys: int
+    sampled: int
+    avg_bytes: float  # MEMORY USAGE namunalari bo'yicha
+    estimated_bytes: float
+    no_ttl: int
+    ttl: Dict[str, int]  # yuqori chegara (1s, 10s, 1m, ...) -> kalitlar soni
+    types: Dict[str, int]
+
+
+class KeyspaceRead(BaseModel):
+    scanned: int
+    complete: bool  # max_keys'ga yetmasdan tugadi
+    seconds: float
+    estimated_bytes: float
+    orphaned_keys: int
+    groups: List[KeyspaceGroupRead]
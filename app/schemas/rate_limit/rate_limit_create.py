@@ -1,15 +1,36 @@
 import re
 from pydantic import BaseModel, Field, field_validator, model_validator
-from typing import Optional
+from typing import List, Optional
 from app.db.models.rate_limit import (
     RateLimitAlgorithmOption,
     RateLimitKeyOption,
+    RateLimitFailureMode,
 )
 
 HTTP_METHODS = {
     "GET", "POST", "PUT", "PATCH", "DELETE", "OPTIONS", "HEAD"
 }
 
+# bitta Lua chaqiruvida birga tekshirilishi mumkin bo'lgan algoritmlar
+TIER_ALGORITHMS = {
+    RateLimitAlgorithmOption.FIXED_WINDOW,
+    RateLimitAlgorithmOption.SLIDING_WINDOW,
+    RateLimitAlgorithmOption.TOKEN_BUCKET,
+}
+
+
+class RateLimitTier(BaseModel):
+    limit: int = Field(..., gt=0)
+    window_seconds: float = Field(..., gt=0)
+    algorithm: RateLimitAlgorithmOption
+
+    @field_validator("algorithm")
+    @classmethod
+    def validate_algorithm(cls, v: RateLimitAlgorithmOption):
+        if v not in TIER_ALGORITHMS:
+            raise ValueError(f"Algorithm {v.value} cannot be used in tiers")
+        return v
+
 
 class RateLimitBase(BaseModel):
     path: str = Field(..., max_length=255)
@@ -18,12 +39,15 @@ class RateLimitBase(BaseModel):
     algorithm: RateLimitAlgorithmOption
 
     limit: int
-    window_seconds: int
+    window_seconds: float  # kasr bo'lishi mumkin: 0.5, 1.5 ...
 
     key_type: RateLimitKeyOption = RateLimitKeyOption.IP
     is_active: bool = True
     priority: int = 0
 
+    tiers: Optional[List[RateLimitTier]] = None
+    failure_mode: Optional[RateLimitFailureMode] = None
+
     @field_validator("path")
     @classmethod
     def validate_path(cls, v: str):
@@ -77,6 +101,11 @@ class RateLimitBase(BaseModel):
                 "Fixed window should have window_seconds >= 60"
             )
 
+        if self.tiers and self.algorithm not in TIER_ALGORITHMS:
+            raise ValueError(
+                f"Algorithm {self.algorithm.value} cannot be combined with tiers"
+            )
+
         return self
 
 
@@ -89,10 +118,12 @@ class RateLimitUpdate(BaseModel):
     method: Optional[str] = None
     algorithm: Optional[RateLimitAlgorithmOption] = None
     limit: Optional[int] = None
-    window_seconds: Optional[int] = None
+    window_seconds: Optional[float] = None
     key_type: Optional[RateLimitKeyOption] = None
     is_active: Optional[bool] = None
     priority: Optional[int] = None
+    tiers: Optional[List[RateLimitTier]] = None
+    failure_mode: Optional[RateLimitFailureMode] = None
 
 
 class RateLimitRead(RateLimitBase):
@@ -0,0 +1,37 @@
+from typing import List, Optional
+
+from pydantic import BaseModel, Field, field_validator
+
+from app.core.config import settings
+
+
+class DecisionItem(BaseModel):
+    # kalit middleware'dagi kabi: qoida key_type="user" va user_id berilgan bo'lsa user, aks holda ip
+    client_ip: str = Field(..., min_length=1, max_length=255)
+    user_id: Optional[str] = Field(None, min_length=1, max_length=255)
+    path: str = Field(..., max_length=255)
+    method: str = "GET"
+
+    @field_validator("method")
+    @classmethod
+    def validate_method(cls, v: str):
+        return v.upper()
+
+
+class DecisionRequest(BaseModel):
+    items: List[DecisionItem] = Field(..., min_length=1, max_length=settings.rate_limit_bulk_max_items)
+
+
+class DecisionRead(BaseModel):
+    allowed: bool
+    retry_after: float  # soniya, millisekund aniqlikda; ruxsat berilganda 0
+    rule: str
+    limit: Optional[int] = None
+    remaining: Optional[int] = None  # backend ishlamay qolganda (failure_mode) noma'lum
+    reset: float = 0  # kvota to'liq tiklanguncha soniya
+
+
+class PeekRead(BaseModel):
+    remaining: Optional[int] = None  # hozir o'tkazilishi mumkin bo'lgan so'rovlar; failure_mode=open'da noma'lum
+    retry_after: float  # remaining 0 bo'lsa keyingi so'rovgacha soniya
+    rule: str
@@ -1,52 +1,75 @@
 from abc import ABC, abstractmethod
-from typing import Tuple
+from app.core.entities import RateLimitResult
 from app.core.interfaces import RateLimitRepository
 
 class RateLimitAlgorithm(ABC):
     """Rate limiting algoritmlarining umumiy interfeysi"""
     @abstractmethod
-    async def check(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
-        """(allowed, retry_after)"""
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        """Qaror, retry_after, qolgan kvota va reset - bitta skript chaqiruvidan, soniyalarda ms aniqlikda"""
         pass
 
 class FixedWindowAlgorithm(RateLimitAlgorithm):
     def __init__(self, repo: RateLimitRepository):
         self.repo = repo
 
-    async def check(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
-        count, ttl = await self.repo.increment_and_check(key, limit, window)
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        count, ttl, remaining, reset = await self.repo.increment_and_check(key, limit, window)
         if count > limit:
-            return False, ttl
-        return True, 0
+            return RateLimitResult(False, ttl, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
 
 class SlidingWindowLogAlgorithm(RateLimitAlgorithm):
     def __init__(self, repo: RateLimitRepository):
         self.repo = repo
 
-    async def check(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
-        count, ttl = await self.repo.sliding_window_log(key, limit, window)
-        if count >= limit:
-            return False, ttl
-        return True, 0
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        count, ttl, remaining, reset = await self.repo.sliding_window_log(key, limit, window)
+        # rad etilganda skript doim musbat retry_after qaytaradi
+        if ttl > 0:
+            return RateLimitResult(False, ttl, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
+
+class SlidingWindowCounterAlgorithm(RateLimitAlgorithm):
+    def __init__(self, repo: RateLimitRepository):
+        self.repo = repo
+
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        # har bir kalit uchun o'zgarmas xotira: ikki window hisobi
+        allowed, retry_after, remaining, reset = await self.repo.sliding_window_counter(key, limit, window)
+        if not allowed:
+            return RateLimitResult(False, retry_after, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
 
 class TokenBucketAlgorithm(RateLimitAlgorithm):
     def __init__(self, repo: RateLimitRepository):
         self.repo = repo
 
-    async def check(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
         # limit = bucket capacity, window = refill rate (tokens per second)
-        tokens, wait = await self.repo.token_bucket(key, limit, window)
+        tokens, wait, remaining, reset = await self.repo.token_bucket(key, limit, window)
         if tokens == 0:
-            return False, int(wait) + 1  # Retry-After soniyalarda
-        return True, 0
+            return RateLimitResult(False, wait, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
+
+class GCRAAlgorithm(RateLimitAlgorithm):
+    def __init__(self, repo: RateLimitRepository):
+        self.repo = repo
+
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
+        # limit ta so'rov / window, burst = limit; bitta kalit, bitta yozish
+        allowed, wait, remaining, reset = await self.repo.gcra(key, limit, window)
+        if not allowed:
+            return RateLimitResult(False, wait, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
 
 class LeakyBucketAlgorithm(RateLimitAlgorithm):
     def __init__(self, repo: RateLimitRepository):
         self.repo = repo
 
-    async def check(self, key: str, limit: int, window: int) -> Tuple[bool, int]:
+    async def check(self, key: str, limit: int, window: float) -> RateLimitResult:
         # limit = bucket capacity, window = leak rate (tokens per second)
-        tokens, wait = await self.repo.leaky_bucket(key, limit, window)
-        if tokens >= limit:
-            return False, int(wait) + 1  # Retry-After soniyalarda
-        return True, 0
\ No newline at end of file
+        allowed, wait, remaining, reset = await self.repo.leaky_bucket(key, limit, window)
+        if not allowed:
+            return RateLimitResult(False, wait, limit, remaining, reset)
+        return RateLimitResult(True, 0, limit, remaining, reset)
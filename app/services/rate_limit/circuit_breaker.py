@@ -0,0 +1,94 @@
+import time
+from collections import Counter
+from typing import Callable, Optional
+
+from app.utils.logger import logger
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+        Stops sending checks to a failing backend.
+        After `failure_threshold` consecutive failures (errors or blown latency
+        budgets) the breaker opens and callers go straight to their fallback.
+        Once `recovery_timeout` has passed a single probe call is let through:
+        success closes the breaker, failure opens it again.
+        `allow()` hands out a ticket bound to the current state; results of
+        calls started before a transition (a slow success arriving after the
+        breaker opened, a stale call finishing during the probe) are ignored.
+        Every transition is logged, counted in `transitions` and passed to
+        `listeners`, so it can be exported and alerted on.
+    """
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 5.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._generation = 1  # har o'tishda oshadi: eski chaqiruvlarning ticketi eskiradi
+        self.transitions: Counter = Counter()  # "closed->open" -> soni
+        self.listeners: list[Callable[[str, str], None]] = []
+
+    def allow(self) -> Optional[int]:
+        """Chaqiruv ticketi yoki None (o'tkazilmaydi); natija shu ticket bilan yoziladi"""
+        if self.state == CLOSED:
+            return self._generation
+        if self.state == OPEN:
+            if self.clock() - self.opened_at < self.recovery_timeout:
+                return None
+            self._transition(HALF_OPEN)
+        # half-open: bir vaqtda faqat bitta sinov chaqiruvi
+        if self._probing:
+            return None
+        self._probing = True
+        return self._generation
+
+    def record_success(self, ticket: Optional[int] = None):
+        # ochiq holatda ticket berilmaydi: ochilishdan oldin boshlangan sekin chaqiruv yopa olmaydi
+        if not self._current(ticket) or self.state == OPEN:
+            return
+        self.failures = 0
+        if self.state == HALF_OPEN:
+            self._probing = False
+            self._transition(CLOSED)
+
+    def record_failure(self, ticket: Optional[int] = None):
+        if not self._current(ticket) or self.state == OPEN:
+            return
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            self._probing = False
+            self.opened_at = self.clock()
+            self._transition(OPEN)
+
+    def release_probe(self, ticket: Optional[int] = None):
+        """Sinov natijasiz tugadi (masalan cancel): keyingi chaqiruv yana sinov bo'la oladi"""
+        if self._current(ticket) and self.state == HALF_OPEN:
+            self._probing = False
+
+    def _current(self, ticket: Optional[int]) -> bool:
+        # ticketsiz chaqiruv (qo'lda boshqarish) joriy holatga yoziladi
+        return ticket is None or ticket == self._generation
+
+    def retry_after(self) -> float:
+        """Ochiq holatda keyingi sinovgacha qolgan vaqt, aks holda 1 soniya"""
+        if self.state == OPEN:
+            return max(1.0, self.recovery_timeout - (self.clock() - self.opened_at))
+        return 1.0
+
+    def _transition(self, state: str):
+        previous, self.state = self.state, state
+        self._generation += 1
+        self.transitions[f"{previous}->{state}"] += 1
+        logger.warning(
+            "Rate limiter circuit breaker state changed",
+            extra={"from_state": previous, "to_state": state, "failures": self.failures},
+        )
+        for listener in self.listeners:
+            listener(previous, state)
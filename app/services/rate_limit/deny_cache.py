@@ -0,0 +1,44 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+
+class DenyCache:
+    """
+        Remembers keys that were just denied until their retry-after expires,
+        so repeated requests from a blocked client are rejected in-process
+        with a decreasing Retry-After instead of running a Redis script.
+        Bounded LRU: the least recently denied key is dropped first.
+    """
+
+    def __init__(self, max_keys: int = 100_000, clock=time.monotonic):
+        self.max_keys = max_keys
+        self.clock = clock
+        self._blocked: "OrderedDict[str, float]" = OrderedDict()  # key -> blocked_until
+        self.hits = 0  # Redisga bormasdan rad etilgan so'rovlar
+
+    def __len__(self) -> int:
+        return len(self._blocked)
+
+    def get(self, key: str) -> Optional[float]:
+        blocked_until = self._blocked.get(key)
+        if blocked_until is None:
+            return None
+        remaining = blocked_until - self.clock()
+        if remaining <= 0:
+            del self._blocked[key]
+            return None
+        self.hits += 1
+        return math.ceil(remaining * 1000) / 1000
+
+    def add(self, key: str, retry_after: float):
+        if retry_after <= 0:
+            return
+        self._blocked[key] = self.clock() + retry_after
+        self._blocked.move_to_end(key)
+        if len(self._blocked) > self.max_keys:
+            self._blocked.popitem(last=False)
+
+    def clear(self):
+        self._blocked.clear()
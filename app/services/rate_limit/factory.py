@@ -1,11 +1,13 @@
 from app.services.rate_limit.algorithms import (
     FixedWindowAlgorithm,
     SlidingWindowLogAlgorithm,
+    SlidingWindowCounterAlgorithm,
     TokenBucketAlgorithm,
     LeakyBucketAlgorithm,
+    GCRAAlgorithm,
     RateLimitAlgorithm
 )
-from app.repositories.redis import RedisRateLimitRepository
+from app.core.interfaces import RateLimitRepository
 
 
 class AlgorithmFactory:
@@ -16,14 +18,18 @@ class AlgorithmFactory:
     """
 
     @staticmethod
-    def create(algorithm_name: str, repo: RedisRateLimitRepository) -> RateLimitAlgorithm:
+    def create(algorithm_name: str, repo: RateLimitRepository) -> RateLimitAlgorithm:
         if algorithm_name == "fixed_window":
             return FixedWindowAlgorithm(repo)
         elif algorithm_name == "sliding_window_log":
             return SlidingWindowLogAlgorithm(repo)
+        elif algorithm_name == "sliding_window":
+            return SlidingWindowCounterAlgorithm(repo)
         elif algorithm_name == "token_bucket":
             return TokenBucketAlgorithm(repo)
         elif algorithm_name == "leaky_bucket":
             return LeakyBucketAlgorithm(repo)
+        elif algorithm_name == "gcra":
+            return GCRAAlgorithm(repo)
         else:
             raise ValueError(f"Unknown algorithm: {algorithm_name}")
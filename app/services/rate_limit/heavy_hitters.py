@@ -0,0 +1,103 @@
+import heapq
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class HeavyHitter:
+    identity: str
+    count: int
+    error: int  # haqiqiy son [count - error, count] oralig'ida
+
+
+class SpaceSaving:
+    """
+        Space-Saving top-k sketch: tracks at most `capacity` items. A new item
+        replaces the current minimum and inherits its count as error, so any
+        item seen more than N / capacity times is guaranteed to be present.
+        The minimum is found through a heap with lazy invalidation.
+    """
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self.total = 0
+        self._counts: dict[str, int] = {}
+        self._errors: dict[str, int] = {}
+        self._heap: list[tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def add(self, item: str, count: int = 1):
+        self.total += count
+        current = self._counts.get(item)
+        if current is not None:
+            # heapdagi eski yozuv keyin tashlab yuboriladi
+            self._counts[item] = current + count
+            return
+
+        error = 0
+        if len(self._counts) >= self.capacity:
+            evicted, error = self._pop_min()
+            del self._counts[evicted]
+            del self._errors[evicted]
+        self._counts[item] = error + count
+        self._errors[item] = error
+        heapq.heappush(self._heap, (error + count, item))
+
+    def _pop_min(self) -> tuple[str, int]:
+        while True:
+            count, item = heapq.heappop(self._heap)
+            current = self._counts.get(item)
+            if current == count:
+                return item, count
+            if current is not None:
+                # hisob oshgan: yangi qiymat bilan qaytariladi
+                heapq.heappush(self._heap, (current, item))
+
+    def top(self, n: int = 10) -> list[HeavyHitter]:
+        items = heapq.nlargest(n, self._counts.items(), key=lambda entry: entry[1])
+        return [HeavyHitter(item, count, self._errors[item]) for item, count in items]
+
+    def clear(self):
+        self.total = 0
+        self._counts.clear()
+        self._errors.clear()
+        self._heap.clear()
+
+
+class HeavyHitters:
+    """
+        Per-rule Space-Saving sketches of allowed and denied identities
+        (`ip:<addr>` / `user:<id>`). In-process: every worker sees its own share
+        of the traffic.
+    """
+
+    DECISIONS = ("allowed", "denied")
+
+    def __init__(self, capacity: int = 100):
+        self.capacity = capacity
+        self._sketches: dict[str, dict[str, SpaceSaving]] = {}
+
+    def record(self, rule: str, identity: str, allowed: bool):
+        sketches = self._sketches.get(rule)
+        if sketches is None:
+            sketches = self._sketches[rule] = {
+                decision: SpaceSaving(self.capacity) for decision in self.DECISIONS
+            }
+        sketches["allowed" if allowed else "denied"].add(identity)
+
+    def rules(self) -> list[str]:
+        return sorted(self._sketches)
+
+    def top(self, rule: str, decision: str = "denied", n: int = 10) -> list[HeavyHitter]:
+        sketches = self._sketches.get(rule)
+        if sketches is None:
+            return []
+        return sketches[decision].top(n)
+
+    def total(self, rule: str, decision: str = "denied") -> int:
+        sketches = self._sketches.get(rule)
+        return sketches[decision].total if sketches is not None else 0
+
+    def clear(self):
+        self._sketches.clear()
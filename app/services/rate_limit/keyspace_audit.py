@@ -0,0 +1,276 @@
+"""
+Limiter keyspace audit: key counts, sampled MEMORY USAGE and TTL spread per
+rule and algorithm, plus keys left behind by deleted rules.
+
+    python -m app.services.rate_limit.keyspace_audit --sample-rate 0.05 --output keyspace.json
+"""
+import argparse
+import asyncio
+import json
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from typing import Optional, Sequence
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.interfaces import RateLimitRepository
+from app.repositories.redis import RedisRateLimitRepository, ShardedRateLimitRepository, redis_client
+from app.utils.logger import logger
+
+PREFIX = "rate_limit:"
+LIMIT_PREFIX = "rate_limit:{"
+PENALTY_PREFIX = "rate_limit:penalty"
+RULE_SCOPE = re.compile(r":rule:(\d+)$")
+TIER_SUFFIX = re.compile(r"^:t(\d+)$")
+TTL_BUCKETS = ((1, "1s"), (10, "10s"), (60, "1m"), (300, "5m"), (3600, "1h"), (86400, "1d"))
+
+
+@dataclass
+class KeyspaceGroup:
+    rule: str  # `rule:<id>`, default, penalty_box, unscoped (hash tagsiz eski format), other
+    algorithm: str
+    orphaned: bool = False  # qoida o'chirilgan/nofaol, kalitlar faqat TTL bilan ketadi
+    keys: int = 0
+    sampled: int = 0
+    sampled_bytes: int = 0
+    no_ttl: int = 0
+    ttl: Counter = field(default_factory=Counter)  # yuqori chegara -> kalitlar soni
+    types: Counter = field(default_factory=Counter)
+
+    @property
+    def avg_bytes(self) -> float:
+        return self.sampled_bytes / self.sampled if self.sampled else 0.0
+
+    @property
+    def estimated_bytes(self) -> float:
+        return self.avg_bytes * self.keys
+
+
+@dataclass
+class KeyspaceReport:
+    scanned: int = 0
+    complete: bool = True  # max_keys'ga yetmasdan butun keyspace ko'rildi
+    seconds: float = 0.0
+    groups: list[KeyspaceGroup] = field(default_factory=list)
+
+    @property
+    def estimated_bytes(self) -> float:
+        return sum(group.estimated_bytes for group in self.groups)
+
+    @property
+    def orphaned_keys(self) -> int:
+        return sum(group.keys for group in self.groups if group.orphaned)
+
+
+def ttl_label(ttl_ms: int) -> str:
+    seconds = ttl_ms / 1000
+    for bound, label in TTL_BUCKETS:
+        if seconds <= bound:
+            return label
+    return f">{TTL_BUCKETS[-1][1]}"
+
+
+def redis_clients(repo: RateLimitRepository) -> list[Redis]:
+    """Limiter kalitlari turgan Redis clientlar; memory backendda bo'sh"""
+    if isinstance(repo, ShardedRateLimitRepository):
+        return [client for shard in repo.shards for client in redis_clients(shard)]
+    if isinstance(repo, RedisRateLimitRepository):
+        return [repo.redis]
+    return []
+
+
+class KeyspaceAuditor:
+    """
+        Walks the limiter keyspace with SCAN (`batch` keys per call, `pause`
+        between batches), so Redis is never blocked. TYPE and PTTL are read
+        for every key, MEMORY USAGE for a `sample_rate` share of them, all
+        pipelined per batch. A key is attributed to its rule through the
+        `rule:<id>` scope and to an algorithm through the rule (or tier) it
+        belongs to; rule ids missing from the rules hash are orphaned.
+    """
+
+    def __init__(
+            self,
+            clients: Sequence[Redis],
+            rules_redis: Redis = redis_client,
+            batch: int = settings.rate_limit_audit_batch,
+            pause: float = settings.rate_limit_audit_pause_ms / 1000,
+            sample_rate: float = settings.rate_limit_audit_sample_rate,
+            memory_samples: int = settings.rate_limit_audit_memory_samples,
+            seed: Optional[int] = None,
+    ):
+        self.clients = list(clients)
+        self.rules_redis = rules_redis
+        self.batch = batch
+        self.pause = pause
+        self.sample_rate = sample_rate
+        self.memory_samples = memory_samples
+        self.random = random.Random(seed)
+        self.memory_usage = sample_rate > 0
+        self.rules: dict[int, dict] = {}
+
+    async def load_rules(self) -> dict[int, dict]:
+        data = await self.rules_redis.hgetall(settings.rate_limit_rules_key)
+        return {int(rule_id): json.loads(raw) for rule_id, raw in data.items()}
+
+    def classify(self, key: str) -> tuple[str, str, bool]:
+        """(rule, algorithm, orphaned)"""
+        if key.startswith(PENALTY_PREFIX):
+            return "penalty_box", "-", False
+        if not key.startswith(LIMIT_PREFIX):
+            if key.startswith(PREFIX) and key.count(":") >= 3:
+                # hash tag'dan oldingi format: rate_limit:ip:<addr>:<path>:<method>
+                return "unscoped", "unknown", False
+            return "other", "-", False
+
+        end = key.rfind("}")
+        tag, suffix = key[len(LIMIT_PREFIX):end], key[end + 1:]
+        match = RULE_SCOPE.search(tag)
+        if match is None:
+            # qoidasi yo'q endpoint: settings'dagi default limit
+            return "default", settings.rate_limit_algorithm, False
+
+        rule_id = int(match.group(1))
+        rule = self.rules.get(rule_id)
+        if rule is None:
+            return f"rule:{rule_id}", "unknown", True
+        algorithm = rule["algorithm"]
+        tier = TIER_SUFFIX.match(suffix)
+        if tier is not None and rule.get("tiers"):
+            index = int(tier.group(1))
+            if index < len(rule["tiers"]):
+                algorithm = rule["tiers"][index]["algorithm"]
+        return f"rule:{rule_id}", algorithm, False
+
+    async def _inspect(self, client: Redis, keys: list[str], groups: dict[tuple[str, str], KeyspaceGroup]):
+        sampled = [self.memory_usage and self.random.random() < self.sample_rate for _ in keys]
+        async with client.pipeline(transaction=False) as pipe:
+            for key, sample in zip(keys, sampled):
+                pipe.type(key)
+                pipe.pttl(key)
+                if sample:
+                    pipe.memory_usage(key, samples=self.memory_samples)
+            results = iter(await pipe.execute(raise_on_error=False))
+
+        for key, sample in zip(keys, sampled):
+            key_type, ttl = next(results), next(results)
+            for result in (key_type, ttl):
+                if isinstance(result, Exception):
+                    raise result
+            usage = next(results) if sample else None
+            if isinstance(usage, Exception):
+                # managed Redis'larda MEMORY o'chirilgan bo'lishi mumkin: faqat sanash davom etadi
+                if self.memory_usage:
+                    logger.warning("MEMORY USAGE unavailable, auditing without sizes", extra={"error": str(usage)})
+                self.memory_usage = False
+                usage = None
+            if ttl == -2:
+                # SCAN va TYPE orasida muddati tugagan
+                continue
+            rule, algorithm, orphaned = self.classify(key)
+            group = groups.get((rule, algorithm))
+            if group is None:
+                group = groups[(rule, algorithm)] = KeyspaceGroup(rule, algorithm, orphaned)
+            group.keys += 1
+            group.types[key_type.decode() if isinstance(key_type, bytes) else key_type] += 1
+            if ttl == -1:
+                group.no_ttl += 1
+            else:
+                group.ttl[ttl_label(ttl)] += 1
+            if usage is not None:
+                group.sampled += 1
+                group.sampled_bytes += usage
+
+    async def run(self, max_keys: Optional[int] = None) -> KeyspaceReport:
+        started = time.perf_counter()
+        report = KeyspaceReport()
+        groups: dict[tuple[str, str], KeyspaceGroup] = {}
+        self.rules = await self.load_rules()
+
+        for client in self.clients:
+            keys: list[str] = []
+            async for key in client.scan_iter(match=f"{PREFIX}*", count=self.batch):
+                keys.append(key.decode() if isinstance(key, bytes) else key)
+                if len(keys) < self.batch:
+                    continue
+                await self._inspect(client, keys, groups)
+                report.scanned += len(keys)
+                keys = []
+                if max_keys is not None and report.scanned >= max_keys:
+                    report.complete = False
+                    break
+                # boshqa clientlarning buyruqlariga navbat
+                await asyncio.sleep(self.pause)
+            if keys:
+                await self._inspect(client, keys, groups)
+                report.scanned += len(keys)
+            if not report.complete:
+                break
+
+        report.groups = sorted(groups.values(), key=lambda group: group.estimated_bytes, reverse=True)
+        report.seconds = time.perf_counter() - started
+        logger.info(
+            "Keyspace audit finished",
+            extra={"scanned": report.scanned, "complete": report.complete, "orphaned": report.orphaned_keys},
+        )
+        return report
+
+
+def report_dict(report: KeyspaceReport) -> dict:
+    return {
+        "scanned": report.scanned,
+        "complete": report.complete,
+        "seconds": report.seconds,
+        "estimated_bytes": report.estimated_bytes,
+        "orphaned_keys": report.orphaned_keys,
+        "groups": [
+            {
+                **asdict(group),
+                # asdict Counter'ni (kalit, qiymat) juftlaridan qayta quradi
+                "ttl": dict(group.ttl),
+                "types": dict(group.types),
+                "avg_bytes": group.avg_bytes,
+                "estimated_bytes": group.estimated_bytes,
+            }
+            for group in report.groups
+        ],
+    }
+
+
+async def main(args):
+    from app.core.middleware.dependencies import get_rate_limiter_repo
+
+    clients = redis_clients(get_rate_limiter_repo())
+    if not clients:
+        raise SystemExit("Keyspace audit needs the redis backend")
+    auditor = KeyspaceAuditor(clients, sample_rate=args.sample_rate, batch=args.batch)
+    report = await auditor.run(max_keys=args.max_keys)
+
+    print(f"{'rule':<16}{'algorithm':<20}{'keys':>10}{'no ttl':>8}{'avg B':>9}{'est. MB':>10}  ttl")
+    for group in report.groups:
+        ttl = " ".join(f"{label}:{count}" for label, count in sorted(group.ttl.items()))
+        rule = f"{group.rule}{' (orphan)' if group.orphaned else ''}"
+        print(
+            f"{rule:<16}{group.algorithm:<20}{group.keys:>10}{group.no_ttl:>8}"
+            f"{group.avg_bytes:>9.0f}{group.estimated_bytes / 2 ** 20:>10.2f}  {ttl}"
+        )
+    print(
+        f"scanned {report.scanned} keys in {report.seconds:.1f}s{'' if report.complete else ' (stopped at --max-keys)'},"
+        f" ~{report.estimated_bytes / 2 ** 20:.1f} MB, {report.orphaned_keys} orphaned"
+    )
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report_dict(report), file, indent=2)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sample-rate", type=float, default=settings.rate_limit_audit_sample_rate)
+    parser.add_argument("--batch", type=int, default=settings.rate_limit_audit_batch)
+    parser.add_argument("--max-keys", type=int)
+    parser.add_argument("--output", help="JSON natija fayli")
+    asyncio.run(main(parser.parse_args()))
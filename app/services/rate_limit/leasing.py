@@ -0,0 +1,160 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from app.core.entities import RateLimitResult
+from app.core.interfaces import RateLimitRepository
+from app.utils.logger import logger
+
+
+class _Lease:
+    __slots__ = ("algorithm", "limit", "window", "remaining", "expires_at",
+                 "leased_at", "granted", "rate", "pending", "shared_remaining", "reset_at")
+
+    def __init__(self, algorithm: str, limit: int, window: float):
+        self.algorithm = algorithm
+        self.limit = limit
+        self.window = window
+        self.remaining = 0
+        self.expires_at = 0.0
+        self.leased_at = 0.0
+        self.granted = 0
+        self.rate = 0.0  # kuzatilgan so'rov/soniya (EWMA)
+        self.pending: Optional[asyncio.Future] = None
+        # oxirgi lease javobidagi umumiy holat: boshqa workerlar ham sarflaydi, taxminiy
+        self.shared_remaining = 0
+        self.reset_at = 0.0
+
+
+class QuotaLeaser:
+    """
+        Local quota leasing for fixed_window and token_bucket.
+        A worker reserves a batch of counts/tokens for a key in one script call
+        and admits requests from memory until the batch runs out or expires.
+        The batch size follows the observed request rate of the key and never
+        exceeds `max_fraction` of the limit, which bounds how far one worker
+        can run ahead of the shared state. Unused quota is returned when a
+        lease expires, is evicted or the worker shuts down. Reported remaining
+        quota is the local lease plus what the shared state had left at the
+        last lease, so it is approximate while other workers consume.
+    """
+
+    algorithms = ("fixed_window", "token_bucket")
+
+    def __init__(
+            self,
+            repo: RateLimitRepository,
+            lease_ttl: float = 1.0,
+            max_fraction: float = 0.1,
+            max_keys: int = 10000,
+    ):
+        self.repo = repo
+        self.lease_ttl = lease_ttl
+        self.max_fraction = max_fraction
+        self.max_keys = max_keys
+        self.leases: "OrderedDict[str, _Lease]" = OrderedDict()
+
+    def lease_size(self, lease: _Lease) -> int:
+        bound = max(1, int(lease.limit * self.max_fraction))
+        wanted = math.ceil(lease.rate * self.lease_ttl)
+        return max(1, min(wanted, bound))
+
+    @staticmethod
+    def _result(lease: _Lease, retry_after: float = 0) -> RateLimitResult:
+        reset = max(0.0, lease.reset_at - time.monotonic())
+        if retry_after:
+            return RateLimitResult(False, retry_after, lease.limit, 0, reset)
+        return RateLimitResult(True, 0, lease.limit, lease.remaining + lease.shared_remaining, reset)
+
+    async def check(self, algorithm_name: str, key: str, limit: int, window: float) -> RateLimitResult:
+        now = time.monotonic()
+        lease = self.leases.get(key)
+        if lease is None or lease.limit != limit or lease.window != window or lease.algorithm != algorithm_name:
+            if lease is not None:
+                await self._release(key, lease)
+            lease = self._track(key, _Lease(algorithm_name, limit, window))
+        else:
+            self.leases.move_to_end(key)
+
+        if lease.remaining > 0 and now < lease.expires_at:
+            lease.remaining -= 1
+            return self._result(lease)
+
+        # bir vaqtda kelgan so'rovlar bitta yangi lease'ni kutadi
+        if lease.pending is None:
+            lease.pending = asyncio.ensure_future(self._renew(key, lease, now))
+        pending = lease.pending
+        try:
+            retry_after = await asyncio.shield(pending)
+        finally:
+            if lease.pending is pending and pending.done():
+                lease.pending = None
+
+        if retry_after:
+            return self._result(lease, retry_after)
+        if lease.remaining > 0:
+            lease.remaining -= 1
+            return self._result(lease)
+        return await self.check(algorithm_name, key, limit, window)
+
+    async def _renew(self, key: str, lease: _Lease, now: float) -> float:
+        if lease.granted:
+            elapsed = max(now - lease.leased_at, 1e-3)
+            observed = (lease.granted - lease.remaining) / elapsed
+            lease.rate = observed if lease.rate == 0 else (lease.rate + observed) / 2
+        else:
+            lease.rate = 1 / self.lease_ttl
+
+        # muddati o'tgan lease'ning qoldig'i qaytarilmaydi: window almashgan bo'lsa yangi windowdan ayrilardi
+        await self._release(key, lease)
+        lease.remaining = 0
+
+        amount = self.lease_size(lease)
+        if lease.algorithm == "fixed_window":
+            granted, ttl, shared_remaining, reset = await self.repo.lease_fixed_window(
+                key, lease.limit, lease.window, amount
+            )
+            # lease window tugashidan oldin yopiladi, keyingi windowga o'tib ketmaydi
+            expires_in = min(self.lease_ttl, max(ttl, 0) * 0.9)
+            retry_after = ttl
+        else:
+            granted, wait, shared_remaining, reset = await self.repo.lease_token_bucket(
+                key, lease.limit, lease.window, amount
+            )
+            expires_in = self.lease_ttl
+            retry_after = wait
+
+        lease.leased_at = time.monotonic()
+        lease.granted = granted
+        lease.remaining = granted
+        lease.expires_at = lease.leased_at + expires_in
+        lease.shared_remaining = shared_remaining
+        lease.reset_at = lease.leased_at + reset
+        return 0 if granted else retry_after
+
+    def _track(self, key: str, lease: _Lease) -> _Lease:
+        self.leases[key] = lease
+        if len(self.leases) > self.max_keys:
+            old_key, old_lease = self.leases.popitem(last=False)
+            asyncio.ensure_future(self._release(old_key, old_lease))
+        return lease
+
+    async def _return(self, key: str, lease: _Lease):
+        amount, lease.remaining = lease.remaining, 0
+        try:
+            if lease.algorithm == "fixed_window":
+                await self.repo.release_fixed_window(key, amount)
+            else:
+                await self.repo.release_token_bucket(key, lease.limit, lease.window, amount)
+        except Exception:
+            logger.exception("Failed to return leased quota", extra={"key": key})
+
+    async def _release(self, key: str, lease: _Lease):
+        if lease.remaining > 0 and time.monotonic() < lease.expires_at:
+            await self._return(key, lease)
+
+    async def release_all(self):
+        leases, self.leases = self.leases, OrderedDict()
+        await asyncio.gather(*(self._release(key, lease) for key, lease in leases.items()))
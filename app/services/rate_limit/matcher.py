@@ -0,0 +1,90 @@
+from typing import Iterable, Optional
+
+from app.core.entities import RateLimitRule
+
+
+def split_path(path: str) -> list[str]:
+    return [segment for segment in path.split("/") if segment]
+
+
+def is_param(segment: str) -> bool:
+    return segment.startswith("{") and segment.endswith("}")
+
+
+class _Node:
+    __slots__ = ("static", "param", "rules", "max_priority")
+
+    def __init__(self):
+        self.static: dict[str, "_Node"] = {}
+        self.param: Optional["_Node"] = None
+        # method -> eng yuqori priority'li qoida, None kaliti = barcha methodlar
+        self.rules: dict[Optional[str], RateLimitRule] = {}
+        # shu tugun ostidagi qoidalarning eng katta priority'si: yuta olmaydigan shoxlar ko'rilmaydi
+        self.max_priority = float("-inf")
+
+
+def _better(candidate: Optional[RateLimitRule], current: Optional[RateLimitRule]) -> bool:
+    # teng priority'da avval topilgani (aniqroq yo'l) qoladi
+    if candidate is None:
+        return False
+    return current is None or candidate.priority > current.priority
+
+
+class RuleMatcher:
+    """
+        Segment trie over (path template, method).
+        Lookup tries the static child before the `{param}` child at every
+        segment. Among all matching rules the highest priority wins; on equal
+        priority static segments beat templates and an exact method beats a
+        method-less rule. Each node keeps the highest priority in its subtree,
+        and a subtree that cannot beat the best rule found so far is skipped,
+        so with no templates, or with the static rule on top, lookup is one
+        node per segment. The worst case (templates outranking static rules at
+        many levels) visits every branch matching the path, bounded by the
+        number of rules, not only by path depth.
+    """
+
+    def __init__(self, rules: Iterable[RateLimitRule] = ()):
+        self.root = _Node()
+        self.size = 0
+        for rule in rules:
+            self.add(rule)
+
+    def add(self, rule: RateLimitRule):
+        node = self.root
+        node.max_priority = max(node.max_priority, rule.priority)
+        for segment in split_path(rule.path):
+            if is_param(segment):
+                if node.param is None:
+                    node.param = _Node()
+                node = node.param
+            else:
+                node = node.static.setdefault(segment, _Node())
+            node.max_priority = max(node.max_priority, rule.priority)
+
+        if _better(rule, node.rules.get(rule.method)):
+            node.rules[rule.method] = rule
+        self.size += 1
+
+    def match(self, path: str, method: str) -> Optional[RateLimitRule]:
+        return self._match(self.root, split_path(path), 0, method, None)
+
+    def _match(
+            self,
+            node: _Node,
+            segments: list[str],
+            index: int,
+            method: str,
+            best: Optional[RateLimitRule],
+    ) -> Optional[RateLimitRule]:
+        if index == len(segments):
+            for rule in (node.rules.get(method), node.rules.get(None)):
+                if _better(rule, best):
+                    best = rule
+            return best
+
+        for child in (node.static.get(segments[index]), node.param):
+            # teng priority ham yetmaydi: avval topilgani qoladi
+            if child is not None and (best is None or child.max_priority > best.priority):
+                best = self._match(child, segments, index + 1, method, best)
+        return best
@@ -0,0 +1,168 @@
+import asyncio
+import math
+import time
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.interfaces import RateLimitRepository
+from app.utils.logger import logger
+
+
+class PenaltyBox:
+    """
+        Escalating bans for repeat violators, checked before any algorithm.
+
+        Every fresh deny is a strike (a fixed-window count per identity). Once
+        `strikes` are collected within `strike_window`, the identity is banned
+        for `base_ban * factor ** (n - 1)` seconds, capped at `max_ban`, where n
+        is the number of bans within `decay`. Bans live in one Redis sorted set
+        (identity -> banned-until) and are announced on a pub/sub channel; each
+        worker keeps a local dict copy, so the check on the hot path is a dict
+        lookup. Without `redis` the box is local to the worker.
+    """
+
+    def __init__(
+            self,
+            repo: RateLimitRepository,
+            redis: Optional[Redis] = None,
+            strikes: int = 5,
+            strike_window: float = 60.0,
+            base_ban: float = 60.0,
+            factor: float = 2.0,
+            max_ban: float = 3600.0,
+            decay: float = 86400.0,
+            clock=time.time,
+    ):
+        self.repo = repo
+        self.redis = redis
+        self.strikes = strikes
+        self.strike_window = strike_window
+        self.base_ban = base_ban
+        self.factor = factor
+        self.max_ban = max_ban
+        self.decay = decay
+        self.clock = clock
+        self._banned: dict[str, float] = {}  # identity -> banned_until (epoch)
+        self._task: Optional[asyncio.Task] = None
+        self.hits = 0  # ban tufayli algoritmsiz rad etilgan so'rovlar
+
+    def __len__(self) -> int:
+        return len(self._banned)
+
+    def get(self, identity: str) -> Optional[float]:
+        """Ban tugashiga qolgan soniya yoki None"""
+        banned_until = self._banned.get(identity)
+        if banned_until is None:
+            return None
+        remaining = banned_until - self.clock()
+        if remaining <= 0:
+            del self._banned[identity]
+            return None
+        self.hits += 1
+        return math.ceil(remaining * 1000) / 1000
+
+    def bans(self) -> dict[str, float]:
+        now = self.clock()
+        return {identity: until for identity, until in self._banned.items() if until > now}
+
+    def ban_duration(self, level: int) -> float:
+        return min(self.max_ban, self.base_ban * self.factor ** (level - 1))
+
+    async def strike(self, identity: str) -> Optional[float]:
+        """Yangi rad etish: chegaraga yetsa ban qo'yiladi, ban muddati qaytadi"""
+        # {...} - hash tag: identity kalitlari bitta slot/shardga tushadi
+        count, *_ = await self.repo.increment_and_check(
+            f"rate_limit:penalty:{{{identity}}}:strikes", self.strikes, self.strike_window
+        )
+        if count != self.strikes:
+            # ban faqat chegaraga aynan yetganda, qolgan zarbalar window tugashini kutadi
+            return None
+        level, *_ = await self.repo.increment_and_check(
+            f"rate_limit:penalty:{{{identity}}}:level", 2 ** 31, self.decay
+        )
+        duration = self.ban_duration(level)
+        await self.ban(identity, duration)
+        logger.warning("Identity banned", extra={"identity": identity, "level": level, "seconds": duration})
+        return duration
+
+    async def ban(self, identity: str, duration: float):
+        banned_until = self.clock() + duration
+        self._banned[identity] = banned_until
+        if self.redis is None:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zadd(settings.rate_limit_penalty_key, {identity: banned_until})
+            pipe.publish(settings.rate_limit_penalty_channel, f"{identity} {banned_until}")
+            await pipe.execute()
+
+    async def unban(self, identity: str):
+        self._banned.pop(identity, None)
+        if self.redis is None:
+            return
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zrem(settings.rate_limit_penalty_key, identity)
+            pipe.publish(settings.rate_limit_penalty_channel, f"{identity} 0")
+            await pipe.execute()
+
+    async def refresh(self):
+        """Redisdagi to'plamdan lokal nusxani qayta quradi, muddati o'tganlarini o'chiradi"""
+        now = self.clock()
+        async with self.redis.pipeline(transaction=False) as pipe:
+            pipe.zremrangebyscore(settings.rate_limit_penalty_key, "-inf", now)
+            pipe.zrangebyscore(settings.rate_limit_penalty_key, now, "+inf", withscores=True)
+            _, entries = await pipe.execute()
+        self._banned = {
+            (identity.decode() if isinstance(identity, bytes) else identity): until
+            for identity, until in entries
+        }
+
+    def apply(self, message: bytes | str):
+        identity, _, until = (message.decode() if isinstance(message, bytes) else message).rpartition(" ")
+        banned_until = float(until)
+        if banned_until > self.clock():
+            self._banned[identity] = banned_until
+        else:
+            self._banned.pop(identity, None)
+
+    async def start(self):
+        if self.redis is None:
+            return
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Initial penalty box load failed")
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(settings.rate_limit_penalty_channel)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=settings.rate_limit_penalty_poll_seconds,
+                    )
+                    if message is None:
+                        # xabar yo'qolgan bo'lishi mumkin: to'plamdan qayta o'qiladi
+                        await self.refresh()
+                    else:
+                        self.apply(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Penalty box listener failed, reconnecting")
+                await asyncio.sleep(settings.rate_limit_penalty_poll_seconds)
+            finally:
+                await pubsub.aclose()
@@ -1,37 +1,321 @@
-from typing import Optional
+import asyncio
+from typing import Awaitable, Callable, Optional, Sequence
 from app.core.config import settings
-from app.core.entities import RequestInfo, EndpointRateLimitConfig
+from app.core.entities import RequestInfo, RateLimitResult, RateLimitRule
 from app.services.rate_limit.factory import AlgorithmFactory
-from app.repositories.redis import RedisRateLimitRepository
+from app.services.rate_limit.algorithms import RateLimitAlgorithm
+from app.services.rate_limit.leasing import QuotaLeaser
+from app.services.rate_limit.deny_cache import DenyCache
+from app.services.rate_limit.circuit_breaker import CircuitBreaker
+from app.services.rate_limit.heavy_hitters import HeavyHitters
+from app.services.rate_limit.penalty_box import PenaltyBox
+from app.core.interfaces import RateLimitRepository
+from app.core.metrics import DECISIONS, FALLBACKS
+from app.repositories.redis.batching import bulk_pipeline
+from app.utils.logger import logger
 
 
 class RateLimiterService:
-    def __init__(self, repo: RedisRateLimitRepository):
+    def __init__(
+            self,
+            repo: RateLimitRepository,
+            leaser: Optional[QuotaLeaser] = None,
+            deny_cache: Optional[DenyCache] = None,
+            breaker: Optional[CircuitBreaker] = None,
+            latency_budget: Optional[float] = None,
+            fallback: Optional["RateLimiterService"] = None,
+            heavy_hitters: Optional[HeavyHitters] = None,
+            penalty_box: Optional[PenaltyBox] = None,
+    ):
         self.repo = repo
+        self.leaser = leaser
+        self.deny_cache = deny_cache
+        self.breaker = breaker
+        self.latency_budget = latency_budget  # soniya; None - cheklanmagan
+        self.fallback = fallback  # failure_mode="local" uchun process ichidagi limiter
+        self.heavy_hitters = heavy_hitters
+        self.penalty_box = penalty_box
+        self._algorithms: dict[str, RateLimitAlgorithm] = {}
+        self._strikes: set[asyncio.Task] = set()
+
+    def get_algorithm(self, algorithm_name: str) -> RateLimitAlgorithm:
+        # algoritm obyektlari holatsiz, har request uchun qayta yaratilmaydi
+        algorithm = self._algorithms.get(algorithm_name)
+        if algorithm is None:
+            algorithm = AlgorithmFactory.create(algorithm_name, self.repo)
+            self._algorithms[algorithm_name] = algorithm
+        return algorithm
 
     async def is_allowed(
             self,
             request_info: RequestInfo,
-            endpoint_config: Optional[EndpointRateLimitConfig] = None
-    ) -> tuple[bool, int]:
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        return await self.check(
+            request_info.client_ip,
+            request_info.user_id,
+            request_info.endpoint,
+            request_info.method,
+            endpoint_config,
+        )
+
+    async def check(
+            self,
+            client_ip: str,
+            user_id: Optional[str],
+            endpoint: str,
+            method: str,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        return await self.decide(self.identity(client_ip, user_id, endpoint_config), endpoint, method, endpoint_config)
+
+    @staticmethod
+    def identity(client_ip: str, user_id: Optional[str], endpoint_config: Optional[RateLimitRule] = None) -> str:
+        """Qoida user bo'yicha va user ma'lum bo'lsa `user:<id>`, aks holda `ip:<addr>`"""
+        if endpoint_config and endpoint_config.key_type == "user" and user_id:
+            return f"user:{user_id}"
+        return f"ip:{client_ip}"
 
+    @staticmethod
+    def resolve(
+            endpoint: str,
+            method: str,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> tuple[int, float, str, str, str]:
+        """(limit, window, algorithm, scope, rule_label) - qoida yoki default sozlamalar"""
         if endpoint_config:
-            limit = endpoint_config.limit
-            window = endpoint_config.window
-            algorithm_name = endpoint_config.algorithm
-            key_type = endpoint_config.key_type
-        else:
-            limit = settings.default_rate_limit
-            window = settings.default_rate_limit_window
-            algorithm_name = settings.rate_limit_algorithm
-            key_type = "ip"
-
-        if key_type == "user" and request_info.user_id:
-            identifier = request_info.user_id
-            key = f"rate_limit:user:{identifier}:{request_info.endpoint}:{request_info.method}"
-        else:
-            identifier = request_info.client_ip
-            key = f"rate_limit:ip:{identifier}:{request_info.endpoint}:{request_info.method}"
-
-        algorithm = AlgorithmFactory.create(algorithm_name, self.repo)
-        return await algorithm.check(key, limit, window)
+            return (
+                endpoint_config.limit,
+                endpoint_config.window,
+                endpoint_config.algorithm,
+                endpoint_config.scope,
+                endpoint_config.scope,
+            )
+        return (
+            settings.default_rate_limit,
+            settings.default_rate_limit_window,
+            settings.rate_limit_algorithm,
+            f"{endpoint}:{method}",
+            "default",
+        )
+
+    async def decide(
+            self,
+            identity: str,
+            endpoint: str,
+            method: str,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        """`identity` - `ip:<addr>` yoki `user:<id>`, kalit shu identity va qoida bo'yicha"""
+        limit, window, algorithm_name, scope, rule_label = self.resolve(endpoint, method, endpoint_config)
+        # {...} - hash tag: bitta limitning barcha kalitlari bitta slot/shardga tushadi
+        key = f"rate_limit:{{{identity}:{scope}}}"
+
+        if self.penalty_box is not None:
+            # ban qilingan identity: hech qanday algoritm ishlamaydi
+            retry_after = self.penalty_box.get(identity)
+            if retry_after is not None:
+                DECISIONS.inc((rule_label, algorithm_name, "penalty_box"))
+                self.record(rule_label, identity, False)
+                return RateLimitResult(False, retry_after, limit, 0, retry_after)
+
+        if self.deny_cache is not None:
+            # yaqinda rad etilgan kalit: Retry-After tugaguncha Redisga bormaymiz
+            retry_after = self.deny_cache.get(key)
+            if retry_after is not None:
+                DECISIONS.inc((rule_label, algorithm_name, "deny_cache"))
+                self.record(rule_label, identity, False)
+                return RateLimitResult(False, retry_after, limit, 0, retry_after)
+
+        result = await self.evaluate(key, algorithm_name, limit, window, endpoint_config)
+        DECISIONS.inc((rule_label, algorithm_name, "allowed" if result.allowed else "denied"))
+        self.record(rule_label, identity, result.allowed)
+        if not result.allowed:
+            if self.deny_cache is not None:
+                self.deny_cache.add(key, result.retry_after)
+            self.schedule_strike(identity)
+        return result
+
+    async def decide_many(
+            self,
+            requests: Sequence[tuple[str, str, str, Optional[RateLimitRule]]],
+    ) -> list[RateLimitResult]:
+        """(identity, endpoint, method, qoida) ro'yxati: barcha skriptlar bitta pipeline'da"""
+        with bulk_pipeline():
+            return await asyncio.gather(*(self.decide(*request) for request in requests))
+
+    async def peek(
+            self,
+            identity: str,
+            endpoint: str,
+            method: str,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> tuple[Optional[int], float]:
+        """
+        Kvotani sarflamasdan (qolgan so'rovlar, retry_after); lease qilingan lokal kvota hisobga olinmaydi.
+        Backend ishlamasa decide kabi failure_mode bo'yicha, open'da qolgan so'rovlar noma'lum (None)
+        """
+        limit, window, algorithm_name, scope, _ = self.resolve(endpoint, method, endpoint_config)
+        key = f"rate_limit:{{{identity}:{scope}}}"
+        if self.penalty_box is not None:
+            retry_after = self.penalty_box.get(identity)
+            if retry_after is not None:
+                return 0, retry_after
+        return await self.guarded(
+            key,
+            lambda: self._peek(key, algorithm_name, limit, window, endpoint_config),
+            lambda: self.degrade_peek(key, algorithm_name, limit, window, endpoint_config),
+        )
+
+    async def peek_many(
+            self,
+            requests: Sequence[tuple[str, str, str, Optional[RateLimitRule]]],
+    ) -> list[tuple[Optional[int], float]]:
+        with bulk_pipeline():
+            return await asyncio.gather(*(self.peek(*request) for request in requests))
+
+    def record(self, rule_label: str, identity: str, allowed: bool):
+        if self.heavy_hitters is not None:
+            self.heavy_hitters.record(rule_label, identity, allowed)
+
+    def schedule_strike(self, identity: str):
+        # rad etish javobi zarbani kutmaydi: Redis sekinlashsa ham deny yo'li latency budget ichida qoladi
+        if self.penalty_box is None or (self.breaker is not None and self.breaker.state != "closed"):
+            return
+        task = asyncio.create_task(self.strike(identity))
+        self._strikes.add(task)
+        task.add_done_callback(self._strikes.discard)
+
+    async def strike(self, identity: str):
+        # backend ishlamayotganda zarbalar hisoblanmaydi: har biri timeoutgacha kutardi
+        if self.penalty_box is None or (self.breaker is not None and self.breaker.state != "closed"):
+            return
+        try:
+            # fondagi zarbalar ham budget bilan: sekin Redis'da to'planib qolmaydi
+            async with asyncio.timeout(self.latency_budget):
+                await self.penalty_box.strike(identity)
+        except Exception as exc:
+            logger.warning("Penalty strike failed", extra={"identity": identity, "error": repr(exc)})
+
+    async def evaluate(
+            self,
+            key: str,
+            algorithm_name: str,
+            limit: int,
+            window: float,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        return await self.guarded(
+            key,
+            lambda: self._evaluate(key, algorithm_name, limit, window, endpoint_config),
+            lambda: self.degrade(key, algorithm_name, limit, window, endpoint_config),
+        )
+
+    async def guarded(self, key: str, call: Callable[[], Awaitable], degraded: Callable[[], Awaitable]):
+        """Backend chaqiruvi circuit breaker va latency budget ostida; ishlamasa `degraded` javobi"""
+        if self.breaker is None:
+            return await call()
+        ticket = self.breaker.allow()
+        if ticket is None:
+            return await degraded()
+
+        try:
+            async with asyncio.timeout(self.latency_budget):
+                result = await call()
+        except Exception as exc:
+            # timeout ham, Redis xatosi ham bir xil: breakerga yoziladi, qoida siyosati qo'llanadi
+            self.breaker.record_failure(ticket)
+            logger.warning("Rate limit check failed", extra={"key": key, "error": repr(exc)})
+            return await degraded()
+        except BaseException:
+            # cancel (client uzildi): natija yo'q, aks holda breaker half-open'da qotib qoladi
+            self.breaker.release_probe(ticket)
+            raise
+        self.breaker.record_success(ticket)
+        return result
+
+    @staticmethod
+    def failure_mode(endpoint_config: Optional[RateLimitRule] = None) -> str:
+        return (endpoint_config and endpoint_config.failure_mode) or settings.rate_limit_failure_mode
+
+    async def degrade(
+            self,
+            key: str,
+            algorithm_name: str,
+            limit: int,
+            window: float,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        failure_mode = self.failure_mode(endpoint_config)
+        FALLBACKS.inc((failure_mode,))
+        if failure_mode == "closed":
+            return RateLimitResult(False, self.breaker.retry_after())
+        if failure_mode == "local" and self.fallback is not None:
+            # taxminiy: har bir worker limitni alohida hisoblaydi
+            return await self.fallback.evaluate(key, algorithm_name, limit, window, endpoint_config)
+        # kvota noma'lum: RateLimit-* headerlari yuborilmaydi
+        return RateLimitResult(True)
+
+    async def degrade_peek(
+            self,
+            key: str,
+            algorithm_name: str,
+            limit: int,
+            window: float,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> tuple[Optional[int], float]:
+        failure_mode = self.failure_mode(endpoint_config)
+        FALLBACKS.inc((failure_mode,))
+        if failure_mode == "closed":
+            return 0, self.breaker.retry_after()
+        if failure_mode == "local" and self.fallback is not None:
+            return await self.fallback._peek(key, algorithm_name, limit, window, endpoint_config)
+        return None, 0
+
+    async def _evaluate(
+            self,
+            key: str,
+            algorithm_name: str,
+            limit: int,
+            window: float,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> RateLimitResult:
+        if endpoint_config and endpoint_config.tiers:
+            # barcha bosqichlar bitta Redis chaqiruvida, hammasi yoki hech biri
+            allowed, retry_after, remaining, reset, tier = await self.repo.multi_limit(key, endpoint_config.tiers)
+            # headerlar eng kam kvota qolgan bosqich bo'yicha
+            return RateLimitResult(bool(allowed), retry_after, endpoint_config.tiers[tier][1], remaining, reset)
+
+        if self.leaser is not None and algorithm_name in self.leaser.algorithms:
+            return await self.leaser.check(algorithm_name, key, limit, window)
+        return await self.get_algorithm(algorithm_name).check(key, limit, window)
+
+    async def _peek(
+            self,
+            key: str,
+            algorithm_name: str,
+            limit: int,
+            window: float,
+            endpoint_config: Optional[RateLimitRule] = None
+    ) -> tuple[int, float]:
+        if endpoint_config and endpoint_config.tiers:
+            return await self.repo.peek_multi(key, endpoint_config.tiers)
+        return await self.repo.peek(key, algorithm_name, limit, window)
+
+    async def start(self):
+        # skriptlar yuklanmagan yoki eskirgan bo'lsa birinchi so'rovdan oldin yuklanadi
+        try:
+            await self.repo.prepare()
+        except Exception as exc:
+            # backend ishlamasa ham app ko'tariladi: so'rovlar failure_mode bo'yicha, kutubxona keyin yuklanadi
+            logger.error("Rate limiter backend prepare failed", extra={"error": repr(exc)})
+        if self.penalty_box is not None:
+            await self.penalty_box.start()
+
+    async def close(self):
+        if self._strikes:
+            await asyncio.gather(*self._strikes, return_exceptions=True)
+        if self.penalty_box is not None:
+            await self.penalty_box.stop()
+        if self.leaser is not None:
+            await self.leaser.release_all()
@@ -0,0 +1,156 @@
+import asyncio
+import json
+import time
+from dataclasses import dataclass, field
+from typing import Optional
+
+from pydantic import ValidationError
+from redis.asyncio import Redis
+
+from app.core.config import settings
+from app.core.entities import RateLimitRule, EndpointRateLimitConfig, TierConfig
+from app.repositories.redis import redis_client
+from app.services.rate_limit.matcher import RuleMatcher
+from app.utils.logger import logger
+
+
+@dataclass(frozen=True)
+class RuleSnapshot:
+    """Qoidalarning bir versiyasi, request davomida o'zgarmaydi"""
+    version: int = 0
+    matcher: RuleMatcher = field(default_factory=RuleMatcher)
+    loaded_at: float = field(default_factory=time.time)
+    rules: dict[int, RateLimitRule] = field(default_factory=dict)  # id -> qoida, diff qo'llash uchun
+
+    def match(self, path: str, method: str) -> Optional[RateLimitRule]:
+        return self.matcher.match(path, method)
+
+    @classmethod
+    def build(cls, version: int, rules: dict[int, RateLimitRule]) -> "RuleSnapshot":
+        # teng priority'da kichik id oldin qo'shiladi: natija yuklash tartibiga bog'liq emas
+        ordered = sorted(rules.values(), key=lambda rule: (-rule.priority, rule.id))
+        return cls(version=version, matcher=RuleMatcher(ordered), rules=rules)
+
+
+def compile_rule(raw: dict) -> Optional[RateLimitRule]:
+    """Redisdagi JSONni bir marta tekshirib, qoidaga aylantiradi"""
+    try:
+        return build_rule(EndpointRateLimitConfig(**raw))
+    except (TypeError, ValidationError):
+        logger.warning("Invalid rate limit rule skipped", extra={"rule": raw})
+        return None
+
+
+def compile_rules(raw_rules: dict) -> dict[int, RateLimitRule]:
+    rules = {}
+    for rule_id, raw in raw_rules.items():
+        rule = compile_rule(raw)
+        if rule is not None:
+            rules[int(rule_id)] = rule
+    return rules
+
+
+def build_rule(config: EndpointRateLimitConfig) -> RateLimitRule:
+    data = config.model_dump()
+    if config.tiers:
+        # asosiy limit birinchi bosqich bo'ladi, barcha bosqichlar bitta skriptda tekshiriladi
+        primary = TierConfig(limit=config.limit, window=config.window, algorithm=config.algorithm)
+        data["tiers"] = tuple(
+            (tier.algorithm, tier.limit, tier.window) for tier in [primary, *config.tiers]
+        )
+    return RateLimitRule(**data)
+
+
+class RuleCache:
+    """
+        Process-local, versioned copy of the rate limit rules.
+        The hot path only reads `snapshot`. The updater publishes per-rule
+        diffs tagged with a version; a diff that directly follows the current
+        version is applied in place, anything else (a gap, a lost message
+        noticed by the periodic version check) triggers a full reload.
+    """
+
+    def __init__(self, redis: Redis = redis_client):
+        self.redis = redis
+        self.snapshot = RuleSnapshot()
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        try:
+            await self.refresh()
+        except Exception:
+            logger.exception("Initial rule cache load failed")
+        self._task = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def refresh(self, force: bool = False):
+        current = await self.redis.get(settings.rate_limit_rules_version_key)
+        version = int(current or 0)
+        if not force and version == self.snapshot.version:
+            return
+
+        # versiya va qoidalar bitta MULTI ichida o'qiladi
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.get(settings.rate_limit_rules_version_key)
+            pipe.hgetall(settings.rate_limit_rules_key)
+            current, data = await pipe.execute()
+
+        rules = compile_rules({rule_id: json.loads(raw) for rule_id, raw in data.items()})
+        self.snapshot = RuleSnapshot.build(int(current or 0), rules)
+        logger.info("Rate limit rules reloaded", extra={"version": self.snapshot.version})
+
+    def apply(self, message: bytes | str) -> bool:
+        """Diffni qo'llaydi; versiyada uzilish bo'lsa False - to'liq qayta yuklash kerak"""
+        diff = json.loads(message)
+        version = diff["version"]
+        if version <= self.snapshot.version:
+            return True
+        if version != self.snapshot.version + 1:
+            return False
+
+        rules = dict(self.snapshot.rules)
+        for rule_id in diff["deletes"]:
+            rules.pop(int(rule_id), None)
+        for rule_id, raw in diff["upserts"].items():
+            rule = compile_rule(raw)
+            if rule is None:
+                rules.pop(int(rule_id), None)
+            else:
+                rules[int(rule_id)] = rule
+        self.snapshot = RuleSnapshot.build(version, rules)
+        logger.info(
+            "Rate limit rules updated",
+            extra={"version": version, "upserts": len(diff["upserts"]), "deletes": len(diff["deletes"])},
+        )
+        return True
+
+    async def _listen(self):
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.subscribe(settings.rate_limit_rules_channel)
+                while True:
+                    message = await pubsub.get_message(
+                        ignore_subscribe_messages=True,
+                        timeout=settings.rate_limit_rules_poll_seconds,
+                    )
+                    if message is None or not self.apply(message["data"]):
+                        await self.refresh()
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Rule cache listener failed, reconnecting")
+                await asyncio.sleep(settings.rate_limit_rules_poll_seconds)
+            finally:
+                await pubsub.aclose()
+
+
+rule_cache = RuleCache()
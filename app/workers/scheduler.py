@@ -1,13 +1,19 @@
+from datetime import datetime
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
+
+from app.core.config import settings
 from app.workers.tasks import RateLimitRuleUpdater
 scheduler = AsyncIOScheduler()
 
 
 def start_scheduler(updater: RateLimitRuleUpdater):
+    # CRUD endpointlari o'zgarishni darhol yuboradi, bu faqat zaxira; o'zgarish bo'lmasa Redisga yozilmaydi
     scheduler.add_job(
         updater.update_rules,
         "interval",
-        minutes=1,
+        seconds=settings.rate_limit_rules_sync_seconds,
+        next_run_time=datetime.now(),
         id="rate_limit_updater",
         replace_existing=True,
     )
@@ -1,36 +1,138 @@
+import asyncio
 import json
+from datetime import datetime, timedelta
+from typing import Optional
 
+from redis.asyncio import Redis
+
+from app.core.config import settings
 from app.repositories.rate_limit.rate_limit_repository import RateLimitRepository
 from app.repositories.redis import redis_client
+from app.utils.logger import logger
 
 
 from app.db.session import AsyncSessionLocal
 
+# now() tranzaksiya boshlangan vaqt: kechroq commit bo'lgan o'zgarish watermarkdan oldingi vaqt bilan yozilishi mumkin
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
 class RateLimitRuleUpdater:
-    def __init__(self):
-        pass
+    """
+        Pushes rule changes from Postgres to Redis as per-rule diffs.
+        Every sync reads only the rows touched since the last watermark plus
+        the ids of active rules (to notice deletions), and compares them with
+        what is published in Redis. If nothing changed, Redis is not written and
+        the version stays put; otherwise the rules hash is updated, the version
+        incremented and the diff published for the workers' rule caches.
+        Every worker process runs its own updater, so syncs are serialized by a
+        Redis lock and the local copy of the published rules is reloaded
+        whenever another process has moved the version since.
+    """
+
+    def __init__(self, redis: Redis = redis_client):
+        self.redis = redis
+        self.watermark: Optional[datetime] = None
+        self.published: Optional[dict[int, str]] = None  # rule id -> JSON, `published_version`dagi Redis holati
+        self.published_version: Optional[int] = None
+        self._lock = asyncio.Lock()
+
+    async def update_rules(self) -> Optional[int]:
+        """O'zgarish bo'lsa yangi versiyani, bo'lmasa None qaytaradi"""
+        # scheduler va CRUD endpointlari bir vaqtda chaqirishi mumkin, boshqa workerlar ham
+        lock = self.redis.lock(
+            settings.rate_limit_rules_lock_key,
+            timeout=settings.rate_limit_rules_lock_seconds,
+            blocking_timeout=settings.rate_limit_rules_lock_seconds,
+        )
+        async with self._lock, lock:
+            await self.sync_published()
+
+            changed, active_ids, watermark = await self.fetch_changes()
+            upserts = {}
+            for rule in changed:
+                if rule["id"] not in active_ids:
+                    continue
+                data = json.dumps(rule, sort_keys=True)
+                if self.published.get(rule["id"]) != data:
+                    upserts[rule["id"]] = data
+            deletes = [rule_id for rule_id in self.published if rule_id not in active_ids]
+
+            version = None
+            if upserts or deletes:
+                version = await self.update_redis(upserts, deletes)
+                self.published.update(upserts)
+                for rule_id in deletes:
+                    del self.published[rule_id]
+                self.published_version = version
+            # update_redis xato bersa bu qatorga yetilmaydi: watermark joyida qoladi, keyingi sync qayta o'qiydi
+            self.watermark = watermark
+            return version
+
+    async def sync_published(self):
+        # boshqa process yangi versiya yozgan bo'lsa lokal nusxa eskirgan, Redisdagi holat qayta o'qiladi
+        version = int(await self.redis.get(settings.rate_limit_rules_version_key) or 0)
+        if self.published is None or version != self.published_version:
+            self.published = await self.load_published()
+            self.published_version = version
 
-    async def update_rules(self):
+    async def fetch_changes(self) -> tuple[list[dict], set[int], Optional[datetime]]:
         async with AsyncSessionLocal() as db:
             repo = RateLimitRepository(db)
+            since = self.watermark - WATERMARK_OVERLAP if self.watermark is not None else None
+            rules = await repo.get_changed_since(since)
+            active_ids = await repo.get_active_ids()
+        watermark = max((rule.updated_at for rule in rules), default=self.watermark)
+        return [self.serialize(rule) for rule in rules], active_ids, watermark
 
-            active_rules = await self.fetch_rules_from_db(repo)
-            await self.update_redis(active_rules)
-
-    async def fetch_rules_from_db(self, repo) -> dict:
-        rules = await repo.get_active_rules()
+    @staticmethod
+    def serialize(rule) -> dict:
         return {
-            rule.path: {
-                "limit": rule.limit,
-                "window": rule.window_seconds,
-                "algorithm": rule.algorithm,
-                "key_type": rule.key_type,
-                "method": rule.method,
-            }
-            for rule in rules
+            "id": rule.id,
+            "path": rule.path,
+            "limit": rule.limit,
+            "window": rule.window_seconds,
+            "algorithm": rule.algorithm,
+            "key_type": rule.key_type,
+            "method": rule.method,
+            "priority": rule.priority,
+            "tiers": [
+                {
+                    "limit": tier["limit"],
+                    "window": tier["window_seconds"],
+                    "algorithm": tier["algorithm"],
+                }
+                for tier in rule.tiers
+            ] if rule.tiers else None,
+            "failure_mode": rule.failure_mode,
         }
 
-    @staticmethod
-    async def update_redis(rules: dict, key: str = "rate_limit_rules_v1"):
-        await redis_client.set(key, json.dumps(rules))
-        print(f"Updated {len(rules)} rules in Redis")
+    async def load_published(self) -> dict[int, str]:
+        # restartdan yoki boshqa process yozganidan keyin: o'zgarmagan qoidalar qayta yozilmaydi
+        data = await self.redis.hgetall(settings.rate_limit_rules_key)
+        return {int(rule_id): raw.decode() for rule_id, raw in data.items()}
+
+    async def update_redis(self, upserts: dict[int, str], deletes: list[int]) -> int:
+        # qoidalar va versiya birga yoziladi, keyin workerlarga faqat farq e'lon qilinadi
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if upserts:
+                pipe.hset(settings.rate_limit_rules_key, mapping={str(rule_id): data for rule_id, data in upserts.items()})
+            if deletes:
+                pipe.hdel(settings.rate_limit_rules_key, *map(str, deletes))
+            pipe.incr(settings.rate_limit_rules_version_key)
+            *_, version = await pipe.execute()
+
+        message = json.dumps({
+            "version": version,
+            "upserts": {str(rule_id): json.loads(data) for rule_id, data in upserts.items()},
+            "deletes": deletes,
+        })
+        await self.redis.publish(settings.rate_limit_rules_channel, message)
+        logger.info(
+            "Rate limit rules updated",
+            extra={"version": version, "upserts": len(upserts), "deletes": len(deletes)},
+        )
+        return version
+
+
+rule_updater = RateLimitRuleUpdater()
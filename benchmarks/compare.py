@@ -0,0 +1,64 @@
+"""
+Compares two benchmark suite reports scenario by scenario.
+
+    python -m benchmarks.compare results/main.json results/branch.json --threshold 10
+
+Prints the throughput and p99 change for every scenario present in both files
+and exits with status 1 if any scenario regressed by more than `--threshold` percent.
+"""
+import argparse
+import json
+import sys
+
+LIMITER_KEY = ("backend", "algorithm", "keys", "concurrency", "skew")
+
+
+def scenario_key(row: dict) -> tuple:
+    if row["suite"] == "middleware":
+        return "middleware", row["variant"]
+    return ("limiter", *(row[field] for field in LIMITER_KEY))
+
+
+def metrics(row: dict) -> dict[str, tuple[float, bool]]:
+    """nom -> (qiymat, kattasi yaxshimi)"""
+    if row["suite"] == "middleware":
+        return {"us_per_request": (row["us_per_request"], False)}
+    return {
+        "ops_per_second": (row["ops_per_second"], True),
+        "p99_us": (row["latency_us"]["p99"], False),
+    }
+
+
+def load(path: str) -> dict[tuple, dict]:
+    with open(path) as file:
+        report = json.load(file)
+    return {scenario_key(row): row for row in report["results"]}
+
+
+def main(base_path: str, head_path: str, threshold: float) -> int:
+    base, head = load(base_path), load(head_path)
+    regressions = 0
+    for key in sorted(base.keys() & head.keys(), key=str):
+        changes = []
+        for name, (old, higher_is_better) in metrics(base[key]).items():
+            new = metrics(head[key])[name][0]
+            change = (new - old) / old * 100 if old else 0.0
+            worse = -change if higher_is_better else change
+            if worse > threshold:
+                regressions += 1
+            changes.append(f"{name} {old:.1f} -> {new:.1f} ({change:+.1f}%){' REGRESSION' if worse > threshold else ''}")
+        print(" ".join(str(part) for part in key), "|", "; ".join(changes))
+
+    missing = base.keys() ^ head.keys()
+    if missing:
+        print(f"{len(missing)} scenario(s) present in only one report")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("base")
+    parser.add_argument("head")
+    parser.add_argument("--threshold", type=float, default=10.0, help="foizda")
+    args = parser.parse_args()
+    sys.exit(main(args.base, args.head, args.threshold))
@@ -0,0 +1,166 @@
+"""
+Decisions per second: Unix-socket binary protocol vs the HTTP path.
+
+Both servers run as subprocesses with the same settings (memory backend by
+default, so the transport is what gets measured; `--backend redis` uses
+REDIS_DSN). The HTTP side is uvicorn on a Unix socket as well, answering
+`POST /decisions` with `--http-batch` items per request, so the difference is
+HTTP + JSON + routing, not TCP.
+
+    python -m benchmarks.decision_socket --decisions 50000 --concurrency 64
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+from app.decision_server import DecisionClient
+from benchmarks.suite import percentile
+
+PATH = "/api/v1/posts"
+
+
+def server_env(backend: str) -> dict:
+    return {
+        **os.environ,
+        "RATE_LIMIT_BACKEND": backend,
+        "LOG_LEVEL": "WARNING",
+    }
+
+
+def start_decision_server(path: str, env: dict) -> subprocess.Popen:
+    return subprocess.Popen([sys.executable, "-m", "app.decision_server", "--socket", path], env=env)
+
+
+def start_http_server(path: str, env: dict) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--uds", path, "--log-level", "warning", "--no-access-log"],
+        env=env,
+    )
+
+
+async def wait_for_socket(path: str, process: subprocess.Popen, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        if os.path.exists(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+                writer.close()
+                return
+            except OSError:
+                pass
+        if time.monotonic() > deadline:
+            raise SystemExit(f"Server did not start listening on {path}")
+        await asyncio.sleep(0.1)
+
+
+def summary(transport: str, batch: int, decisions: int, elapsed: float, latencies: list[float]) -> dict:
+    latencies.sort()
+    return {
+        "suite": "decision_socket",
+        "transport": transport,
+        "batch": batch,
+        "decisions": decisions,
+        "seconds": elapsed,
+        "decisions_per_second": decisions / elapsed,
+        "latency_us": {
+            "mean": statistics.fmean(latencies) * 1e6,
+            "p50": percentile(latencies, 0.50) * 1e6,
+            "p99": percentile(latencies, 0.99) * 1e6,
+        },
+    }
+
+
+async def run_socket(path: str, decisions: int, concurrency: int) -> dict:
+    # bitta connection: barcha workerlar so'rovlarini pipeline qiladi
+    client = DecisionClient()
+    await client.connect(path)
+    latencies: list[float] = []
+
+    async def worker(offset: int):
+        for index in range(offset, decisions, concurrency):
+            started = time.perf_counter()
+            await client.check(f"10.0.{index >> 8 & 255}.{index & 255}", PATH)
+            latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    await client.close()
+    return summary("uds", 1, decisions, elapsed, latencies)
+
+
+async def run_http(path: str, decisions: int, concurrency: int, batch: int) -> dict:
+    requests = decisions // batch
+    latencies: list[float] = []
+    transport = httpx.AsyncHTTPTransport(uds=path)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(transport=transport, limits=limits, base_url="http://limiter") as client:
+        async def worker(offset: int):
+            for index in range(offset, requests, concurrency):
+                items = [
+                    {"client_ip": f"10.0.{item >> 8 & 255}.{item & 255}", "path": PATH}
+                    for item in range(index * batch, (index + 1) * batch)
+                ]
+                started = time.perf_counter()
+                response = await client.post("/decisions", json={"items": items})
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return summary("http", batch, requests * batch, elapsed, latencies)
+
+
+async def main(args) -> list[dict]:
+    env = server_env(args.backend)
+    rows = []
+    with tempfile.TemporaryDirectory() as directory:
+        socket_path = os.path.join(directory, "decisions.sock")
+        http_path = os.path.join(directory, "http.sock")
+        processes = [start_decision_server(socket_path, env), start_http_server(http_path, env)]
+        try:
+            await wait_for_socket(socket_path, processes[0])
+            await wait_for_socket(http_path, processes[1])
+
+            rows.append(await run_socket(socket_path, args.decisions, args.concurrency))
+            for batch in args.http_batch:
+                rows.append(await run_http(http_path, args.decisions, args.concurrency, batch))
+        finally:
+            for process in processes:
+                process.terminate()
+                process.wait()
+
+    for row in rows:
+        print(
+            f"{row['transport']:<5} batch {row['batch']:>4}{row['decisions_per_second']:>12.0f} decisions/s"
+            f"  p50 {row['latency_us']['p50']:>9.1f}us  p99 {row['latency_us']['p99']:>9.1f}us"
+        )
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--decisions", type=int, default=50000)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--backend", choices=["memory", "redis"], default="memory")
+    parser.add_argument("--http-batch", type=lambda value: [int(item) for item in value.split(",")], default=[1, 100],
+                        help="POST /decisions elementlari soni, vergul bilan")
+    parser.add_argument("--output", help="JSON natija fayli")
+    args = parser.parse_args()
+
+    results = asyncio.run(main(args))
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
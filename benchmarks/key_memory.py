@@ -0,0 +1,93 @@
+"""
+Redis memory per limit key: the old two-string bucket layout vs one hash.
+
+Writes `--keys` token buckets in each layout into a real Redis (REDIS_DSN by
+default) and reports `used_memory` growth and sampled `MEMORY USAGE` per key.
+Every key it creates is prefixed with `bench:key_memory:` and deleted at the end.
+
+    python -m benchmarks.key_memory --keys 50000
+"""
+import argparse
+import asyncio
+import time
+
+from redis.asyncio import Redis
+
+from app.core.config import settings
+
+PREFIX = "bench:key_memory"
+
+
+def legacy_commands(pipe, key: str, tokens: float, now: int, ttl: int):
+    pipe.set(f"{key}:tokens", tokens, ex=ttl)
+    pipe.set(f"{key}:ts", now, ex=ttl)
+
+
+def hash_commands(pipe, key: str, tokens: float, now: int, ttl: int):
+    pipe.hset(key, mapping={"tokens": tokens, "ts": now})
+    pipe.expire(key, ttl)
+
+
+async def used_memory(redis: Redis) -> int:
+    return (await redis.info("memory"))["used_memory"]
+
+
+async def measure(redis: Redis, name: str, write, keys: int, sample: int) -> dict:
+    pattern = f"{PREFIX}:{name}"
+    before = await used_memory(redis)
+    now = int(time.time())
+    for start in range(0, keys, 1000):
+        async with redis.pipeline(transaction=False) as pipe:
+            for index in range(start, min(start + 1000, keys)):
+                write(pipe, f"rate_limit:{{ip:10.0.{index}:{pattern}}}", 9.5, now, 3600)
+            await pipe.execute()
+    after = await used_memory(redis)
+
+    usage = []
+    async for key in redis.scan_iter(match=f"*{pattern}*", count=1000):
+        usage.append(await redis.memory_usage(key, samples=0) or 0)
+        if len(usage) >= sample:
+            break
+    redis_keys = 2 if name == "legacy" else 1
+
+    await delete(redis, pattern)
+    return {
+        "layout": name,
+        "bytes_per_limit": (after - before) / keys,
+        "memory_usage_per_limit": sum(usage) / len(usage) * redis_keys if usage else 0,
+        "redis_keys_per_limit": redis_keys,
+    }
+
+
+async def delete(redis: Redis, pattern: str):
+    batch = []
+    async for key in redis.scan_iter(match=f"*{pattern}*", count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            await redis.unlink(*batch)
+            batch = []
+    if batch:
+        await redis.unlink(*batch)
+
+
+async def main(dsn: str, keys: int, sample: int):
+    redis = Redis.from_url(dsn)
+    try:
+        print(f"{'layout':<8} {'used_memory/limit':>18} {'MEMORY USAGE/limit':>19} {'keys/limit':>11}")
+        for name, write in (("legacy", legacy_commands), ("hash", hash_commands)):
+            row = await measure(redis, name, write, keys, sample)
+            print(
+                f"{row['layout']:<8} {row['bytes_per_limit']:>16.1f} B "
+                f"{row['memory_usage_per_limit']:>17.1f} B {row['redis_keys_per_limit']:>11}"
+            )
+    finally:
+        await redis.aclose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--dsn", default=str(settings.redis_dsn))
+    parser.add_argument("--keys", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=1000)
+    args = parser.parse_args()
+    asyncio.run(main(args.dsn, args.keys, args.sample))
@@ -0,0 +1,142 @@
+"""
+Per-request overhead of the rate limiter middleware.
+
+The limiter decision itself is replaced by an always-allow service so only the
+middleware wrapping is measured. Requests are driven straight through the ASGI
+callable (no sockets, no HTTP client).
+
+    python -m benchmarks.middleware_overhead --requests 20000
+"""
+import argparse
+import asyncio
+import time
+
+from fastapi import FastAPI, Request, Response
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.core.entities import RateLimitResult, RequestInfo
+from app.core.middleware.rate_limit import RateLimiterMiddleware
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleCache
+
+
+class AllowAllService(RateLimiterService):
+    def __init__(self):
+        super().__init__(repo=None)
+
+    async def check(self, client_ip, user_id, endpoint, method, endpoint_config=None):
+        # kvota bilan: ruxsat berilgan javobga RateLimit-* headerlari ham qo'shiladi
+        return RateLimitResult(True, 0, 100, 99, 60)
+
+
+class BaseHTTPRateLimiterMiddleware(BaseHTTPMiddleware):
+    """Oldingi BaseHTTPMiddleware varianti, taqqoslash uchun"""
+
+    def __init__(self, app, rate_limiter_service: RateLimiterService, rules: RuleCache):
+        super().__init__(app)
+        self.rate_limiter = rate_limiter_service
+        self.rules = rules
+
+    async def dispatch(self, request: Request, call_next):
+        request_info = RequestInfo(
+            client_ip=request.client.host,
+            user_id=request.headers.get("X-User-ID"),
+            endpoint=request.url.path,
+            method=request.method,
+        )
+        endpoint_config = self.rules.snapshot.match(request_info.endpoint, request_info.method)
+        result = await self.rate_limiter.is_allowed(request_info, endpoint_config)
+        if not result.allowed:
+            return Response(status_code=429, headers={"Retry-After": str(result.retry_after)})
+        return await call_next(request)
+
+
+def build_app(middleware) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/api/v1/posts")
+    async def get_posts():
+        return {"message": "Posts list"}
+
+    if middleware is not None:
+        app.add_middleware(middleware, rate_limiter_service=AllowAllService(), rules=RuleCache(redis=None))
+    return app
+
+
+SCOPE = {
+    "type": "http",
+    "asgi": {"version": "3.0"},
+    "http_version": "1.1",
+    "method": "GET",
+    "scheme": "http",
+    "path": "/api/v1/posts",
+    "raw_path": b"/api/v1/posts",
+    "root_path": "",
+    "query_string": b"",
+    "headers": [(b"host", b"bench"), (b"x-user-id", b"42")],
+    "client": ("127.0.0.1", 50000),
+    "server": ("bench", 80),
+}
+
+
+async def call(app):
+    request_sent = False
+    response_complete = asyncio.Event()
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            # javob yuborilgach client uziladi
+            await response_complete.wait()
+            return {"type": "http.disconnect"}
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        if message["type"] == "http.response.body" and not message.get("more_body", False):
+            response_complete.set()
+
+    await app(dict(SCOPE), receive, send)
+
+
+async def measure(app, requests: int) -> float:
+    for _ in range(min(1000, requests)):
+        await call(app)
+    start = time.perf_counter()
+    for _ in range(requests):
+        await call(app)
+    return (time.perf_counter() - start) / requests * 1_000_000
+
+
+async def run(requests: int) -> list[dict]:
+    variants = {
+        "no middleware": build_app(None),
+        "BaseHTTPMiddleware": build_app(BaseHTTPRateLimiterMiddleware),
+        "pure ASGI": build_app(RateLimiterMiddleware),
+    }
+    results = []
+    baseline = None
+    for name, app in variants.items():
+        per_request = await measure(app, requests)
+        if baseline is None:
+            baseline = per_request
+        results.append({
+            "variant": name,
+            "requests": requests,
+            "us_per_request": per_request,
+            "overhead_us": per_request - baseline,
+        })
+    return results
+
+
+async def main(requests: int):
+    print(f"{'variant':<22}{'us/request':>12}{'overhead us':>14}")
+    for row in await run(requests):
+        print(f"{row['variant']:<22}{row['us_per_request']:>12.1f}{row['overhead_us']:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=20000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests))
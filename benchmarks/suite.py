@@ -0,0 +1,274 @@
+"""
+Limiter benchmark suite: every algorithm against every backend, plus middleware overhead.
+
+Each scenario runs `--ops` checks spread over `concurrency` coroutines. Keys are
+drawn from a space of `keys` distinct clients, either uniformly or with Zipf
+skew (a few hot keys take most of the traffic). The redis backend runs against
+`--redis-dsn`, or a throwaway `redis-server` started on a free port when
+`--spawn-redis` is given (no persistence, killed at the end).
+
+    python -m benchmarks.suite --backends memory,redis --spawn-redis --output results/main.json
+    python -m benchmarks.compare results/main.json results/branch.json
+
+Results are written as JSON: run metadata plus one record per scenario.
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import platform
+import random
+import shutil
+import socket
+import statistics
+import subprocess
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Optional
+
+from redis.asyncio import Redis
+
+from app.core.interfaces import RateLimitRepository
+from app.repositories.memory import InMemoryRateLimitRepository
+from app.repositories.redis import RedisRateLimitRepository
+from app.repositories.redis.batching import ScriptBatcher
+from app.repositories.redis.library import create_library
+from app.repositories.shared_memory import SharedMemoryRateLimitRepository
+from app.services.rate_limit.factory import AlgorithmFactory
+from benchmarks import middleware_overhead
+
+ALGORITHMS = ("fixed_window", "sliding_window", "sliding_window_log", "token_bucket", "leaky_bucket", "gcra")
+
+# (limit, window): window algoritmlari uchun 100/60s, bucketlar uchun capacity 100, 50 token/s
+PARAMETERS = {
+    "token_bucket": (100, 50),
+    "leaky_bucket": (100, 50),
+}
+DEFAULT_PARAMETERS = (100, 60)
+
+
+def key_sampler(keys: int, skew: str, seed: int):
+    """Kalit indekslari generatori: uniform yoki Zipf (s=1.1)"""
+    rng = random.Random(seed)
+    if skew == "uniform":
+        return lambda: rng.randrange(keys)
+    if skew != "zipf":
+        raise ValueError(f"Unknown skew: {skew}")
+    cumulative = list(itertools.accumulate(1 / (rank ** 1.1) for rank in range(1, keys + 1)))
+    population = range(keys)
+    return lambda: rng.choices(population, cum_weights=cumulative)[0]
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * fraction))]
+
+
+async def run_scenario(
+        repo: RateLimitRepository,
+        algorithm_name: str,
+        keys: int,
+        concurrency: int,
+        skew: str,
+        ops: int,
+        seed: int,
+        prefix: str,
+) -> dict:
+    algorithm = AlgorithmFactory.create(algorithm_name, repo)
+    limit, window = PARAMETERS.get(algorithm_name, DEFAULT_PARAMETERS)
+    sample = key_sampler(keys, skew, seed)
+    # kalitlar oldindan yaratiladi: o'lchovga string qurish kirmaydi
+    sequence = [f"{prefix}:{{ip:10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}:bench}}" for index in
+                (sample() for _ in range(ops))]
+    latencies: list[float] = []
+    allowed = 0
+
+    async def worker(offset: int):
+        nonlocal allowed
+        for index in range(offset, ops, concurrency):
+            started = time.perf_counter()
+            result = await algorithm.check(sequence[index], limit, window)
+            latencies.append(time.perf_counter() - started)
+            allowed += result.allowed
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(offset) for offset in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "ops": ops,
+        "seconds": elapsed,
+        "ops_per_second": ops / elapsed,
+        "latency_us": {
+            "mean": statistics.fmean(latencies) * 1e6,
+            "p50": percentile(latencies, 0.50) * 1e6,
+            "p99": percentile(latencies, 0.99) * 1e6,
+            "max": latencies[-1] * 1e6,
+        },
+        "allowed_ratio": allowed / ops,
+        "distinct_keys": len(set(sequence)),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def spawn_redis() -> tuple[subprocess.Popen, str]:
+    binary = shutil.which("redis-server")
+    if binary is None:
+        raise SystemExit("redis-server not found on PATH; pass --redis-dsn instead")
+    port = free_port()
+    process = subprocess.Popen(
+        [binary, "--port", str(port), "--save", "", "--appendonly", "no"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    return process, f"redis://127.0.0.1:{port}/0"
+
+
+async def wait_for_redis(redis: Redis, timeout: float = 5.0):
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            await redis.ping()
+            return
+        except Exception:
+            if time.monotonic() > deadline:
+                raise
+            await asyncio.sleep(0.05)
+
+
+async def cleanup(redis: Redis, prefix: str):
+    batch = []
+    async for key in redis.scan_iter(match=f"{prefix}:*", count=1000):
+        batch.append(key)
+        if len(batch) >= 1000:
+            await redis.unlink(*batch)
+            batch = []
+    if batch:
+        await redis.unlink(*batch)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_list(value: str, cast=str) -> list:
+    return [cast(item) for item in value.split(",") if item]
+
+
+async def main(args) -> dict:
+    process = None
+    redis = None
+    directory = None
+    backends: dict[str, RateLimitRepository] = {}
+    results = []
+    prefix = f"bench:{uuid.uuid4().hex[:8]}"
+
+    try:
+        for backend in args.backends:
+            if backend == "memory":
+                backends["memory"] = InMemoryRateLimitRepository(max_keys=max(args.keys))
+            elif backend == "shared_memory":
+                # bitta process: fcntl lock va mmap'ning o'zi o'lchanadi, workerlar raqobatisiz
+                directory = tempfile.TemporaryDirectory()
+                backends["shared_memory"] = SharedMemoryRateLimitRepository(
+                    f"{directory.name}/limiter", slots=max(args.keys) * 2,
+                )
+            elif backend == "redis":
+                dsn = args.redis_dsn
+                if args.spawn_redis:
+                    process, dsn = spawn_redis()
+                redis = Redis.from_url(dsn)
+                await wait_for_redis(redis)
+                library = create_library(redis, args.scripts_mode)
+                batcher = ScriptBatcher(redis, library) if args.batching else None
+                backends["redis"] = RedisRateLimitRepository(redis, batcher=batcher, library=library)
+                await backends["redis"].prepare()
+            else:
+                raise SystemExit(f"Unknown backend: {backend}")
+
+        scenarios = itertools.product(backends.items(), args.algorithms, args.keys, args.concurrency, args.skew)
+        for (backend, repo), algorithm, keys, concurrency, skew in scenarios:
+            scenario_prefix = f"{prefix}:{len(results)}"
+            row = await run_scenario(repo, algorithm, keys, concurrency, skew, args.ops, args.seed, scenario_prefix)
+            row = {
+                "suite": "limiter",
+                "backend": backend,
+                "algorithm": algorithm,
+                "keys": keys,
+                "concurrency": concurrency,
+                "skew": skew,
+                **row,
+            }
+            results.append(row)
+            print(
+                f"{backend:<14}{algorithm:<20}{keys:>9}{concurrency:>5} {skew:<8}"
+                f"{row['ops_per_second']:>11.0f} ops/s  p50 {row['latency_us']['p50']:>8.1f}us"
+                f"  p99 {row['latency_us']['p99']:>8.1f}us"
+            )
+            if redis is not None and backend == "redis":
+                await cleanup(redis, scenario_prefix)
+
+        if not args.skip_middleware:
+            for row in await middleware_overhead.run(args.middleware_requests):
+                results.append({"suite": "middleware", **row})
+                print(f"middleware {row['variant']:<22}{row['us_per_request']:>9.1f}us/request")
+    finally:
+        if "shared_memory" in backends:
+            backends["shared_memory"].close()
+        if directory is not None:
+            directory.cleanup()
+        if redis is not None:
+            await redis.aclose()
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    return {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {key: value for key, value in vars(args).items() if key != "output"},
+        },
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--backends", type=parse_list, default=["memory"])
+    parser.add_argument("--algorithms", type=parse_list, default=list(ALGORITHMS))
+    parser.add_argument("--keys", type=lambda value: parse_list(value, int), default=[1, 1000, 1_000_000])
+    parser.add_argument("--concurrency", type=lambda value: parse_list(value, int), default=[1, 64])
+    parser.add_argument("--skew", type=parse_list, default=["uniform", "zipf"])
+    parser.add_argument("--ops", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--redis-dsn", default="redis://127.0.0.1:6379/15")
+    parser.add_argument("--spawn-redis", action="store_true")
+    parser.add_argument("--batching", action="store_true", help="redis: ScriptBatcher orqali")
+    parser.add_argument("--scripts-mode", choices=["functions", "eval"], default="functions")
+    parser.add_argument("--middleware-requests", type=int, default=20000)
+    parser.add_argument("--skip-middleware", action="store_true")
+    parser.add_argument("--output", help="JSON natija fayli (berilmasa stdout)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(payload)
+    else:
+        print(payload)
@@ -0,0 +1,162 @@
+"""
+Per-rule limiter report for locust runs.
+
+The API must run with RATE_LIMIT_TIMING_HEADERS=true: every response then
+carries `Server-Timing: ratelimit;dur=<ms>` and `X-RateLimit-Rule: <rule>`.
+For each rule the report shows request count, 429 ratio, limiter latency and
+handler latency (response time minus limiter time). In distributed runs
+workers ship their partial stats to the master with every report.
+"""
+import bisect
+import json
+import math
+import re
+
+from locust import events
+
+# millisekundlarda
+BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, math.inf)
+SERVER_TIMING = re.compile(r"ratelimit;dur=([0-9.]+)")
+
+
+class LatencyHistogram:
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS)
+        self.total = 0.0
+        self.count = 0
+
+    def add(self, value: float):
+        self.counts[bisect.bisect_left(BUCKETS, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def merge(self, data: dict):
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.total += data["total"]
+        self.count += data["count"]
+
+    def percentile(self, fraction: float) -> float:
+        """Bucket yuqori chegarasi - taxminiy qiymat"""
+        if not self.count:
+            return 0.0
+        target = self.count * fraction
+        seen = 0
+        for bound, count in zip(BUCKETS, self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return BUCKETS[-1]
+
+    def to_dict(self) -> dict:
+        return {"counts": self.counts, "total": self.total, "count": self.count}
+
+    def summary(self) -> dict:
+        return {
+            "mean": self.total / self.count if self.count else 0.0,
+            "p50": self.percentile(0.50),
+            "p95": self.percentile(0.95),
+            "p99": self.percentile(0.99),
+        }
+
+
+class RuleStats:
+    def __init__(self):
+        self.requests = 0
+        self.limited = 0
+        self.limiter = LatencyHistogram()
+        self.handler = LatencyHistogram()
+
+    def merge(self, data: dict):
+        self.requests += data["requests"]
+        self.limited += data["limited"]
+        self.limiter.merge(data["limiter"])
+        self.handler.merge(data["handler"])
+
+    def to_dict(self) -> dict:
+        return {
+            "requests": self.requests,
+            "limited": self.limited,
+            "limiter": self.limiter.to_dict(),
+            "handler": self.handler.to_dict(),
+        }
+
+
+stats: dict[str, RuleStats] = {}
+
+
+def record(response, response_time: float):
+    headers = response.headers
+    rule = headers.get("X-RateLimit-Rule")
+    if rule is None:
+        return
+    match = SERVER_TIMING.search(headers.get("Server-Timing", ""))
+    limiter_ms = float(match.group(1)) if match else 0.0
+
+    rule_stats = stats.get(rule)
+    if rule_stats is None:
+        rule_stats = stats[rule] = RuleStats()
+    rule_stats.requests += 1
+    rule_stats.limiter.add(limiter_ms)
+    if response.status_code == 429:
+        rule_stats.limited += 1
+    else:
+        # 429 handlerga yetmaydi, uning vaqti handler statistikasini buzmasin
+        rule_stats.handler.add(max(0.0, response_time - limiter_ms))
+
+
+def report() -> dict:
+    return {
+        rule: {
+            "requests": rule_stats.requests,
+            "limited_ratio": rule_stats.limited / rule_stats.requests if rule_stats.requests else 0.0,
+            "limiter_ms": rule_stats.limiter.summary(),
+            "handler_ms": rule_stats.handler.summary(),
+        }
+        for rule, rule_stats in sorted(stats.items())
+    }
+
+
+def print_report(rows: dict):
+    print(f"\n{'rule':<32}{'requests':>10}{'429 %':>8}"
+          f"{'limiter p50/p95 ms':>22}{'handler p50/p95 ms':>22}")
+    for rule, row in rows.items():
+        limiter, handler = row["limiter_ms"], row["handler_ms"]
+        print(f"{rule:<32}{row['requests']:>10}{row['limited_ratio'] * 100:>7.1f}%"
+              f"{limiter['p50']:>12}/{limiter['p95']:<9}{handler['p50']:>12}/{handler['p95']:<9}")
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--limiter-report", default="", help="Per-rule limiter report JSON path")
+
+
+@events.request.add_listener
+def on_request(response_time, response=None, **kwargs):
+    # 429 ham (locust uni failure deb belgilaydi) hisobga olinadi
+    if response is not None and getattr(response, "headers", None) is not None:
+        record(response, response_time)
+
+
+@events.report_to_master.add_listener
+def on_report_to_master(client_id, data):
+    data["limiter_stats"] = {rule: rule_stats.to_dict() for rule, rule_stats in stats.items()}
+    stats.clear()
+
+
+@events.worker_report.add_listener
+def on_worker_report(client_id, data):
+    for rule, partial in data.get("limiter_stats", {}).items():
+        stats.setdefault(rule, RuleStats()).merge(partial)
+
+
+@events.quitting.add_listener
+def on_quitting(environment, **kwargs):
+    # workerlar faqat masterga yuboradi, hisobotni master (yoki local run) chiqaradi
+    if type(environment.runner).__name__ == "WorkerRunner" or not stats:
+        return
+    rows = report()
+    print_report(rows)
+    path = environment.parsed_options.limiter_report if environment.parsed_options else ""
+    if path:
+        with open(path, "w") as file:
+            json.dump(rows, file, indent=2)
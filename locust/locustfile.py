@@ -1,6 +1,67 @@
-from locust import HttpUser, task, between
+"""
+Traffic-shape scenarios for the rate limiter.
+
+    locust -f locust/locustfile.py --shape burst --hot-users 100000 --limiter-report report.json
+
+User classes (pick with positional class names, e.g. `HotUsers AttackFlood`):
+- RateLimiterUser: the original uniform mix over three endpoints
+- HotUsers: X-User-ID drawn from a Zipf distribution over `--hot-users` ids
+- LongTailIPs: every request from a random one of `--tail-ips` client IPs
+- AttackFlood: a handful of IPs sending as fast as possible
+- RuleChurn: keeps editing a rule through the CRUD API during the run
+
+Client IPs are sent as X-Forwarded-For, so start the API with
+`uvicorn app.main:app --proxy-headers --forwarded-allow-ips='*'`, and with
+RATE_LIMIT_TIMING_HEADERS=true for the per-rule limiter report.
+"""
+import bisect
+import itertools
+import math
 import random
 
+from locust import HttpUser, LoadTestShape, between, constant, events, task
+
+import limiter_report  # noqa: F401  (listenerlarni ro'yxatdan o'tkazadi)
+
+
+@events.init_command_line_parser.add_listener
+def add_arguments(parser):
+    parser.add_argument("--shape", choices=["constant", "ramp", "burst"], default="constant",
+                        help="Load shape: constant, ramp or burst")
+    parser.add_argument("--peak-users", type=int, default=500, help="Users at the top of ramp/burst")
+    parser.add_argument("--shape-duration", type=int, default=300, help="Shape length in seconds")
+    parser.add_argument("--hot-users", type=int, default=100_000, help="Distinct X-User-ID values")
+    parser.add_argument("--zipf-s", type=float, default=1.1, help="Zipf exponent for hot users")
+    parser.add_argument("--tail-ips", type=int, default=1_000_000, help="Distinct client IPs for LongTailIPs")
+    parser.add_argument("--attack-ips", type=int, default=3, help="IPs used by AttackFlood")
+    parser.add_argument("--churn-rule-id", type=int, default=1, help="Rule edited by RuleChurn")
+    parser.add_argument("--churn-interval", type=float, default=5.0, help="Seconds between rule edits")
+
+
+class ZipfSampler:
+    """Birinchi chaqiruvda cumulative og'irliklar quriladi, keyin har tanlov bitta bisect"""
+
+    def __init__(self, size: int, exponent: float):
+        self.cumulative = list(itertools.accumulate(1 / rank ** exponent for rank in range(1, size + 1)))
+
+    def __call__(self) -> int:
+        return bisect.bisect_left(self.cumulative, random.random() * self.cumulative[-1])
+
+
+_samplers: dict[tuple, ZipfSampler] = {}
+
+
+def zipf_sampler(size: int, exponent: float) -> ZipfSampler:
+    key = (size, exponent)
+    if key not in _samplers:
+        _samplers[key] = ZipfSampler(size, exponent)
+    return _samplers[key]
+
+
+def ip_from_index(index: int) -> str:
+    return f"10.{index >> 16 & 255}.{index >> 8 & 255}.{index & 255}"
+
+
 class RateLimiterUser(HttpUser):
     wait_time = between(0.5, 2)
     host = "http://localhost:8000"
@@ -16,4 +77,92 @@ class RateLimiterUser(HttpUser):
 
     @task
     def login(self):
-        self.client.post("/api/v1/login")
\ No newline at end of file
+        self.client.post("/api/v1/login")
+
+
+class HotUsers(HttpUser):
+    """Bir nechta user trafikning katta qismini beradi, qolganlari uzun dum"""
+    wait_time = between(0.05, 0.2)
+    host = "http://localhost:8000"
+    weight = 5
+
+    def on_start(self):
+        options = self.environment.parsed_options
+        self.sample = zipf_sampler(options.hot_users, options.zipf_s)
+
+    @task(3)
+    def get_users(self):
+        self.client.get("/api/v1/users", headers={"X-User-ID": str(self.sample())}, name="/api/v1/users [hot]")
+
+    @task
+    def get_posts(self):
+        self.client.get("/api/v1/posts", headers={"X-User-ID": str(self.sample())}, name="/api/v1/posts [hot]")
+
+
+class LongTailIPs(HttpUser):
+    """Millionlab turli IP: kalitlar soni va Redis xotirasi uchun"""
+    wait_time = between(0.05, 0.2)
+    host = "http://localhost:8000"
+    weight = 3
+
+    @task
+    def get_posts(self):
+        ip = ip_from_index(random.randrange(self.environment.parsed_options.tail_ips))
+        self.client.get("/api/v1/posts", headers={"X-Forwarded-For": ip}, name="/api/v1/posts [tail]")
+
+
+class AttackFlood(HttpUser):
+    """Bir nechta IP kutmasdan so'rov yuboradi: asosan 429 va deny cache yo'li"""
+    wait_time = constant(0)
+    host = "http://localhost:8000"
+    weight = 1
+
+    def on_start(self):
+        self.ip = f"203.0.113.{random.randrange(self.environment.parsed_options.attack_ips)}"
+
+    @task
+    def login(self):
+        self.client.post("/api/v1/login", headers={"X-Forwarded-For": self.ip}, name="/api/v1/login [attack]")
+
+
+class RuleChurn(HttpUser):
+    """Yuklama davomida qoidani o'zgartiradi: qoidalar qayta yuklanishining narxi"""
+    host = "http://localhost:8000"
+    fixed_count = 1
+
+    def wait_time(self):
+        return self.environment.parsed_options.churn_interval
+
+    @task
+    def update_rule(self):
+        limit = random.choice((10, 50, 100, 500))
+        self.client.put(
+            f"/rate-limit/{self.environment.parsed_options.churn_rule_id}",
+            json={"limit": limit},
+            name="/rate-limit/{id} [churn]",
+        )
+
+
+class TrafficShape(LoadTestShape):
+    """
+        constant: -u/-r as given on the command line (the previous behaviour)
+        ramp: linear 0 -> --peak-users over --shape-duration
+        burst: 20% of --peak-users with a 10s spike to the peak every 60s
+    """
+
+    def tick(self):
+        options = self.runner.environment.parsed_options
+        if options.shape == "constant":
+            return options.num_users or 1, options.spawn_rate
+
+        run_time = self.get_run_time()
+        if run_time > options.shape_duration:
+            return None
+
+        peak = options.peak_users
+        if options.shape == "ramp":
+            users = max(1, math.ceil(peak * run_time / options.shape_duration))
+            return users, max(1, peak // 30)
+        if run_time % 60 < 10:
+            return peak, peak
+        return max(1, peak // 5), peak
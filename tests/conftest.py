@@ -0,0 +1,33 @@
+import pytest
+
+from app.core.entities import RateLimitRule
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+
+
+class FakeClock:
+    """Testlar boshqaradigan vaqt"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float):
+        self.now += seconds
+
+
+def make_rule(**overrides) -> RateLimitRule:
+    data = {"limit": 5, "window": 60, "algorithm": "fixed_window", "key_type": "ip", "method": None}
+    data.update(overrides)
+    return RateLimitRule(**data)
+
+
+@pytest.fixture
+def clock() -> FakeClock:
+    return FakeClock()
+
+
+@pytest.fixture
+def memory_repo(clock) -> InMemoryRateLimitRepository:
+    return InMemoryRateLimitRepository(clock=clock)
@@ -0,0 +1,67 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints.admin import admin_router
+from app.core.config import settings
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.penalty_box import PenaltyBox
+from app.services.rate_limit.rate_limiter import RateLimiterService
+
+
+@pytest.fixture
+def box() -> PenaltyBox:
+    return PenaltyBox(InMemoryRateLimitRepository())
+
+
+@pytest.fixture
+def app(box) -> FastAPI:
+    app = FastAPI()
+    app.state.rate_limiter_service = RateLimiterService(InMemoryRateLimitRepository(), penalty_box=box)
+    app.include_router(admin_router)
+    return app
+
+
+def client(app: FastAPI, host: str = "127.0.0.1", **kwargs) -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(host, 51000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test", **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_loopback_client_can_unban(app, box):
+    await box.ban("ip:1", 60)
+
+    async with client(app) as http:
+        assert (await http.get("/admin/rate-limit/penalty-box")).json()[0]["identity"] == "ip:1"
+        response = await http.delete("/admin/rate-limit/penalty-box/ip:1")
+
+    assert response.status_code == 204
+    assert box.get("ip:1") is None
+
+
+@pytest.mark.asyncio
+async def test_remote_client_is_rejected_without_a_token(app, box):
+    await box.ban("ip:1", 60)
+
+    async with client(app, host="203.0.113.7") as http:
+        response = await http.delete("/admin/rate-limit/penalty-box/ip:1")
+
+    assert response.status_code == 403
+    assert box.get("ip:1") is not None
+
+
+@pytest.mark.asyncio
+async def test_configured_token_is_required(app, box, monkeypatch):
+    monkeypatch.setattr(settings, "internal_api_token", "s3cret")
+    await box.ban("ip:1", 60)
+
+    async with client(app) as http:
+        # token berilganda loopback ham yetmaydi
+        assert (await http.delete("/admin/rate-limit/penalty-box/ip:1")).status_code == 401
+        assert (await http.delete(
+            "/admin/rate-limit/penalty-box/ip:1", headers={"X-Internal-Token": "wrong"}
+        )).status_code == 401
+    async with client(app, host="203.0.113.7", headers={"X-Internal-Token": "s3cret"}) as http:
+        assert (await http.delete("/admin/rate-limit/penalty-box/ip:1")).status_code == 204
+
+    assert box.get("ip:1") is None
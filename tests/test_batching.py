@@ -0,0 +1,113 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.repositories.redis import RedisRateLimitRepository
+from app.repositories.redis.batching import ScriptBatcher, bulk_pipeline
+from app.repositories.redis.library import ScriptLibrary
+
+
+class CountingRedis(fakeredis.aioredis.FakeRedis):
+    """Har pipeline.execute() bitta Redis'ga borish"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.round_trips = 0
+        self.fail = False
+
+    def pipeline(self, *args, **kwargs):
+        pipe = super().pipeline(*args, **kwargs)
+        execute = pipe.execute
+
+        async def counted(*execute_args, **execute_kwargs):
+            self.round_trips += 1
+            if self.fail:
+                raise ConnectionError("redis down")
+            return await execute(*execute_args, **execute_kwargs)
+
+        pipe.execute = counted
+        return pipe
+
+
+@pytest.fixture
+def redis() -> CountingRedis:
+    return CountingRedis()
+
+
+def submit_many(batcher: ScriptBatcher, count: int, key: str = "rate_limit:{ip:1:b}") -> list[asyncio.Future]:
+    return [batcher.submit("fixed_window", [key], [100, 60]) for _ in range(count)]
+
+
+@pytest.mark.asyncio
+async def test_calls_in_one_loop_iteration_share_a_pipeline(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    batcher = ScriptBatcher(redis, library)
+
+    results = await asyncio.gather(*submit_many(batcher, 10))
+
+    assert redis.round_trips == 1
+    assert sorted(count for count, *_ in results) == list(range(1, 11))
+
+
+@pytest.mark.asyncio
+async def test_max_batch_flushes_early(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    batcher = ScriptBatcher(redis, library, max_batch=4)
+
+    await asyncio.gather(*submit_many(batcher, 10))
+
+    assert redis.round_trips == 3
+
+
+@pytest.mark.asyncio
+async def test_missing_scripts_are_reloaded_and_retried(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    await redis.script_flush()
+    batcher = ScriptBatcher(redis, library)
+
+    results = await asyncio.gather(*submit_many(batcher, 3))
+
+    assert sorted(count for count, *_ in results) == [1, 2, 3]
+    # NOSCRIPT javobi + qayta yuborilgan partiya
+    assert redis.round_trips == 2
+
+
+@pytest.mark.asyncio
+async def test_connection_error_fails_every_call_in_the_batch(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    batcher = ScriptBatcher(redis, library)
+    redis.fail = True
+
+    results = await asyncio.gather(*submit_many(batcher, 3), return_exceptions=True)
+
+    assert all(isinstance(result, ConnectionError) for result in results)
+
+
+@pytest.mark.asyncio
+async def test_repository_batches_concurrent_checks(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    repo = RedisRateLimitRepository(redis, batcher=ScriptBatcher(redis, library), library=library)
+
+    results = await asyncio.gather(*(repo.increment_and_check(f"rate_limit:{{ip:{n}:b}}", 5, 60) for n in range(20)))
+
+    assert redis.round_trips == 1
+    assert {count for count, *_ in results} == {1}
+
+
+@pytest.mark.asyncio
+async def test_bulk_pipeline_without_batcher(redis):
+    library = ScriptLibrary(redis)
+    await library.prepare()
+    repo = RedisRateLimitRepository(redis, library=library)
+
+    with bulk_pipeline():
+        results = await asyncio.gather(*(repo.increment_and_check("rate_limit:{ip:1:b}", 5, 60) for _ in range(7)))
+
+    assert redis.round_trips == 1
+    assert sorted(count for count, *_ in results) == list(range(1, 8))
@@ -0,0 +1,200 @@
+import asyncio
+
+import pytest
+
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from tests.conftest import make_rule
+
+
+class FlakyRepository(InMemoryRateLimitRepository):
+    """Sekin yoki ishlamaydigan backend: `delay` kutadi, `error` bo'lsa uni ko'taradi"""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.delay = 0.0
+        self.error = None
+        self.calls = 0
+
+    async def increment_and_check(self, key, limit, window):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return await super().increment_and_check(key, limit, window)
+
+
+def make_service(repo, breaker, **kwargs) -> RateLimiterService:
+    return RateLimiterService(repo, breaker=breaker, latency_budget=kwargs.pop("latency_budget", 0.05), **kwargs)
+
+
+def test_opens_after_threshold_and_probes_once(clock):
+    breaker = CircuitBreaker(failure_threshold=3, recovery_timeout=5, clock=clock)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.allow() is None
+
+    clock.advance(5)
+    probe = breaker.allow()
+    assert probe is not None
+    assert breaker.state == HALF_OPEN
+    # sinov tugaguncha boshqa chaqiruvlar o'tkazilmaydi
+    assert breaker.allow() is None
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+    assert breaker.transitions == {"closed->open": 1, "open->half_open": 1, "half_open->closed": 1}
+
+
+def test_failed_probe_reopens(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    breaker.record_failure()
+    clock.advance(5)
+
+    breaker.record_failure(breaker.allow())
+
+    assert breaker.state == OPEN
+    assert breaker.allow() is None
+    assert breaker.retry_after() == 5
+
+
+def test_stale_results_do_not_change_the_state(clock):
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    slow = breaker.allow()
+    breaker.record_failure(breaker.allow())
+    assert breaker.state == OPEN
+
+    # ochilishdan oldin boshlangan chaqiruv kech muvaffaqiyat bilan tugadi
+    breaker.record_success(slow)
+    assert breaker.state == OPEN
+
+    clock.advance(5)
+    probe = breaker.allow()
+    breaker.record_success(slow)
+    breaker.record_failure(slow)
+    breaker.release_probe(slow)
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow() is None
+
+    breaker.record_success(probe)
+    assert breaker.state == CLOSED
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=5, clock=clock)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_errors_open_the_breaker_and_fail_open(clock):
+    repo = FlakyRepository()
+    repo.error = ConnectionError("redis down")
+    breaker = CircuitBreaker(failure_threshold=2, recovery_timeout=5, clock=clock)
+    service = make_service(repo, breaker)
+    rule = make_rule(failure_mode="open")
+
+    for _ in range(3):
+        result = await service.decide("ip:1", "/posts", "GET", rule)
+        assert result.allowed
+        # kvota noma'lum: RateLimit-* headerlari yuborilmaydi
+        assert result.remaining is None
+
+    assert breaker.state == OPEN
+    # ochiq breaker backendga murojaat qilmaydi
+    assert repo.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_slow_backend_counts_as_failure_and_fails_closed(clock):
+    repo = FlakyRepository()
+    repo.delay = 0.2
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    service = make_service(repo, breaker, latency_budget=0.01)
+
+    result = await service.decide("ip:1", "/posts", "GET", make_rule(failure_mode="closed"))
+
+    assert not result.allowed
+    assert breaker.state == OPEN
+    result = await service.decide("ip:1", "/posts", "GET", make_rule(failure_mode="closed"))
+    assert not result.allowed
+    assert result.retry_after == 5
+
+
+@pytest.mark.asyncio
+async def test_local_failure_mode_uses_fallback_limiter(clock):
+    repo = FlakyRepository()
+    repo.error = TimeoutError()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    fallback = RateLimiterService(InMemoryRateLimitRepository(clock=clock))
+    service = make_service(repo, breaker, fallback=fallback)
+    rule = make_rule(limit=2, failure_mode="local")
+
+    decisions = [(await service.decide("ip:1", "/posts", "GET", rule)).allowed for _ in range(3)]
+
+    assert decisions == [True, True, False]
+
+
+@pytest.mark.asyncio
+async def test_probe_recovers_the_breaker(clock):
+    repo = FlakyRepository()
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    service = make_service(repo, breaker)
+    breaker.record_failure()
+    clock.advance(5)
+
+    result = await service.decide("ip:1", "/posts", "GET", make_rule())
+
+    assert result.allowed
+    assert result.remaining == 4
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_cancelled_probe_frees_the_probe_slot(clock):
+    repo = FlakyRepository()
+    repo.delay = 1
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    service = make_service(repo, breaker, latency_budget=10)
+    breaker.record_failure()
+    clock.advance(5)
+
+    probe = asyncio.create_task(service.decide("ip:1", "/posts", "GET", make_rule()))
+    await asyncio.sleep(0.01)
+    probe.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await probe
+
+    assert breaker.state == HALF_OPEN
+    repo.delay = 0
+    result = await service.decide("ip:1", "/posts", "GET", make_rule())
+    assert result.remaining is not None
+    assert breaker.state == CLOSED
+
+
+@pytest.mark.asyncio
+async def test_slow_success_after_opening_keeps_the_breaker_open(clock):
+    repo = FlakyRepository()
+    repo.delay = 0.05
+    breaker = CircuitBreaker(failure_threshold=1, recovery_timeout=5, clock=clock)
+    service = make_service(repo, breaker, latency_budget=1)
+
+    slow = asyncio.create_task(service.decide("ip:1", "/posts", "GET", make_rule()))
+    await asyncio.sleep(0.01)
+    # shu orada boshqa chaqiruv xato berib breakerni ochdi
+    breaker.record_failure()
+    assert breaker.state == OPEN
+
+    assert (await slow).allowed
+    assert breaker.state == OPEN
@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+
+from app.decision_server import (
+    STATUS_LIMITED,
+    DecisionClient,
+    DecisionFrame,
+    FrameError,
+    decode_requests,
+    decode_response,
+    encode_request,
+    encode_response,
+)
+from app.decision_server.protocol import LENGTH, REQUEST_HEADER
+from app.decision_server.server import DecisionServer
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleCache, RuleSnapshot, compile_rules
+
+RULES = {
+    "1": {"id": 1, "path": "/posts", "limit": 3, "window": 60, "algorithm": "fixed_window", "key_type": "user"},
+}
+
+
+def test_request_frames_round_trip():
+    frames = [
+        DecisionFrame(1, "GET", "/posts", "10.0.0.1"),
+        DecisionFrame(2, "POST", "/o'zbek", "::1", "42"),
+    ]
+    data = b"".join(encode_request(frame) for frame in frames)
+
+    decoded, consumed = decode_requests(bytearray(data), max_frame=4096)
+
+    assert decoded == frames
+    assert consumed == len(data)
+
+
+def test_partial_frame_waits_for_more_bytes():
+    first = encode_request(DecisionFrame(1, "GET", "/posts", "10.0.0.1"))
+    second = encode_request(DecisionFrame(2, "GET", "/posts", "10.0.0.2"))
+    buffer = bytearray(first + second[:7])
+
+    decoded, consumed = decode_requests(buffer, max_frame=4096)
+
+    assert [frame.request_id for frame in decoded] == [1]
+    assert consumed == len(first)
+
+
+@pytest.mark.parametrize("frame", [
+    LENGTH.pack(5000) + b"x" * 8,
+    LENGTH.pack(REQUEST_HEADER.size + 1) + REQUEST_HEADER.pack(1, 3, 0, 0, 0) + b"G",
+    LENGTH.pack(REQUEST_HEADER.size + 1) + REQUEST_HEADER.pack(1, 1, 0, 0, 0) + b"\xff",
+])
+def test_invalid_frames_are_rejected(frame):
+    with pytest.raises(FrameError):
+        decode_requests(bytearray(frame), max_frame=4096)
+
+
+def test_response_retry_after_is_clamped_to_milliseconds():
+    assert decode_response(encode_response(7, STATUS_LIMITED, 1.2345)) == (7, STATUS_LIMITED, 1.234)
+    assert decode_response(encode_response(7, STATUS_LIMITED, -1))[2] == 0
+
+
+@pytest.fixture
+def rules() -> RuleCache:
+    rules = RuleCache(redis=None)
+    rules.snapshot = RuleSnapshot.build(1, compile_rules(RULES))
+    return rules
+
+
+async def start_server(path: str, rules: RuleCache) -> asyncio.AbstractServer:
+    decision_server = DecisionServer(RateLimiterService(InMemoryRateLimitRepository()), rules=rules)
+    return await asyncio.start_unix_server(decision_server.handle, path=path)
+
+
+@pytest.mark.asyncio
+async def test_pipelined_checks_over_the_socket(tmp_path, rules):
+    path = str(tmp_path / "decisions.sock")
+    server = await start_server(path, rules)
+    client = DecisionClient()
+    await client.connect(path)
+
+    results = await asyncio.gather(*(client.check("10.0.0.1", "/posts", user_id="a") for _ in range(5)))
+    other_user = await client.check("10.0.0.1", "/posts", user_id="b")
+
+    await client.close()
+    server.close()
+    await server.wait_closed()
+    assert [allowed for allowed, _ in results] == [True, True, True, False, False]
+    assert all(retry_after > 0 for _, retry_after in results[3:])
+    assert other_user[0]
+
+
+@pytest.mark.asyncio
+async def test_invalid_frame_closes_the_connection(tmp_path, rules):
+    path = str(tmp_path / "decisions.sock")
+    server = await start_server(path, rules)
+    reader, writer = await asyncio.open_unix_connection(path)
+
+    writer.write(LENGTH.pack(10 ** 6))
+    await writer.drain()
+
+    assert await asyncio.wait_for(reader.read(), timeout=1) == b""
+    writer.close()
+    server.close()
+    await server.wait_closed()
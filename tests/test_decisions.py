@@ -0,0 +1,142 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints.decisions import decisions_router
+from app.core.middleware.rate_limit import RateLimiterMiddleware, is_exempt
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.circuit_breaker import CircuitBreaker
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleSnapshot, compile_rules, rule_cache
+
+RULES = {
+    "1": {"id": 1, "path": "/posts", "limit": 2, "window": 60, "algorithm": "fixed_window", "key_type": "user"},
+    "2": {"id": 2, "path": "/search", "limit": 2, "window": 60, "algorithm": "fixed_window", "key_type": "ip"},
+    "3": {
+        "id": 3, "path": "/closed", "limit": 2, "window": 60, "algorithm": "fixed_window", "key_type": "ip",
+        "failure_mode": "closed",
+    },
+}
+
+
+@pytest.fixture(autouse=True)
+def rules(monkeypatch):
+    monkeypatch.setattr(rule_cache, "snapshot", RuleSnapshot.build(1, compile_rules(RULES)))
+
+
+class DownRepository(InMemoryRateLimitRepository):
+    async def peek(self, key, algorithm, limit, window):
+        raise ConnectionError("redis down")
+
+
+def make_app(service: RateLimiterService) -> FastAPI:
+    app = FastAPI()
+    app.state.rate_limiter_service = service
+    app.add_middleware(RateLimiterMiddleware, rate_limiter_service=service, rules=rule_cache)
+    app.include_router(decisions_router)
+
+    @app.get("/search")
+    async def search():
+        return {}
+
+    return app
+
+
+def client(app: FastAPI, host: str = "127.0.0.1") -> httpx.AsyncClient:
+    transport = httpx.ASGITransport(app=app, client=(host, 51000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def items(*entries: dict) -> dict:
+    return {"items": list(entries)}
+
+
+@pytest.mark.asyncio
+async def test_identity_follows_the_rule_key_type():
+    app = make_app(RateLimiterService(InMemoryRateLimitRepository()))
+    same_ip = [
+        {"client_ip": "10.0.0.1", "user_id": "a", "path": "/posts"},
+        {"client_ip": "10.0.0.1", "user_id": "a", "path": "/posts"},
+        {"client_ip": "10.0.0.1", "user_id": "b", "path": "/posts"},
+        # ip qoidasi user_id'ga qaramaydi
+        {"client_ip": "10.0.0.1", "user_id": "a", "path": "/search"},
+        {"client_ip": "10.0.0.1", "user_id": "b", "path": "/search"},
+        {"client_ip": "10.0.0.1", "user_id": "c", "path": "/search"},
+        # user qoidasi, lekin user noma'lum: IP bo'yicha
+        {"client_ip": "10.0.0.2", "path": "/posts"},
+    ]
+
+    async with client(app) as http:
+        response = await http.post("/decisions", json=items(*same_ip))
+
+    assert response.status_code == 200
+    body = response.json()
+    assert [decision["allowed"] for decision in body] == [True, True, True, True, True, False, True]
+    assert [decision["remaining"] for decision in body[:3]] == [1, 0, 1]
+    assert body[0]["rule"] == "rule:1"
+
+
+@pytest.mark.asyncio
+async def test_peek_does_not_consume_quota():
+    app = make_app(RateLimiterService(InMemoryRateLimitRepository()))
+    item = {"client_ip": "10.0.0.1", "path": "/search"}
+
+    async with client(app) as http:
+        await http.post("/decisions", json=items(item))
+        first = (await http.post("/decisions/peek", json=items(item, item))).json()
+        second = (await http.post("/decisions/peek", json=items(item))).json()
+
+    assert [peek["remaining"] for peek in first + second] == [1, 1, 1]
+
+
+@pytest.mark.asyncio
+async def test_peek_follows_the_failure_mode_when_the_backend_fails(clock):
+    breaker = CircuitBreaker(failure_threshold=5, clock=clock)
+    app = make_app(RateLimiterService(DownRepository(), breaker=breaker, latency_budget=0.05))
+
+    async with client(app) as http:
+        response = await http.post("/decisions/peek", json=items(
+            {"client_ip": "10.0.0.1", "path": "/search"},
+            {"client_ip": "10.0.0.1", "path": "/closed"},
+        ))
+
+    assert response.status_code == 200
+    opened, closed = response.json()
+    assert opened["remaining"] is None
+    assert (closed["remaining"], closed["retry_after"]) == (0, 1)
+    assert breaker.failures == 2
+
+
+@pytest.mark.asyncio
+async def test_decisions_are_internal_only():
+    app = make_app(RateLimiterService(InMemoryRateLimitRepository()))
+
+    async with client(app, host="203.0.113.7") as http:
+        response = await http.post("/decisions", json=items({"client_ip": "10.0.0.1", "path": "/search"}))
+
+    assert response.status_code == 403
+
+
+@pytest.mark.asyncio
+async def test_exempt_paths_skip_the_middleware():
+    app = make_app(RateLimiterService(InMemoryRateLimitRepository()))
+    item = {"client_ip": "10.0.0.1", "path": "/search"}
+
+    async with client(app) as http:
+        statuses = [(await http.post("/decisions", json=items(item))).status_code for _ in range(5)]
+        searches = [(await http.get("/search")).status_code for _ in range(3)]
+
+    # gateway chaqiruvlari limitlanmaydi, oddiy route esa limitlanadi
+    assert statuses == [200] * 5
+    assert searches == [200, 200, 429]
+
+
+@pytest.mark.parametrize("path, exempt", [
+    ("/decisions", True),
+    ("/decisions/peek", True),
+    ("/decisionsx", False),
+    ("/admin/rate-limit/penalty-box", True),
+    ("/administrator", False),
+])
+def test_is_exempt_matches_whole_segments(path, exempt):
+    assert is_exempt(path, ("/decisions", "/admin")) == exempt
@@ -0,0 +1,83 @@
+import pytest
+
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.deny_cache import DenyCache
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from tests.conftest import make_rule
+
+
+class CountingRepository(InMemoryRateLimitRepository):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.calls = 0
+
+    async def increment_and_check(self, key, limit, window):
+        self.calls += 1
+        return await super().increment_and_check(key, limit, window)
+
+
+def test_retry_after_decreases_until_expiry(clock):
+    cache = DenyCache(clock=clock)
+    cache.add("k", 10)
+
+    assert cache.get("k") == 10
+    clock.advance(7.5)
+    assert cache.get("k") == 2.5
+    clock.advance(2.5)
+    assert cache.get("k") is None
+    assert len(cache) == 0
+    assert cache.hits == 2
+
+
+def test_non_positive_retry_after_is_not_cached(clock):
+    cache = DenyCache(clock=clock)
+
+    cache.add("k", 0)
+
+    assert cache.get("k") is None
+
+
+def test_least_recently_denied_key_is_evicted(clock):
+    cache = DenyCache(max_keys=2, clock=clock)
+    cache.add("a", 10)
+    cache.add("b", 10)
+    cache.add("a", 10)  # qayta rad etildi: eng yangi
+
+    cache.add("c", 10)
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.get("c") is not None
+
+
+@pytest.mark.asyncio
+async def test_denied_key_skips_the_backend(clock):
+    repo = CountingRepository(clock=clock)
+    service = RateLimiterService(repo, deny_cache=DenyCache(clock=clock))
+    rule = make_rule(limit=1, window=10)
+
+    assert (await service.decide("ip:1", "/posts", "GET", rule)).allowed
+    assert not (await service.decide("ip:1", "/posts", "GET", rule)).allowed
+    clock.advance(4)
+    result = await service.decide("ip:1", "/posts", "GET", rule)
+
+    assert not result.allowed
+    assert result.retry_after == 6
+    assert result.remaining == 0
+    assert repo.calls == 2
+    # boshqa identity keshdan ta'sirlanmaydi
+    assert (await service.decide("ip:2", "/posts", "GET", rule)).allowed
+
+
+@pytest.mark.asyncio
+async def test_backend_is_consulted_again_after_retry_after(clock):
+    repo = CountingRepository(clock=clock)
+    service = RateLimiterService(repo, deny_cache=DenyCache(clock=clock))
+    rule = make_rule(limit=1, window=10)
+    await service.decide("ip:1", "/posts", "GET", rule)
+    await service.decide("ip:1", "/posts", "GET", rule)
+
+    clock.advance(10)
+
+    assert (await service.decide("ip:1", "/posts", "GET", rule)).allowed
+    assert repo.calls == 3
@@ -0,0 +1,58 @@
+import random
+
+from app.services.rate_limit.heavy_hitters import HeavyHitters, SpaceSaving
+
+
+def test_counts_are_exact_below_capacity():
+    sketch = SpaceSaving(capacity=3)
+    for item in "aababc":
+        sketch.add(item)
+
+    assert [(hitter.identity, hitter.count, hitter.error) for hitter in sketch.top(3)] == [
+        ("a", 3, 0), ("b", 2, 0), ("c", 1, 0),
+    ]
+    assert sketch.total == 6
+
+
+def test_new_item_replaces_the_minimum_and_inherits_its_count():
+    sketch = SpaceSaving(capacity=2)
+    for item in "aaab":
+        sketch.add(item)
+
+    sketch.add("c")
+
+    assert len(sketch) == 2
+    top = {hitter.identity: hitter for hitter in sketch.top(2)}
+    assert set(top) == {"a", "c"}
+    assert (top["c"].count, top["c"].error) == (2, 1)
+
+
+def test_frequent_items_survive_a_long_tail():
+    rng = random.Random(7)
+    sketch = SpaceSaving(capacity=20)
+    stream = ["ip:heavy"] * 500 + ["ip:warm"] * 200 + [f"ip:{n}" for n in range(2000)]
+    rng.shuffle(stream)
+
+    for item in stream:
+        sketch.add(item)
+
+    top = sketch.top(2)
+    # N / capacity = 135 dan ko'p ko'ringanlar albatta ro'yxatda
+    assert [hitter.identity for hitter in top] == ["ip:heavy", "ip:warm"]
+    for hitter, true_count in zip(top, (500, 200)):
+        assert hitter.count - hitter.error <= true_count <= hitter.count
+
+
+def test_tracker_keeps_rules_and_decisions_apart():
+    tracker = HeavyHitters(capacity=10)
+    tracker.record("rule:1", "ip:1", False)
+    tracker.record("rule:1", "ip:1", False)
+    tracker.record("rule:1", "ip:2", True)
+    tracker.record("default", "ip:3", False)
+
+    assert tracker.rules() == ["default", "rule:1"]
+    assert [(hitter.identity, hitter.count) for hitter in tracker.top("rule:1")] == [("ip:1", 2)]
+    assert [hitter.identity for hitter in tracker.top("rule:1", "allowed")] == ["ip:2"]
+    assert tracker.total("rule:1") == 2
+    assert tracker.top("rule:9") == []
+    assert tracker.total("rule:9") == 0
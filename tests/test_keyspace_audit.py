@@ -0,0 +1,88 @@
+import json
+
+import fakeredis.aioredis
+import pytest
+
+from app.core.config import settings
+from app.services.rate_limit.keyspace_audit import KeyspaceAuditor, report_dict, ttl_label
+
+RULES = {
+    1: {"id": 1, "path": "/posts", "limit": 5, "window": 60, "algorithm": "gcra"},
+    2: {
+        "id": 2, "path": "/search", "limit": 5, "window": 60, "algorithm": "multi_limit",
+        "tiers": [{"algorithm": "fixed_window", "limit": 5, "window": 1}, {"algorithm": "token_bucket", "limit": 50, "window": 1}],
+    },
+}
+
+
+@pytest.fixture
+def redis() -> fakeredis.aioredis.FakeRedis:
+    return fakeredis.aioredis.FakeRedis()
+
+
+async def populate(redis):
+    await redis.hset(settings.rate_limit_rules_key, mapping={rule_id: json.dumps(rule) for rule_id, rule in RULES.items()})
+    for ip in ("10.0.0.1", "10.0.0.2"):
+        await redis.set(f"rate_limit:{{ip:{ip}:rule:1}}", 1, px=30_000)
+    await redis.set("rate_limit:{ip:10.0.0.1:rule:2}:t0", 1, px=500)
+    await redis.hset("rate_limit:{ip:10.0.0.1:rule:2}:t1", mapping={"tokens": 3, "ts": 1})
+    # o'chirilgan qoida va default limit
+    await redis.set("rate_limit:{ip:10.0.0.1:rule:9}", 1, px=30_000)
+    await redis.set("rate_limit:{ip:10.0.0.1:/users:GET}", 1, px=30_000)
+    # hash tag'siz eski format
+    await redis.set("rate_limit:ip:10.0.0.1:/posts:GET", 1)
+    await redis.set("rate_limit:penalty:ip:10.0.0.3", 1, px=600_000)
+
+
+def groups_by_rule(report) -> dict[tuple[str, str], object]:
+    return {(group.rule, group.algorithm): group for group in report.groups}
+
+
+@pytest.mark.asyncio
+async def test_keys_are_attributed_to_rules_and_algorithms(redis):
+    await populate(redis)
+
+    report = await KeyspaceAuditor([redis], rules_redis=redis, batch=3, pause=0, sample_rate=0).run()
+    groups = groups_by_rule(report)
+
+    assert report.scanned == 8 and report.complete
+    assert groups[("rule:1", "gcra")].keys == 2
+    assert groups[("rule:1", "gcra")].ttl == {"1m": 2}
+    assert groups[("rule:2", "fixed_window")].ttl == {"1s": 1}
+    assert groups[("rule:2", "token_bucket")].types == {"hash": 1}
+    assert groups[("rule:2", "token_bucket")].no_ttl == 1
+    assert groups[("rule:9", "unknown")].orphaned
+    assert report.orphaned_keys == 1
+    assert groups[("default", settings.rate_limit_algorithm)].keys == 1
+    assert groups[("unscoped", "unknown")].keys == 1
+    assert groups[("penalty_box", "-")].keys == 1
+
+
+@pytest.mark.asyncio
+async def test_missing_memory_usage_falls_back_to_counting(redis):
+    # fakeredis MEMORY USAGE'ni bilmaydi: managed Redis'dagidek
+    await populate(redis)
+    auditor = KeyspaceAuditor([redis], rules_redis=redis, batch=100, pause=0, sample_rate=1.0, seed=1)
+
+    report = await auditor.run()
+
+    assert not auditor.memory_usage
+    assert report.scanned == 8
+    assert all(group.sampled == 0 for group in report.groups)
+    assert report.estimated_bytes == 0
+    json.dumps(report_dict(report))
+
+
+@pytest.mark.asyncio
+async def test_max_keys_stops_the_scan(redis):
+    await populate(redis)
+
+    report = await KeyspaceAuditor([redis], rules_redis=redis, batch=2, pause=0, sample_rate=0).run(max_keys=4)
+
+    assert report.scanned == 4
+    assert not report.complete
+
+
+@pytest.mark.parametrize("ttl_ms, label", [(500, "1s"), (10_000, "10s"), (90_000, "5m"), (10 ** 9, ">1d")])
+def test_ttl_label(ttl_ms, label):
+    assert ttl_label(ttl_ms) == label
@@ -0,0 +1,77 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app.services.rate_limit import leasing
+from app.services.rate_limit.leasing import QuotaLeaser
+
+KEY = "rate_limit:{ip:1:rule:1}"
+
+
+@pytest.fixture
+def leaser(memory_repo, clock, monkeypatch) -> QuotaLeaser:
+    # lease muddatlari ham repository bilan bir soatda
+    monkeypatch.setattr(leasing, "time", SimpleNamespace(monotonic=clock))
+    return QuotaLeaser(memory_repo, lease_ttl=5, max_fraction=0.5)
+
+
+async def used(repo, limit: int, window: float) -> int:
+    left, _ = await repo.peek(KEY, "fixed_window", limit, window)
+    return limit - left
+
+
+@pytest.mark.asyncio
+async def test_lease_admits_from_memory(leaser, memory_repo, clock):
+    assert (await leaser.check("fixed_window", KEY, 100, 10)).allowed
+    leaser.leases[KEY].rate = 100
+    clock.advance(1)
+
+    result = await leaser.check("fixed_window", KEY, 100, 10)
+
+    assert result.allowed
+    # 1 + 50 ta lease: qolgan 49 worker xotirasida
+    assert await used(memory_repo, 100, 10) == 51
+    assert result.remaining == 49 + 49
+
+
+@pytest.mark.asyncio
+async def test_stale_remainder_is_not_returned_to_a_new_window(leaser, memory_repo, clock):
+    await leaser.check("fixed_window", KEY, 100, 10)
+    leaser.leases[KEY].rate = 100
+    clock.advance(1)
+    await leaser.check("fixed_window", KEY, 100, 10)
+    assert leaser.leases[KEY].remaining == 49
+
+    # window almashdi, boshqa workerlar yangi windowda 30 ta so'rov o'tkazdi
+    clock.advance(10)
+    for _ in range(30):
+        await memory_repo.increment_and_check(KEY, 100, 10)
+
+    assert (await leaser.check("fixed_window", KEY, 100, 10)).allowed
+
+    granted = leaser.leases[KEY].granted
+    assert await used(memory_repo, 100, 10) == 30 + granted
+
+
+@pytest.mark.asyncio
+async def test_unused_quota_is_returned_within_the_window(leaser, memory_repo, clock):
+    await leaser.check("fixed_window", KEY, 100, 10)
+    leaser.leases[KEY].rate = 100
+    clock.advance(1)
+    await leaser.check("fixed_window", KEY, 100, 10)
+
+    await leaser.release_all()
+
+    assert await used(memory_repo, 100, 10) == 2
+
+
+@pytest.mark.asyncio
+async def test_denied_when_the_window_is_exhausted(leaser, memory_repo):
+    for _ in range(10):
+        await memory_repo.increment_and_check(KEY, 10, 10)
+
+    result = await leaser.check("fixed_window", KEY, 10, 10)
+
+    assert not result.allowed
+    assert result.retry_after == 10
+    assert result.remaining == 0
@@ -0,0 +1,78 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.repositories.redis import RedisRateLimitRepository
+from app.repositories.redis.batching import ScriptBatcher
+from app.repositories.redis.library import FunctionLibrary, ScriptLibrary, create_library
+
+KEY = "rate_limit:{ip:1:f}"
+
+
+@pytest.fixture
+def redis() -> fakeredis.aioredis.FakeRedis:
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.mark.asyncio
+async def test_prepare_loads_a_missing_library(redis):
+    library = FunctionLibrary(redis)
+    assert await library.loaded_version() is None
+
+    await library.prepare()
+
+    assert await library.loaded_version() == library.version
+
+
+@pytest.mark.asyncio
+async def test_prepare_replaces_an_outdated_library(redis):
+    await FunctionLibrary(redis, version="old").prepare()
+    library = FunctionLibrary(redis)
+
+    await library.prepare()
+
+    assert await library.loaded_version() == library.version
+
+
+@pytest.mark.asyncio
+async def test_call_reloads_after_function_flush(redis):
+    library = FunctionLibrary(redis)
+    await library.prepare()
+    assert (await library.call("fixed_window", [KEY], [5, 60]))[0] == 1
+
+    await redis.function_flush()
+
+    assert (await library.call("fixed_window", [KEY], [5, 60]))[0] == 2
+    assert await library.loaded_version() == library.version
+
+
+@pytest.mark.asyncio
+async def test_batched_calls_reload_after_function_flush(redis):
+    library = FunctionLibrary(redis)
+    await library.prepare()
+    await redis.function_flush()
+    batcher = ScriptBatcher(redis, library)
+
+    results = await asyncio.gather(*(batcher.submit("fixed_window", [KEY], [5, 60]) for _ in range(3)))
+
+    assert sorted(count for count, *_ in results) == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_functions_and_eval_modes_agree(redis):
+    functions = RedisRateLimitRepository(redis, library=FunctionLibrary(redis))
+    scripts = RedisRateLimitRepository(redis, library=ScriptLibrary(redis))
+    await functions.prepare()
+    await scripts.prepare()
+
+    results = [await repo.gcra(KEY, 2, 60) for repo in (functions, scripts, functions)]
+
+    assert [allowed for allowed, *_ in results] == [1, 1, 0]
+
+
+def test_create_library_modes(redis):
+    assert isinstance(create_library(redis, "functions"), FunctionLibrary)
+    assert isinstance(create_library(redis, "eval"), ScriptLibrary)
+    with pytest.raises(ValueError):
+        create_library(redis, "lua")
@@ -0,0 +1,62 @@
+from app.services.rate_limit.matcher import RuleMatcher
+from tests.conftest import make_rule
+
+
+def test_static_path_beats_template_on_equal_priority():
+    static = make_rule(path="/users/me", id=1)
+    template = make_rule(path="/users/{id}", id=2)
+    matcher = RuleMatcher([template, static])
+
+    assert matcher.match("/users/me", "GET") is static
+    assert matcher.match("/users/42", "GET") is template
+
+
+def test_higher_priority_template_beats_static():
+    static = make_rule(path="/users/me", id=1)
+    template = make_rule(path="/users/{id}", id=2, priority=5)
+    matcher = RuleMatcher([static, template])
+
+    assert matcher.match("/users/me", "GET") is template
+
+
+def test_exact_method_beats_any_method_on_equal_priority():
+    any_method = make_rule(path="/posts", id=1)
+    post = make_rule(path="/posts", id=2, method="POST")
+    matcher = RuleMatcher([any_method, post])
+
+    assert matcher.match("/posts", "POST") is post
+    assert matcher.match("/posts", "GET") is any_method
+
+
+def test_any_method_with_higher_priority_wins():
+    post = make_rule(path="/posts", id=1, method="POST")
+    any_method = make_rule(path="/posts", id=2, priority=1)
+    matcher = RuleMatcher([post, any_method])
+
+    assert matcher.match("/posts", "POST") is any_method
+
+
+def test_template_deeper_in_the_path():
+    rule = make_rule(path="/orgs/{org}/repos/{repo}", id=1)
+    matcher = RuleMatcher([rule])
+
+    assert matcher.match("/orgs/acme/repos/api", "GET") is rule
+    assert matcher.match("/orgs/acme/repos", "GET") is None
+    assert matcher.match("/orgs/acme/repos/api/extra", "GET") is None
+
+
+def test_priority_found_in_a_pruned_branch():
+    # statik shoxda mos qoida bor, lekin template shox ostidagisi yuqoriroq
+    static = make_rule(path="/a/b/c", id=1, priority=1)
+    deep_template = make_rule(path="/a/{x}/c", id=2, priority=3)
+    low_template = make_rule(path="/{x}/b/c", id=3, priority=2)
+    matcher = RuleMatcher([static, deep_template, low_template])
+
+    assert matcher.match("/a/b/c", "GET") is deep_template
+
+
+def test_no_match():
+    matcher = RuleMatcher([make_rule(path="/posts", id=1, method="GET")])
+
+    assert matcher.match("/posts", "DELETE") is None
+    assert matcher.match("/comments", "GET") is None
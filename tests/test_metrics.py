@@ -0,0 +1,86 @@
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.api.v1.endpoints.metrics import metrics_router
+from app.core.metrics import DECISIONS, MetricsRegistry, register_collectors, registry
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.circuit_breaker import CircuitBreaker
+from app.services.rate_limit.deny_cache import DenyCache
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleCache, RuleSnapshot
+from tests.conftest import make_rule
+
+
+def test_counter_and_gauge_exposition():
+    metrics = MetricsRegistry()
+    requests = metrics.counter("requests_total", "Requests", ("path",))
+    requests.inc(('/a"b',))
+    requests.inc(('/a"b',), 2)
+    metrics.gauge("queue_size", "Queue size", lambda: [((), 1.5)])
+
+    assert metrics.render().splitlines() == [
+        "# HELP requests_total Requests",
+        "# TYPE requests_total counter",
+        'requests_total{path="/a\\"b"} 3',
+        "# HELP queue_size Queue size",
+        "# TYPE queue_size gauge",
+        "queue_size 1.5",
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    metrics = MetricsRegistry()
+    latency = metrics.histogram("latency_seconds", "Latency", buckets=(0.1, 1))
+    for value in (0.05, 0.1, 0.5, 3):
+        latency.observe(value)
+
+    samples = metrics.render().splitlines()[2:]
+
+    assert samples == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        "latency_seconds_sum 3.65",
+        "latency_seconds_count 4",
+    ]
+
+
+@pytest.mark.asyncio
+async def test_decisions_are_counted_by_outcome(clock):
+    service = RateLimiterService(InMemoryRateLimitRepository(clock=clock), deny_cache=DenyCache(clock=clock))
+    rule = make_rule(id=7, limit=1)
+    before = dict(DECISIONS.values)
+
+    for _ in range(3):
+        await service.decide("ip:1", "/posts", "GET", rule)
+
+    counted = {labels: value - before.get(labels, 0) for labels, value in DECISIONS.values.items()}
+    assert counted[("rule:7", "fixed_window", "allowed")] == 1
+    assert counted[("rule:7", "fixed_window", "denied")] == 1
+    assert counted[("rule:7", "fixed_window", "deny_cache")] == 1
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_reads_collectors_at_scrape_time(clock):
+    breaker = CircuitBreaker(failure_threshold=1, clock=clock)
+    service = RateLimiterService(InMemoryRateLimitRepository(), deny_cache=DenyCache(clock=clock), breaker=breaker)
+    rules = RuleCache(redis=None)
+    rules.snapshot = RuleSnapshot.build(42, {})
+    register_collectors(service, rules, lambda: [])
+    app = FastAPI()
+    app.include_router(metrics_router)
+    transport = httpx.ASGITransport(app=app)
+
+    breaker.record_failure()
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        response = await client.get("/metrics")
+
+    assert response.headers["content-type"] == "text/plain; version=0.0.4; charset=utf-8"
+    lines = response.text.splitlines()
+    assert "rate_limiter_rules_version 42" in lines
+    assert 'rate_limiter_breaker_state{state="open"} 1' in lines
+    assert 'rate_limiter_breaker_transitions_total{from_state="closed",to_state="open"} 1' in lines
+    assert "# TYPE rate_limiter_deny_cache_hits_total counter" in lines
+    assert "# TYPE rate_limiter_redis_script_seconds histogram" in lines
+    assert set(registry.metrics) >= {"rate_limiter_decisions_total", "rate_limiter_middleware_seconds"}
@@ -0,0 +1,114 @@
+import asyncio
+
+import fakeredis.aioredis
+import pytest
+
+from app.core.config import settings
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.penalty_box import PenaltyBox
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from tests.conftest import make_rule
+
+
+@pytest.fixture
+def box(memory_repo, clock) -> PenaltyBox:
+    return PenaltyBox(memory_repo, strikes=3, strike_window=60, base_ban=10, factor=2, max_ban=25, clock=clock)
+
+
+@pytest.mark.asyncio
+async def test_ban_after_strikes_and_escalation(box, clock):
+    durations = [await box.strike("ip:1") for _ in range(3)]
+    assert durations == [None, None, 10]
+    assert box.get("ip:1") == 10
+    assert box.get("ip:2") is None
+
+    clock.advance(60)
+    assert box.get("ip:1") is None
+    durations = [await box.strike("ip:1") for _ in range(3)]
+    assert durations[-1] == 20
+
+    clock.advance(60)
+    durations = [await box.strike("ip:1") for _ in range(3)]
+    # max_ban bilan cheklangan
+    assert durations[-1] == 25
+
+
+@pytest.mark.asyncio
+async def test_further_strikes_in_the_window_do_not_extend_the_ban(box, clock):
+    for _ in range(3):
+        await box.strike("ip:1")
+
+    assert await box.strike("ip:1") is None
+
+    clock.advance(4)
+    assert box.get("ip:1") == 6
+
+
+@pytest.mark.asyncio
+async def test_bans_are_shared_through_redis(memory_repo, clock):
+    redis = fakeredis.aioredis.FakeRedis()
+    first = PenaltyBox(memory_repo, redis=redis, clock=clock)
+    second = PenaltyBox(memory_repo, redis=redis, clock=clock)
+
+    await first.ban("ip:1", 30)
+    await first.ban("ip:2", 30)
+    await first.unban("ip:2")
+    await second.refresh()
+
+    assert second.bans() == {"ip:1": clock() + 30}
+    second.apply(f"ip:3 {clock() + 5}".encode())
+    second.apply("ip:1 0")
+    assert second.bans() == {"ip:3": clock() + 5}
+    assert await redis.zscore(settings.rate_limit_penalty_key, "ip:1") == clock() + 30
+
+
+@pytest.mark.asyncio
+async def test_banned_identity_is_rejected_before_the_algorithm(box, memory_repo):
+    service = RateLimiterService(memory_repo, penalty_box=box)
+    await box.ban("ip:1", 10)
+
+    result = await service.decide("ip:1", "/posts", "GET", make_rule())
+
+    assert not result.allowed
+    assert result.retry_after == 10
+    left, _ = await memory_repo.peek("rate_limit:{ip:1:/posts:*}", "fixed_window", 5, 60)
+    assert left == 5
+
+
+@pytest.mark.asyncio
+async def test_repeated_denials_lead_to_a_ban(box, memory_repo):
+    service = RateLimiterService(memory_repo, penalty_box=box)
+    rule = make_rule(limit=1)
+
+    for _ in range(4):
+        await service.decide("ip:1", "/posts", "GET", rule)
+    await service.close()
+
+    assert box.get("ip:1") == 10
+
+
+@pytest.mark.asyncio
+async def test_deny_does_not_wait_for_penalty_strike(clock):
+    class SlowPenaltyBox:
+        strikes = 0
+
+        def get(self, identity):
+            return None
+
+        async def strike(self, identity):
+            await asyncio.sleep(0.2)
+            self.strikes += 1
+
+        async def stop(self):
+            pass
+
+    penalty_box = SlowPenaltyBox()
+    service = RateLimiterService(InMemoryRateLimitRepository(clock=clock), penalty_box=penalty_box, latency_budget=1)
+    rule = make_rule(limit=1)
+    await service.decide("ip:1", "/posts", "GET", rule)
+
+    result = await asyncio.wait_for(service.decide("ip:1", "/posts", "GET", rule), timeout=0.1)
+
+    assert not result.allowed
+    await service.close()
+    assert penalty_box.strikes == 1
@@ -0,0 +1,89 @@
+from typing import Optional
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from app.core.entities import RateLimitResult
+from app.core.middleware.rate_limit import RateLimiterMiddleware, quota_headers
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.services.rate_limit.circuit_breaker import CircuitBreaker
+from app.services.rate_limit.rate_limiter import RateLimiterService
+from app.services.rate_limit.rule_cache import RuleCache, RuleSnapshot, compile_rules
+
+RULES = {
+    "1": {
+        "id": 1, "path": "/posts", "limit": 2, "window": 60, "algorithm": "fixed_window", "key_type": "ip",
+        "failure_mode": "open",
+    },
+}
+
+
+class DownRepository(InMemoryRateLimitRepository):
+    async def increment_and_check(self, key, limit, window):
+        raise ConnectionError("redis down")
+
+
+@pytest.fixture
+def rules() -> RuleCache:
+    rules = RuleCache(redis=None)
+    rules.snapshot = RuleSnapshot.build(1, compile_rules(RULES))
+    return rules
+
+
+def make_client(rules: RuleCache, service: Optional[RateLimiterService] = None, **options) -> httpx.AsyncClient:
+    app = FastAPI()
+    service = service or RateLimiterService(InMemoryRateLimitRepository())
+    app.add_middleware(
+        RateLimiterMiddleware, rate_limiter_service=service, rules=rules, emit_timing_headers=False, **options
+    )
+
+    @app.get("/posts")
+    async def posts():
+        return {}
+
+    transport = httpx.ASGITransport(app=app, client=("10.0.0.1", 51000))
+    return httpx.AsyncClient(transport=transport, base_url="http://test")
+
+
+def test_quota_headers_round_reset_up():
+    headers = dict(quota_headers(RateLimitResult(True, limit=10, remaining=3, reset=4.2)))
+
+    assert headers == {b"ratelimit-limit": b"10", b"ratelimit-remaining": b"3", b"ratelimit-reset": b"5"}
+    assert quota_headers(RateLimitResult(True)) == []
+
+
+@pytest.mark.asyncio
+async def test_allowed_and_limited_responses_carry_quota(rules):
+    async with make_client(rules) as http:
+        responses = [await http.get("/posts") for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert [response.headers["ratelimit-remaining"] for response in responses] == ["1", "0", "0"]
+    assert all(response.headers["ratelimit-limit"] == "2" for response in responses)
+    limited = responses[-1]
+    assert 1 <= int(limited.headers["retry-after"]) <= 60
+    assert int(limited.headers["retry-after-ms"]) > 0
+    assert limited.text == "Rate limit exceeded. Try again later."
+
+
+@pytest.mark.asyncio
+async def test_degraded_result_sends_no_quota(rules, clock):
+    service = RateLimiterService(DownRepository(), breaker=CircuitBreaker(clock=clock))
+
+    async with make_client(rules, service) as http:
+        response = await http.get("/posts")
+
+    # failure_mode=open: so'rov o'tadi, kvota noma'lum
+    assert response.status_code == 200
+    assert "ratelimit-remaining" not in response.headers
+
+
+@pytest.mark.asyncio
+async def test_quota_headers_can_be_disabled(rules):
+    async with make_client(rules, emit_quota_headers=False) as http:
+        responses = [await http.get("/posts") for _ in range(3)]
+
+    assert [response.status_code for response in responses] == [200, 200, 429]
+    assert all("ratelimit-limit" not in response.headers for response in responses)
+    assert "retry-after" in responses[-1].headers
@@ -0,0 +1,73 @@
+import json
+
+from app.services.rate_limit.rule_cache import RuleCache, RuleSnapshot, compile_rules
+
+
+def raw_rule(rule_id: int, path: str, limit: int = 10, **extra) -> dict:
+    return {
+        "id": rule_id, "path": path, "limit": limit, "window": 60,
+        "algorithm": "fixed_window", "key_type": "ip", **extra,
+    }
+
+
+def diff(version: int, upserts: dict = None, deletes: list = None) -> str:
+    return json.dumps({"version": version, "upserts": upserts or {}, "deletes": deletes or []})
+
+
+def make_cache(version: int = 1) -> RuleCache:
+    cache = RuleCache(redis=None)
+    rules = compile_rules({"1": raw_rule(1, "/posts"), "2": raw_rule(2, "/users/{id}")})
+    cache.snapshot = RuleSnapshot.build(version, rules)
+    return cache
+
+
+def test_upsert_adds_and_replaces_rules():
+    cache = make_cache()
+
+    assert cache.apply(diff(2, upserts={"1": raw_rule(1, "/posts", limit=99), "3": raw_rule(3, "/login")}))
+
+    assert cache.snapshot.version == 2
+    assert cache.snapshot.match("/posts", "GET").limit == 99
+    assert cache.snapshot.match("/login", "POST").id == 3
+
+
+def test_delete_removes_rule():
+    cache = make_cache()
+
+    assert cache.apply(diff(2, deletes=["2"]))
+
+    assert cache.snapshot.match("/users/7", "GET") is None
+    assert cache.snapshot.match("/posts", "GET").id == 1
+
+
+def test_invalid_upsert_removes_the_old_rule():
+    cache = make_cache()
+
+    assert cache.apply(diff(2, upserts={"1": {"id": 1, "path": "/posts", "limit": "many"}}))
+
+    assert 1 not in cache.snapshot.rules
+    assert cache.snapshot.match("/posts", "GET") is None
+
+
+def test_stale_diff_is_ignored():
+    cache = make_cache(version=5)
+    snapshot = cache.snapshot
+
+    assert cache.apply(diff(5, deletes=["1"]))
+
+    assert cache.snapshot is snapshot
+
+
+def test_version_gap_requests_full_reload():
+    cache = make_cache(version=5)
+    snapshot = cache.snapshot
+
+    assert not cache.apply(diff(7, deletes=["1"]))
+
+    assert cache.snapshot is snapshot
+
+
+def test_tiers_compile_primary_limit_first():
+    rules = compile_rules({"1": raw_rule(1, "/search", tiers=[{"limit": 100, "window": 3600, "algorithm": "fixed_window"}])})
+
+    assert rules[1].tiers == (("fixed_window", 10, 60.0), ("fixed_window", 100, 3600.0))
@@ -0,0 +1,109 @@
+import asyncio
+import json
+
+import fakeredis.aioredis
+import pytest
+
+from app.core.config import settings
+from app.workers.tasks import RateLimitRuleUpdater
+
+
+class FakeDatabase:
+    """Postgresdagi faol qoidalar: id -> serialize() natijasi"""
+
+    def __init__(self):
+        self.rules: dict[int, dict] = {}
+
+    def put(self, rule_id: int, limit: int = 10):
+        self.rules[rule_id] = {"id": rule_id, "path": f"/r{rule_id}", "limit": limit, "window": 60}
+
+
+def make_updater(redis, database: FakeDatabase) -> RateLimitRuleUpdater:
+    updater = RateLimitRuleUpdater(redis)
+
+    async def fetch_changes():
+        # watermarksiz: har sync barcha qatorlarni o'qiydi
+        await asyncio.sleep(0)
+        return list(database.rules.values()), set(database.rules), None
+
+    updater.fetch_changes = fetch_changes
+    return updater
+
+
+@pytest.fixture
+def redis() -> fakeredis.aioredis.FakeRedis:
+    return fakeredis.aioredis.FakeRedis()
+
+
+@pytest.fixture
+def database() -> FakeDatabase:
+    database = FakeDatabase()
+    database.put(1)
+    return database
+
+
+async def published_rules(redis) -> dict[int, dict]:
+    data = await redis.hgetall(settings.rate_limit_rules_key)
+    return {int(rule_id): json.loads(raw) for rule_id, raw in data.items()}
+
+
+@pytest.mark.asyncio
+async def test_unchanged_rules_are_not_republished(redis, database):
+    updater = make_updater(redis, database)
+
+    assert await updater.update_rules() == 1
+    assert await updater.update_rules() is None
+
+    database.put(1, limit=20)
+    database.put(2)
+    assert await updater.update_rules() == 2
+    del database.rules[1]
+    assert await updater.update_rules() == 3
+    assert set(await published_rules(redis)) == {2}
+
+
+@pytest.mark.asyncio
+async def test_other_workers_do_not_republish_the_same_change(redis, database):
+    first, second = make_updater(redis, database), make_updater(redis, database)
+    await first.update_rules()
+    await second.update_rules()
+
+    database.put(1, limit=20)
+    assert await first.update_rules() == 2
+    # ikkinchi worker lokal nusxasi eski, lekin Redisdagi holat bilan solishtiradi
+    assert await second.update_rules() is None
+
+    database.put(1, limit=10)
+    assert await second.update_rules() == 3
+    assert (await published_rules(redis))[1]["limit"] == 10
+
+
+@pytest.mark.asyncio
+async def test_concurrent_workers_publish_once(redis, database):
+    updaters = [make_updater(redis, database) for _ in range(4)]
+
+    versions = await asyncio.gather(*(updater.update_rules() for updater in updaters))
+
+    assert sorted(versions, key=lambda version: version or 0) == [None, None, None, 1]
+    assert int(await redis.get(settings.rate_limit_rules_version_key)) == 1
+
+
+@pytest.mark.asyncio
+async def test_failed_write_keeps_the_watermark(redis, database):
+    updater = make_updater(redis, database)
+    updater.watermark = "before"
+
+    async def fetch_changes():
+        return list(database.rules.values()), set(database.rules), "after"
+
+    async def update_redis(upserts, deletes):
+        raise ConnectionError("redis down")
+
+    updater.fetch_changes = fetch_changes
+    updater.update_redis = update_redis
+
+    with pytest.raises(ConnectionError):
+        await updater.update_rules()
+
+    assert updater.watermark == "before"
+    assert updater.published == {}
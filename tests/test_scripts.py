@@ -0,0 +1,116 @@
+"""Lua skriptlari (fakeredis, EVALSHA yo'li) memory backend bilan bir xil javob berishi"""
+import time
+
+import fakeredis.aioredis
+import pytest
+
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.repositories.redis import RedisRateLimitRepository
+from app.repositories.redis.library import ScriptLibrary
+
+# katta window va sekin refill: test davomida window chegarasi yoki to'lish ta'sir qilmaydi
+CASES = [
+    ("increment_and_check", (5, 3600)),
+    ("sliding_window_log", (5, 3600)),
+    ("sliding_window_counter", (5, 3600)),
+    ("token_bucket", (5, 0.001)),
+    ("leaky_bucket", (5, 0.001)),
+    ("gcra", (5, 3600)),
+    ("gcra", (3, 10)),
+    ("lease_fixed_window", (5, 3600, 2)),
+    ("lease_token_bucket", (5, 0.001, 2)),
+]
+
+
+@pytest.fixture
+def redis_repo() -> RedisRateLimitRepository:
+    redis = fakeredis.aioredis.FakeRedis()
+    return RedisRateLimitRepository(redis, library=ScriptLibrary(redis))
+
+
+@pytest.fixture
+def wall_clock_repo() -> InMemoryRateLimitRepository:
+    # Redis TIME bilan bir xil soat: sliding window chegaralari mos tushadi
+    return InMemoryRateLimitRepository(clock=time.time)
+
+
+def assert_same(script: tuple, memory: tuple):
+    assert len(script) == len(memory)
+    # qaror, qolgan kvota (va bosqich indeksi) aniq, vaqtlar ms farq bilan
+    assert script[0] == memory[0]
+    assert script[2] == memory[2]
+    assert script[1] == pytest.approx(memory[1], abs=0.05)
+    assert script[3] == pytest.approx(memory[3], abs=0.05)
+    assert script[4:] == memory[4:]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, args", CASES)
+async def test_script_matches_memory_backend(redis_repo, wall_clock_repo, method, args):
+    for _ in range(7):
+        script = await getattr(redis_repo, method)("rate_limit:{ip:1:t}", *args)
+        memory = await getattr(wall_clock_repo, method)("rate_limit:{ip:1:t}", *args)
+        assert_same(script, memory)
+
+
+@pytest.mark.asyncio
+async def test_multi_limit_matches_memory_backend(redis_repo, wall_clock_repo):
+    tiers = (("fixed_window", 3, 3600), ("sliding_window", 10, 3600), ("token_bucket", 5, 0.001))
+    results = []
+    for _ in range(5):
+        script = await redis_repo.multi_limit("rate_limit:{ip:1:m}", tiers)
+        memory = await wall_clock_repo.multi_limit("rate_limit:{ip:1:m}", tiers)
+        assert_same(script, memory)
+        results.append(script)
+
+    assert [allowed for allowed, *_ in results] == [1, 1, 1, 0, 0]
+    # eng kam kvota qolgan bosqich: 3/soat
+    assert [remaining for _, _, remaining, _, _ in results] == [2, 1, 0, 0, 0]
+    assert {tier for *_, tier in results} == {0}
+
+
+@pytest.mark.asyncio
+async def test_multi_limit_denial_consumes_nothing(redis_repo):
+    tiers = (("token_bucket", 10, 0.001), ("fixed_window", 1, 3600))
+    assert (await redis_repo.multi_limit("rate_limit:{ip:1:m}", tiers))[0] == 1
+    assert (await redis_repo.multi_limit("rate_limit:{ip:1:m}", tiers))[0] == 0
+
+    left, _ = await redis_repo.peek("rate_limit:{ip:1:m}:t0", "token_bucket", 10, 0.001)
+    assert left == 9
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("repo_fixture", ["redis_repo", "wall_clock_repo"])
+async def test_leaky_bucket_burst_admits_capacity(request, repo_fixture):
+    repo = request.getfixturevalue(repo_fixture)
+
+    results = [await repo.leaky_bucket("rate_limit:{ip:1:l}", 3, 1) for _ in range(5)]
+
+    assert [allowed for allowed, *_ in results] == [1, 1, 1, 0, 0]
+    assert [remaining for _, _, remaining, _ in results] == [2, 1, 0, 0, 0]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("repo_fixture", ["redis_repo", "wall_clock_repo"])
+async def test_gcra_first_request_leaves_limit_minus_one(request, repo_fixture):
+    repo = request.getfixturevalue(repo_fixture)
+
+    _, _, remaining, _ = await repo.gcra("rate_limit:{ip:1:g}", 3, 10)
+
+    assert remaining == 2
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_retry_after_full_current_window(memory_repo, clock):
+    clock.now = 1000.2  # window 10: joriy window boshidan 0.2 s
+    for _ in range(5):
+        assert (await memory_repo.sliding_window_counter("k", 5, 10))[0] == 1
+
+    _, retry_after, _, _ = await memory_repo.sliding_window_counter("k", 5, 10)
+    # keyingi window chegarasi (9.8 s) yetmaydi: 5 ta hisob oldingi window sifatida hali og'ir
+    assert retry_after == pytest.approx(9.8 + 2)
+
+    clock.advance(retry_after - 0.01)
+    assert (await memory_repo.sliding_window_counter("k", 5, 10))[0] == 0
+    clock.advance(0.02)
+    assert (await memory_repo.sliding_window_counter("k", 5, 10))[0] == 1
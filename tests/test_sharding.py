@@ -0,0 +1,78 @@
+import fakeredis.aioredis
+import pytest
+
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository
+from app.repositories.redis import RedisRateLimitRepository, ShardedRateLimitRepository
+from app.repositories.redis.library import ScriptLibrary
+from app.repositories.redis.sharded_repository import HashRing, hash_tag
+
+
+@pytest.mark.parametrize("key, tag", [
+    ("rate_limit:{ip:1:rule:1}", "ip:1:rule:1"),
+    ("rate_limit:{ip:1:rule:1}:t0", "ip:1:rule:1"),
+    ("rate_limit:{}:x", "rate_limit:{}:x"),
+    ("rate_limit:ip:1", "rate_limit:ip:1"),
+])
+def test_hash_tag(key, tag):
+    assert hash_tag(key) == tag
+
+
+def test_ring_moves_few_keys_when_a_node_is_added():
+    tags = [f"ip:{n}:rule:1" for n in range(2000)]
+    before = HashRing(["a", "b", "c"])
+    after = HashRing(["a", "b", "c", "d"])
+
+    moved = [tag for tag in tags if before.get(tag) != after.get(tag)]
+
+    # faqat yangi node'ga ko'chadi, taxminan 1/4 qismi
+    assert all(after.get(tag) == 3 for tag in moved)
+    assert 0.15 < len(moved) / len(tags) < 0.35
+
+
+def test_tier_keys_share_the_limit_shard():
+    repo = ShardedRateLimitRepository([InMemoryRateLimitRepository() for _ in range(4)])
+
+    for n in range(50):
+        key = f"rate_limit:{{ip:{n}:rule:1}}"
+        assert repo.shard_for(f"{key}:t0") is repo.shard_for(key)
+        assert repo.shard_for(f"{key}:t1") is repo.shard_for(key)
+
+
+def test_requires_a_shard():
+    with pytest.raises(ValueError):
+        ShardedRateLimitRepository([])
+
+
+@pytest.mark.asyncio
+async def test_counters_live_only_on_the_owning_shard():
+    shards = [InMemoryRateLimitRepository() for _ in range(3)]
+    repo = ShardedRateLimitRepository(shards)
+    keys = [f"rate_limit:{{ip:{n}:rule:1}}" for n in range(30)]
+
+    for key in keys:
+        for _ in range(2):
+            await repo.increment_and_check(key, 5, 60)
+
+    for key in keys:
+        owner = repo.shard_for(key)
+        for shard in shards:
+            left, _ = await shard.peek(key, "fixed_window", 5, 60)
+            assert left == (3 if shard is owner else 5)
+    # kalitlar barcha shardlarga taqsimlangan
+    assert len({id(repo.shard_for(key)) for key in keys}) == 3
+
+
+@pytest.mark.asyncio
+async def test_multi_limit_runs_on_one_redis_node():
+    nodes = [fakeredis.aioredis.FakeRedis() for _ in range(2)]
+    repo = ShardedRateLimitRepository([RedisRateLimitRepository(node, library=ScriptLibrary(node)) for node in nodes])
+    await repo.prepare()
+    key = "rate_limit:{ip:1:rule:1}"
+    tiers = (("fixed_window", 3, 3600), ("token_bucket", 10, 0.001))
+
+    results = [(await repo.multi_limit(key, tiers))[0] for _ in range(4)]
+
+    assert results == [1, 1, 1, 0]
+    owner = nodes.index(repo.shard_for(key).redis)
+    assert await nodes[1 - owner].dbsize() == 0
+    assert sorted(await nodes[owner].keys("rate_limit:*")) == [f"{key}:t0".encode(), f"{key}:t1".encode()]
@@ -0,0 +1,166 @@
+import asyncio
+import sys
+import textwrap
+
+import pytest
+
+from app.repositories.memory.memory_repository import InMemoryRateLimitRepository, _Counter
+from app.repositories.shared_memory import SharedMemoryRateLimitRepository
+from app.repositories.shared_memory.shared_memory_repository import SLOT
+
+CASES = [
+    ("increment_and_check", (3, 60)),
+    ("sliding_window_counter", (3, 60)),
+    ("token_bucket", (3, 0.5)),
+    ("leaky_bucket", (3, 0.5)),
+    ("gcra", (3, 60)),
+    ("multi_limit", ((("fixed_window", 3, 60), ("token_bucket", 5, 1)),)),
+]
+
+
+@pytest.fixture
+def path(tmp_path) -> str:
+    return str(tmp_path / "limiter")
+
+
+@pytest.fixture
+def shared_repo(path, clock):
+    repo = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    yield repo
+    repo.close()
+
+
+async def bucket_is_locked_elsewhere(path: str, repo: SharedMemoryRateLimitRepository, key: str) -> bool:
+    # boshqa process: shu bucketni LOCK_NB bilan olishga urinadi
+    offset = repo._bucket_offset(repo._hash(key)[1])
+    code = textwrap.dedent(f"""
+        import fcntl, os, sys
+        fd = os.open({path!r}, os.O_RDWR)
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, {repo.WAYS * SLOT.size}, {offset})
+        except OSError:
+            sys.exit(1)
+    """)
+    process = await asyncio.create_subprocess_exec(sys.executable, "-c", code)
+    return await process.wait() == 1
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("method, args", CASES)
+async def test_matches_memory_backend(shared_repo, clock, method, args):
+    memory = InMemoryRateLimitRepository(clock=clock)
+
+    for _ in range(5):
+        assert await getattr(shared_repo, method)("k", *args) == await getattr(memory, method)("k", *args)
+        clock.advance(0.7)
+
+
+@pytest.mark.asyncio
+async def test_sliding_window_log_is_served_by_the_counter(shared_repo, clock):
+    # log slotga sig'maydi: memory backenddagi counter bilan bir xil
+    memory = InMemoryRateLimitRepository(clock=clock)
+
+    for _ in range(5):
+        expected = await memory.sliding_window_counter("k", 3, 60)
+        assert await shared_repo.sliding_window_log("k", 3, 60) == expected
+        clock.advance(0.7)
+
+
+@pytest.mark.asyncio
+async def test_repositories_on_one_path_share_counters(path, clock):
+    first = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    second = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+
+    counts = [(await repo.increment_and_check("k", 5, 60))[0] for repo in (first, second, first)]
+
+    assert counts == [1, 2, 3]
+    assert first._region is second._region
+    first.close()
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_repositories_on_one_path_exclude_each_other(path, clock):
+    first = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    second = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    third = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    await first._lock_buckets(["k"])
+
+    waiting = asyncio.create_task(second.increment_and_check("k", 5, 60))
+    await asyncio.sleep(0.01)
+    assert not waiting.done()
+
+    # boshqa repository yopilsa ham lock joyida
+    third.close()
+    assert await bucket_is_locked_elsewhere(path, first, "k")
+
+    first._region.unlock(first._locked, first.WAYS * SLOT.size)
+    first._locked.clear()
+    assert (await waiting)[0] == 1
+    first.close()
+    second.close()
+
+
+@pytest.mark.asyncio
+async def test_busy_bucket_times_out_without_blocking_the_loop(path, clock):
+    owner = SharedMemoryRateLimitRepository(path, slots=64, clock=clock)
+    repo = SharedMemoryRateLimitRepository(path, slots=64, clock=clock, lock_timeout=0.05)
+    await owner._lock_buckets(["k"])
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.001)
+
+    task = asyncio.create_task(ticker())
+    with pytest.raises(TimeoutError):
+        await repo.increment_and_check("k", 5, 60)
+    task.cancel()
+
+    assert ticks > 5
+    owner.close()
+    repo.close()
+
+
+@pytest.mark.asyncio
+async def test_failed_check_does_not_write_state(shared_repo, clock):
+    with pytest.raises(ValueError):
+        async with shared_repo._transaction(["k"]):
+            shared_repo._put("k", _Counter(clock() + 60)).count = 5
+            raise ValueError("algorithm failed")
+
+    assert await shared_repo.peek("k", "fixed_window", 5, 60) == (5, 0)
+    assert not shared_repo._locked
+
+
+@pytest.mark.asyncio
+async def test_key_outside_the_transaction_is_rejected(shared_repo):
+    with pytest.raises(RuntimeError):
+        async with shared_repo._transaction(["a"]):
+            shared_repo._find("some-other-key-in-another-bucket")
+
+
+@pytest.mark.asyncio
+async def test_workers_in_separate_processes_share_the_limit(path):
+    SharedMemoryRateLimitRepository(path, slots=64).close()
+    code = textwrap.dedent(f"""
+        import asyncio
+        from app.repositories.shared_memory import SharedMemoryRateLimitRepository
+
+        async def main():
+            repo = SharedMemoryRateLimitRepository({path!r}, slots=64)
+            for _ in range(200):
+                await repo.increment_and_check("k", 10 ** 6, 60)
+            repo.close()
+
+        asyncio.run(main())
+    """)
+    processes = [await asyncio.create_subprocess_exec(sys.executable, "-c", code) for _ in range(3)]
+    assert [await process.wait() for process in processes] == [0, 0, 0]
+
+    repo = SharedMemoryRateLimitRepository(path, slots=64)
+    left, _ = await repo.peek("k", "fixed_window", 10 ** 6, 60)
+    repo.close()
+    assert 10 ** 6 - left == 600